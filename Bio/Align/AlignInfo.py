@@ -69,6 +69,15 @@ class SummaryInfo(object):
            not just 1 sequence and gaps).
 
         """
+        array = self._get_array()
+        if array is not None:
+            # Count all the columns at once using NumPy
+            consensus = self._array_consensus(array, threshold, ambiguous,
+                                              require_multiple, "-.")
+            if consensus_alpha is None:
+                consensus_alpha = self._guess_consensus_alphabet(ambiguous)
+            return Seq(consensus, consensus_alpha)
+
         # Iddo Friedberg, 1-JUL-2004: changed ambiguous default to "X"
         consensus = ''
 
@@ -130,6 +139,15 @@ class SummaryInfo(object):
            it takes the same as input.
 
         """
+        array = self._get_array()
+        if array is not None:
+            # Count all the columns at once using NumPy
+            consensus = self._array_consensus(array, threshold, ambiguous,
+                                              require_multiple, "")
+            if consensus_alpha is None:
+                consensus_alpha = self._guess_consensus_alphabet(ambiguous)
+            return Seq(consensus, consensus_alpha)
+
         # Iddo Friedberg, 1-JUL-2004: changed ambiguous default to "X"
         consensus = ''
 
@@ -259,6 +277,10 @@ class SummaryInfo(object):
         # get a starting dictionary based on the alphabet of the alignment
         rep_dict, skip_items = self._get_base_replacements(skip_chars)
 
+        array = self._get_array()
+        if array is not None:
+            return self._array_replacements(array, rep_dict, skip_items)
+
         # iterate through each record
         for rec_num1 in range(len(self.alignment)):
             # iterate through each record from one beyond the current record
@@ -327,6 +349,9 @@ class SummaryInfo(object):
             # We are dealing with a generic alphabet class where the
             # letters are not defined!  We must build a list of the
             # letters used...
+            array = self._get_array()
+            if array is not None:
+                return "".join(self._get_present_letters(array))
             set_letters = set()
             for record in self.alignment:
                 # Note the built in set does not have a union_update
@@ -416,6 +441,24 @@ class SummaryInfo(object):
             left_seq = self.dumb_consensus()
 
         pssm_info = []
+        array = self._get_array()
+        if array is not None:
+            letters, counts = self._get_letter_counts(array,
+                                                      self._get_weights())
+            for letter in letters:
+                if letter not in chars_to_ignore and letter not in all_letters:
+                    raise ValueError("Residue %s not found in alphabet %s"
+                                     % (letter, self.alignment._alphabet))
+            columns = [i for (i, letter) in enumerate(letters)
+                       if letter not in chars_to_ignore]
+            used_letters = [letters[i] for i in columns]
+            base_dict = self._get_base_letters(all_letters)
+            for residue_num, values in enumerate(counts[:, columns].tolist()):
+                score_dict = base_dict.copy()
+                score_dict.update(zip(used_letters, values))
+                pssm_info.append((left_seq[residue_num], score_dict))
+            return PSSM(pssm_info)
+
         # now start looping through all of the sequences and getting info
         for residue_num in range(len(left_seq)):
             score_dict = self._get_base_letters(all_letters)
@@ -522,6 +565,18 @@ class SummaryInfo(object):
         for char in chars_to_ignore:
             all_letters = all_letters.replace(char, '')
 
+        array = self._get_array()
+        if array is not None:
+            # Calculate the whole region at once using NumPy
+            self.ic_vector = self._array_info_content(array[:, start:end],
+                                                      all_letters,
+                                                      chars_to_ignore,
+                                                      pseudo_count,
+                                                      e_freq_table,
+                                                      random_expected,
+                                                      log_base)
+            return sum(self.ic_vector)
+
         info_content = {}
         for residue_num in range(start, end):
             freq_dict = self._get_letter_freqs(residue_num,
@@ -674,6 +729,199 @@ class SummaryInfo(object):
                 total_info += letter_info
         return total_info
 
+    def _get_array(self):
+        """Return the alignment as a NumPy array of letter codes (PRIVATE).
+
+        Returns None if NumPy is not installed or the sequences are not all
+        the same length, in which case the calling methods fall back on
+        looping over the records and columns in Python.
+        """
+        try:
+            return self.alignment._make_array()
+        except (AttributeError, ImportError, ValueError):
+            return None
+
+    def _get_weights(self):
+        """Return a list of the weight of each record (PRIVATE)."""
+        return [record.annotations.get('weight', 1.0)
+                for record in self.alignment]
+
+    def _get_present_letters(self, array):
+        """Return a sorted list of the letters used in the array (PRIVATE)."""
+        import numpy
+        codes = numpy.flatnonzero(numpy.bincount(array.ravel(order="K"),
+                                                 minlength=256))
+        return [chr(code) for code in codes]
+
+    def _get_letter_counts(self, array, weights=None):
+        """Count each letter in each column of the alignment array (PRIVATE).
+
+        Returns a sorted list of the letters used in the alignment, and a
+        NumPy array with one row for each alignment column and one column
+        for each letter. This holds the number of sequences with that letter
+        in that column, or if weights are given, the sum of their weights.
+        """
+        import numpy
+        letters = self._get_present_letters(array)
+        size = len(letters)
+        lookup = numpy.zeros(256, numpy.intp)
+        for index, letter in enumerate(letters):
+            lookup[ord(letter)] = index
+        if weights is not None:
+            weights = numpy.asarray(weights, float)
+        rows, length = array.shape
+        counts = numpy.zeros((length, size))
+        # Count blocks of columns with a single bincount call each, using
+        # an offset of size per column, which bounds the temporary memory
+        step = max(1, 2 ** 20 // max(rows, 1))
+        for start in range(0, length, step):
+            block = lookup[array[:, start:start + step]]
+            width = block.shape[1]
+            block += size * numpy.arange(width)
+            if weights is None:
+                block_weights = None
+            else:
+                block_weights = numpy.repeat(weights, width)
+            block_counts = numpy.bincount(block.ravel(), block_weights,
+                                          size * width)
+            counts[start:start + width] = block_counts.reshape(width, size)
+        return letters, counts
+
+    def _array_consensus(self, array, threshold, ambiguous,
+                         require_multiple, skip_letters):
+        """Calculate a consensus string from the alignment array (PRIVATE).
+
+        This follows the same rules as dumb_consensus and gap_consensus,
+        ignoring any letters in skip_letters.
+        """
+        import numpy
+        letters, counts = self._get_letter_counts(array)
+        columns = [i for (i, letter) in enumerate(letters)
+                   if letter not in skip_letters]
+        if not columns:
+            return ambiguous * array.shape[1]
+        letters = [letters[i] for i in columns]
+        counts = counts[:, columns]
+        num_atoms = counts.sum(axis=1)
+        max_size = counts.max(axis=1)
+        # Only a single most common letter, found often enough
+        passed = (counts == max_size[:, None]).sum(axis=1) == 1
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            passed &= (max_size / num_atoms) >= threshold
+        passed &= num_atoms > 0
+        if require_multiple:
+            passed &= num_atoms != 1
+        best = counts.argmax(axis=1)
+        return "".join(letters[index] if ok else ambiguous
+                       for (index, ok) in zip(best.tolist(), passed.tolist()))
+
+    def _array_replacements(self, array, rep_dict, skip_items):
+        """Add the replacements in the alignment array to rep_dict (PRIVATE).
+
+        Like _pair_replacement, this counts each pair of residues in a
+        column once, ordered as (earlier record, later record), weighted by
+        the product of the record weights. Rather than looping over all the
+        pairs of records, we keep a running (weighted) count of the letters
+        in each column of the records seen so far, and combine that with
+        each new record using a single matrix product.
+        """
+        import numpy
+        letters = [letter for letter in self._get_present_letters(array)
+                   if letter not in skip_items]
+        if len(array) < 2:
+            return rep_dict
+        size = len(letters)
+        # Any skipped letters are mapped to an extra final column
+        lookup = numpy.empty(256, numpy.intp)
+        lookup.fill(size)
+        for index, letter in enumerate(letters):
+            lookup[ord(letter)] = index
+        identity = numpy.identity(size + 1)
+        seen = numpy.zeros((array.shape[1], size + 1))
+        totals = numpy.zeros((size + 1, size + 1))
+        for row, weight in zip(array, self._get_weights()):
+            letter_matrix = identity[lookup[row]]
+            totals += weight * seen.T.dot(letter_matrix)
+            seen += weight * letter_matrix
+        totals = totals.tolist()
+        for i, first_letter in enumerate(letters):
+            for j, second_letter in enumerate(letters):
+                if not totals[i][j]:
+                    continue
+                try:
+                    rep_dict[(first_letter, second_letter)] += totals[i][j]
+                except KeyError:
+                    raise ValueError("Residues %s, %s not found in alphabet %s"
+                                     % (first_letter, second_letter,
+                                        self.alignment._alphabet))
+        return rep_dict
+
+    def _array_info_content(self, array, letters, to_ignore, pseudo_count,
+                            e_freq_table, random_expected, log_base):
+        """Calculate the information content of each column of the array (PRIVATE).
+
+        This follows the same rules as _get_letter_freqs and
+        _get_column_info_content, returning a list of the values.
+        """
+        import numpy
+        rows, length = array.shape
+        if not length:
+            return []
+        if pseudo_count < 0:
+            raise ValueError("Positive value required for "
+                             "pseudo_count, %s provided" % (pseudo_count))
+        present, counts = self._get_letter_counts(array, self._get_weights())
+        for letter in present:
+            if letter not in to_ignore and letter not in letters:
+                raise ValueError("Residue %s not found in alphabet %s"
+                                 % (letter, self.alignment._alphabet))
+        gap_char = self._get_gap_char()
+        if e_freq_table:
+            for letter in letters:
+                if letter != gap_char and letter not in e_freq_table:
+                    raise ValueError("letters in current column %s "
+                                     "and not in expected frequency table %s"
+                                     % ([l for l in letters if l != gap_char],
+                                        list(e_freq_table)))
+
+        freqs = numpy.zeros((length, len(letters)))
+        for index, letter in enumerate(letters):
+            if letter in present:
+                freqs[:, index] = counts[:, present.index(letter)]
+        total_count = freqs.sum(axis=1)[:, None]
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            if pseudo_count and (random_expected or e_freq_table):
+                if e_freq_table:
+                    ajust_freq = numpy.array([e_freq_table[letter]
+                                              for letter in letters])
+                else:
+                    ajust_freq = random_expected
+                ajusted = ((freqs + ajust_freq * pseudo_count) /
+                           (total_count + pseudo_count))
+            else:
+                ajusted = freqs / total_count
+        # Columns which are entirely ignored characters stay at zero
+        freqs = numpy.where(total_count == 0, 0.0, ajusted)
+
+        # Gap characters do not have expected frequencies, and do not add
+        # to the information content
+        columns = [i for (i, letter) in enumerate(letters)
+                   if letter != gap_char]
+        if e_freq_table:
+            expected = numpy.array([e_freq_table[letters[i]]
+                                    for i in columns])
+        else:
+            expected = random_expected
+        obs_freq = freqs[:, columns]
+        inner_log = obs_freq / expected
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            letter_info = numpy.where(inner_log > 0,
+                                      (obs_freq * numpy.log(inner_log) /
+                                       math.log(log_base)),
+                                      0.0)
+        # Sum in Python to add up the values in the same order as before
+        return [sum(values, 0.0) for values in letter_info.tolist()]
+
     def get_column(self, col):
         # TODO - Deprecate this and implement slicing?
         return self.alignment[:, col]
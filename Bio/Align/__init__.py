@@ -11,6 +11,8 @@ class, used in the Bio.AlignIO module.
 """
 from __future__ import print_function
 
+from Bio._py3k import _as_bytes, _as_string
+
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio import Alphabet
@@ -165,6 +167,8 @@ class MultipleSeqAlignment(object):
             self._alphabet = Alphabet.single_letter_alphabet
 
         self._records = []
+        # Cached NumPy array of the letters, see the as_array method
+        self._array = None
         if records:
             self.extend(records)
             if alphabet is None:
@@ -427,6 +431,7 @@ class MultipleSeqAlignment(object):
         new_record.annotations['weight'] = weight
 
         self._records.append(new_record)
+        self._array = None
 
     def extend(self, records):
         """Add more SeqRecord objects to the alignment as rows.
@@ -554,6 +559,7 @@ class MultipleSeqAlignment(object):
         if not Alphabet._check_type_compatible([self._alphabet, record.seq.alphabet]):
             raise ValueError("New sequence's alphabet is incompatible")
         self._records.append(record)
+        self._array = None
 
     def __add__(self, other):
         """Combine two alignments with the same number of rows by adding them.
@@ -765,6 +771,9 @@ class MultipleSeqAlignment(object):
             return self._records[row_index][col_index]
         elif isinstance(col_index, int):
             # e.g. col_or_part_col = align[1:5, 6], gives a string
+            if self._array is not None:
+                # Column slices of the cached array are contiguous
+                return _as_string(self._array[row_index, col_index].tobytes())
             return "".join(rec[col_index] for rec in self._records[row_index])
         else:
             # e.g. sub_align = align[1:4, 5:7], gives another alignment
@@ -848,6 +857,58 @@ class MultipleSeqAlignment(object):
             self._records.sort(key=lambda r: r.id, reverse=reverse)
         else:
             self._records.sort(key=key, reverse=reverse)
+        self._array = None
+
+    def as_array(self):
+        """Return the alignment letters as a 2D NumPy array of uint8 values.
+
+        The array has one row per sequence and one column per alignment
+        column, holding the ASCII code of each letter (so a gap "-" is 45).
+        It is stored in column-major (Fortran) order, meaning each alignment
+        column is a contiguous block of memory. This makes it cheap to take
+        whole columns, or to apply NumPy operations column by column, e.g.
+        counting letters with numpy.apply_along_axis or comparing a column
+        to a letter code.
+
+        The array is built on the first call and cached, so calling this
+        again returns the same (read only) array without copying. While the
+        cache exists, extracting a column as a string (align[:, i]) uses it
+        rather than visiting every SeqRecord. The cache is discarded when
+        rows are added or sorted via the alignment's own methods. If you
+        modify the sequence of a row SeqRecord in place, the cached array
+        will NOT reflect that - create a new alignment instead. Other
+        Biopython code using the letters (such as SummaryInfo) does not
+        fill this cache.
+
+        This requires NumPy, and all the sequences must be the same length.
+        """
+        if self._array is None:
+            self._array = self._make_array()
+        return self._array
+
+    def _make_array(self):
+        """Build a new array of the alignment letters, as for as_array (PRIVATE).
+
+        This is not cached, so is used by the Biopython code working on the
+        letters (e.g. in Bio.Align.AlignInfo and Bio.Phylo) to see any
+        changes made to the records, and not to keep the array alive.
+        """
+        try:
+            import numpy
+        except ImportError:
+            from Bio import MissingPythonDependencyError
+            raise MissingPythonDependencyError(
+                "Install NumPy if you want to use "
+                "MultipleSeqAlignment.as_array")
+        rows = len(self._records)
+        length = self.get_alignment_length()
+        data = _as_bytes("".join(str(rec.seq) for rec in self._records))
+        if len(data) != rows * length:
+            raise ValueError("Sequences must all be the same length")
+        array = numpy.frombuffer(data, dtype=numpy.uint8)
+        array = numpy.asfortranarray(array.reshape(rows, length))
+        array.flags.writeable = False
+        return array
 
 
 if __name__ == "__main__":
@@ -32,6 +32,8 @@ For an inclusive end coordinate, we need to use ``end = start + size - 1``.
 A 1-column wide alignment would have ``start == end``.
 """
 import os
+from bisect import bisect_right
+from collections import OrderedDict
 from itertools import islice
 
 try:
@@ -42,13 +44,15 @@ except ImportError:
     # Still want to offer simple parsing/output
     _sqlite = None
 
+from Bio._py3k import _as_bytes, _bytes_to_string
 from Bio.Alphabet import single_letter_alphabet
+from Bio.File import _open_for_random_access
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.Align import MultipleSeqAlignment
 from .Interfaces import SequentialAlignmentWriter
 
-MAFINDEX_VERSION = 1
+MAFINDEX_VERSION = 2
 
 
 class MafWriter(SequentialAlignmentWriter):
@@ -234,15 +238,47 @@ def MafIterator(handle, seq_count=None, alphabet=single_letter_alphabet):
             break
 
 
+def _open_maf_for_random_access(filename):
+    """Open a MAF file in text mode, which may be BGZF compressed (PRIVATE)."""
+    with open(filename, "rb") as handle:
+        magic = handle.read(2)
+    if magic == b"\x1f\x8b":
+        # gzip magic number, so expect BGZF
+        from Bio import bgzf
+        try:
+            return bgzf.BgzfReader(filename, "r")
+        except ValueError:
+            raise ValueError("MAF file %s is compressed, but not BGZF format "
+                             "(e.g. using bgzip), so cannot be indexed" % filename)
+    return open(filename, "r")
+
+
 class MafIndex(object):
     """Index for a MAF file.
 
     The index is a sqlite3 database that is built upon creation of the object
     if necessary, and queried when methods *search* or *get_spliced* are
     used.
+
+    Newly built indexes record the location of every sequence in every
+    alignment block, not just the target sequence, so that *search* can also
+    be used with the coordinates of any other sequence (e.g. another species).
+    Indexes built by older versions of Biopython only cover the target
+    sequence, but can still be used for searching on it.
+
+    The MAF file may be compressed using BGZF (e.g. with the bgzip tool from
+    samtools/htslib), in which case the index records BGZF virtual offsets
+    and the blocks are decompressed on demand. Plain gzip compression is not
+    supported as it does not allow random access.
+
+    Optionally, parsed alignment blocks can be kept in a least recently used
+    cache of *cache_size* entries (by default there is no cache), so blocks
+    shared between overlapping queries are only parsed once. Note that this
+    means repeated searches may return the very same *MultipleSeqAlignment*
+    objects, which you should then not modify in place.
     """
 
-    def __init__(self, sqlite_file, maf_file, target_seqname):
+    def __init__(self, sqlite_file, maf_file, target_seqname, cache_size=0):
         """Indexes or loads the index of a MAF file."""
         self._target_seqname = target_seqname
         # example: Tests/MAF/ucsc_mm9_chr10.mafindex
@@ -252,7 +288,8 @@ class MafIndex(object):
         # example: Tests/MAF/ucsc_mm9_chr10.maf
         self._maf_file = maf_file
 
-        self._maf_fp = open(self._maf_file, "r")
+        # This will spot and decompress BGZF files
+        self._maf_fp = _open_maf_for_random_access(self._maf_file)
 
         # if sqlite_file exists, use the existing db, otherwise index the file
         if os.path.isfile(sqlite_file):
@@ -265,14 +302,19 @@ class MafIndex(object):
         # lastly, setup a MafIterator pointing at the open maf_file
         self._mafiter = MafIterator(self._maf_fp)
 
+        # least recently used cache of parsed blocks, keyed by offset
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+
     def __check_existing_db(self):
         """Perform basic sanity checks upon loading an existing index (PRIVATE)."""
         try:
             idx_version = int(self._con.execute(
                 "SELECT value FROM meta_data WHERE key = 'version'").fetchone()[0])
-            if idx_version != MAFINDEX_VERSION:
+            if idx_version not in (1, MAFINDEX_VERSION):
                 raise ValueError("Index version (%s) incompatible with "
                                  "this version of MafIndex" % idx_version)
+            self._index_version = idx_version
 
             filename = self._con.execute(
                 "SELECT value FROM meta_data WHERE key = 'filename'").fetchone()[0]
@@ -316,8 +358,10 @@ class MafIndex(object):
     def __make_new_index(self):
         """Read MAF file and generate SQLite index (PRIVATE)."""
         # make the tables
+        self._index_version = MAFINDEX_VERSION
         self._con.execute("CREATE TABLE meta_data (key TEXT, value TEXT);")
-        self._con.execute("INSERT INTO meta_data (key, value) VALUES ('version', 1);")
+        self._con.execute("INSERT INTO meta_data (key, value) VALUES ('version', %i);"
+                          % MAFINDEX_VERSION)
         self._con.execute("INSERT INTO meta_data (key, value) VALUES ('record_count', -1);")
         self._con.execute("INSERT INTO meta_data (key, value) VALUES ('target_seqname', '%s');" %
                           (self._target_seqname,))
@@ -344,6 +388,9 @@ class MafIndex(object):
         self._con.execute("INSERT INTO meta_data (key, value) VALUES ('filename', '%s');" %
                           (mafpath,))
         self._con.execute("CREATE TABLE offset_data (bin INTEGER, start INTEGER, end INTEGER, offset INTEGER);")
+        # Every sequence in every block, using forward strand coordinates
+        self._con.execute("CREATE TABLE seq_data (seqname TEXT, bin INTEGER, start INTEGER, "
+                          "end INTEGER, strand INTEGER, offset INTEGER);")
 
         insert_count = 0
 
@@ -357,7 +404,12 @@ class MafIndex(object):
 
             # batch is made from self.__maf_indexer(),
             self._con.executemany(
-                "INSERT INTO offset_data (bin, start, end, offset) VALUES (?,?,?,?);", batch)
+                "INSERT INTO offset_data (bin, start, end, offset) VALUES (?,?,?,?);",
+                [target_row for target_row, seq_rows in batch])
+            self._con.executemany(
+                "INSERT INTO seq_data (seqname, bin, start, end, strand, offset) "
+                "VALUES (?,?,?,?,?,?);",
+                [row for target_row, seq_rows in batch for row in seq_rows])
             self._con.commit()
             insert_count += len(batch)
 
@@ -365,6 +417,7 @@ class MafIndex(object):
         self._con.execute("CREATE INDEX IF NOT EXISTS bin_index ON offset_data(bin);")
         self._con.execute("CREATE INDEX IF NOT EXISTS start_index ON offset_data(start);")
         self._con.execute("CREATE INDEX IF NOT EXISTS end_index ON offset_data(end);")
+        self._con.execute("CREATE INDEX IF NOT EXISTS seq_bin_index ON seq_data(seqname, bin);")
 
         self._con.execute(
             "UPDATE meta_data SET value = '%s' WHERE key = 'record_count'" % (insert_count,))
@@ -376,42 +429,78 @@ class MafIndex(object):
     def __maf_indexer(self):
         """Return index information for each bundle (PRIVATE).
 
-        Yields index information for each bundle in the form of
-        (bin, start, end, offset) tuples where start and end are
-        0-based inclusive coordinates.
+        Yields index information for each bundle in the form of a
+        (bin, start, end, offset) tuple for the target sequence, where
+        start and end are 0-based inclusive coordinates, and a list of
+        (seqname, bin, start, end, strand, offset) tuples for all the
+        sequences in the bundle, with start and end on the forward strand.
+
+        The file is scanned in binary mode, so that the offsets are the
+        byte offsets in an uncompressed file, or the BGZF virtual offsets
+        in a compressed file.
         """
-        line = self._maf_fp.readline()
+        handle = _open_for_random_access(self._maf_file)
+        target_seqname = _as_bytes(self._target_seqname)
+
+        offset = handle.tell()
+        line = handle.readline()
 
         while line:
-            if line.startswith("a"):
-                # note the offset
-                offset = self._maf_fp.tell() - len(line)
+            if line.startswith(b"a"):
+                # the offset of this line was noted before reading it
+                target_row = None
+                seq_rows = []
 
-                # search the following lines for a match to target_seqname
+                # read the following lines up to the end of the bundle
                 while True:
-                    line = self._maf_fp.readline()
+                    next_offset = handle.tell()
+                    line = handle.readline()
 
-                    if not line.strip() or line.startswith("a"):
+                    if not line.strip() or line.startswith(b"a"):
                         # Empty line or new alignment record
-                        raise ValueError("Target for indexing (%s) not found in this bundle"
-                                         % (self._target_seqname,))
-                    elif line.startswith("s"):
+                        break
+                    elif line.startswith(b"s"):
                         # s (literal), src (ID), start, size, strand, srcSize, text (sequence)
                         line_split = line.strip().split()
+                        start = int(line_split[2])
+                        end = int(line_split[2]) + int(line_split[3])
 
-                        if line_split[1] == self._target_seqname:
-                            start = int(line_split[2])
-                            end = int(line_split[2]) + int(line_split[3])
-
-                            if end - start != len(line_split[6].replace("-", "")):
+                        if line_split[1] == target_seqname and target_row is None:
+                            if end - start != len(line_split[6].replace(b"-", b"")):
                                 raise ValueError("Invalid length for target coordinates (expected %s, found %s)" %
-                                                 (end - start, len(line_split[6].replace("-", ""))))
-
-                            yield (self._ucscbin(start, end), start, end, offset)
+                                                 (end - start, len(line_split[6].replace(b"-", b""))))
+
+                            target_row = (self._ucscbin(start, end), start, end, offset)
+
+                        if end == start:
+                            # Nothing from this sequence to search for
+                            continue
+                        if line_split[4] == b"-":
+                            strand = -1
+                            start, end = (int(line_split[5]) - end,
+                                          int(line_split[5]) - start)
+                        else:
+                            strand = 1
+                        seq_rows.append((_bytes_to_string(line_split[1]),
+                                         self._ucscbin(start, end),
+                                         start, end, strand, offset))
+
+                if target_row is None:
+                    handle.close()
+                    raise ValueError("Target for indexing (%s) not found in this bundle"
+                                     % (self._target_seqname,))
+
+                yield target_row, seq_rows
+
+                offset = next_offset
+                if line.startswith(b"a"):
+                    # Don't skip over the start of the next bundle
+                    continue
 
-                            break
+            offset = handle.tell()
+            line = handle.readline()
 
-            line = self._maf_fp.readline()
+        handle.close()
 
     # TODO: check coordinate correctness for the two bin-related static methods
     @staticmethod
@@ -456,11 +545,106 @@ class MafIndex(object):
         return 0
 
     def _get_record(self, offset):
-        """Retrieve a single MAF record located at the offset provided (PRIVATE)."""
+        """Retrieve a single MAF record located at the offset provided (PRIVATE).
+
+        Recently used records are returned from the cache.
+        """
+        cache = self._cache
+        if offset in cache:
+            # Move to the end, as the most recently used
+            record = cache.pop(offset)
+            cache[offset] = record
+            return record
         self._maf_fp.seek(offset)
-        return next(self._mafiter)
+        record = next(self._mafiter)
+        if self._cache_size:
+            cache[offset] = record
+            if len(cache) > self._cache_size:
+                # Drop the least recently used
+                cache.popitem(last=False)
+        return record
+
+    @staticmethod
+    def _check_exons(starts, ends):
+        """Verify the provided exon coordinates (PRIVATE)."""
+        if len(starts) != len(ends):
+            raise ValueError("Every position in starts must have a match in ends")
+
+        for exonstart, exonend in zip(starts, ends):
+            if exonstart >= exonend:
+                raise ValueError("Exon coordinates invalid (%s >= %s)" % (exonstart, exonend))
+
+    def _query_rows(self, exonstart, exonend, seqname=None):
+        """Return (start, end, offset) rows for records overlapping a region (PRIVATE).
+
+        The rows are sorted by start, then end, then offset.
+        """
+        try:
+            possible_bins = ", ".join(map(str, self._region2bin(exonstart, exonend)))
+        except TypeError:
+            raise TypeError("Exon coordinates must be integers "
+                            "(start=%d, end=%d)" % (exonstart, exonend))
+
+        # https://www.sqlite.org/lang_expr.html
+        # -----
+        # The BETWEEN operator
+        #
+        # The BETWEEN operator is logically equivalent to a pair of
+        # comparisons. "x BETWEEN y AND z" is equivalent to "x>=y AND x<=z"
+        # except that with BETWEEN, the x expression is only evaluated
+        # once. The precedence of the BETWEEN operator is the same as the
+        # precedence as operators == and != and LIKE and groups left to
+        # right.
+        # -----
+
+        if seqname is None or seqname == self._target_seqname:
+            result = self._con.execute(
+                "SELECT DISTINCT start, end, offset FROM "
+                "offset_data WHERE bin IN (%s) AND (end BETWEEN %s AND %s "
+                "OR %s BETWEEN start AND end) ORDER BY start, end, "
+                "offset ASC;"
+                % (possible_bins, exonstart, exonend, exonend))
+        elif self._index_version < 2:
+            raise ValueError("This index only covers %s, please rebuild it "
+                             "to search on %s" % (self._target_seqname, seqname))
+        else:
+            result = self._con.execute(
+                "SELECT DISTINCT start, end, offset FROM "
+                "seq_data WHERE seqname = ? AND bin IN (%s) AND (end BETWEEN %s AND %s "
+                "OR %s BETWEEN start AND end) ORDER BY start, end, "
+                "offset ASC;"
+                % (possible_bins, exonstart, exonend, exonend), (seqname,))
+
+        return result.fetchall()
+
+    def _check_record(self, fetched, seqname, rec_start, rec_end, offset):
+        """Check the fetched record has the expected coordinates (PRIVATE)."""
+        if seqname is None or seqname == self._target_seqname:
+            for record in fetched:
+                if record.id == self._target_seqname:
+                    # start and size come from the maf lines
+                    start = record.annotations["start"]
+                    end = record.annotations["start"] + record.annotations["size"]
+
+                    if not (start == rec_start and end == rec_end):
+                        raise ValueError("Expected %s-%s @ offset %s, found %s-%s" %
+                                         (rec_start, rec_end, offset, start, end))
+        else:
+            for record in fetched:
+                if record.id == seqname:
+                    # the index holds forward strand coordinates
+                    start = record.annotations["start"]
+                    end = record.annotations["start"] + record.annotations["size"]
+                    if record.annotations["strand"] == -1:
+                        start, end = (record.annotations["srcSize"] - end,
+                                      record.annotations["srcSize"] - start)
+                    if start == rec_start and end == rec_end:
+                        break
+            else:
+                raise ValueError("Expected %s %s-%s @ offset %s, not found" %
+                                 (seqname, rec_start, rec_end, offset))
 
-    def search(self, starts, ends):
+    def search(self, starts, ends, seqname=None):
         """Search index database for MAF records overlapping ranges provided.
 
         Returns *MultipleSeqAlignment* results in order by start, then end, then
@@ -470,70 +654,106 @@ class MafIndex(object):
         *ends* should be the list of the corresponding segment ends
         (in the half-open UCSC convention:
         http://genome.ucsc.edu/blog/the-ucsc-genome-browser-coordinate-counting-systems/).
+
+        By default the coordinates are on the target sequence. Optional
+        argument *seqname* gives another sequence in the MAF file to search
+        on instead, using forward strand coordinates (this requires an index
+        built by this version of Biopython, or later).
         """
         # verify the provided exon coordinates
-        if len(starts) != len(ends):
-            raise ValueError("Every position in starts must have a match in ends")
-
-        for exonstart, exonend in zip(starts, ends):
-            if exonstart >= exonend:
-                raise ValueError("Exon coordinates invalid (%s >= %s)" % (exonstart, exonend))
-        con = self._con
+        self._check_exons(starts, ends)
 
         # Keep track of what blocks have already been yielded
         # in order to avoid duplicating them
         # (see https://github.com/biopython/biopython/issues/1083)
-        yielded_rec_coords = set([])
+        # using their offsets, as a block may hold the sequence searched
+        # on more than once
+        yielded_offsets = set([])
         # search for every exon
         for exonstart, exonend in zip(starts, ends):
-            try:
-                possible_bins = ", ".join(map(str, self._region2bin(exonstart, exonend)))
-            except TypeError:
-                raise TypeError("Exon coordinates must be integers "
-                                "(start=%d, end=%d)" % (exonstart, exonend))
-
-            # https://www.sqlite.org/lang_expr.html
-            # -----
-            # The BETWEEN operator
-            #
-            # The BETWEEN operator is logically equivalent to a pair of
-            # comparisons. "x BETWEEN y AND z" is equivalent to "x>=y AND x<=z"
-            # except that with BETWEEN, the x expression is only evaluated
-            # once. The precedence of the BETWEEN operator is the same as the
-            # precedence as operators == and != and LIKE and groups left to
-            # right.
-            # -----
-
-            result = con.execute("SELECT DISTINCT start, end, offset FROM "
-                                 "offset_data WHERE bin IN (%s) AND (end BETWEEN %s AND %s "
-                                 "OR %s BETWEEN start AND end) ORDER BY start, end, "
-                                 "offset ASC;"
-                                 % (possible_bins, exonstart, exonend, exonend))
-
-            rows = result.fetchall()
+            rows = self._query_rows(exonstart, exonend, seqname)
 
             for rec_start, rec_end, offset in rows:
                 # Avoid yielding multiple time the same block
-                if (rec_start, rec_end) in yielded_rec_coords:
+                if offset in yielded_offsets:
                     continue
                 else:
-                    yielded_rec_coords.add((rec_start, rec_end))
+                    yielded_offsets.add(offset)
                 # Iterate through hits, fetching alignments from the MAF file
                 # and checking to be sure we've retrieved the expected record.
 
                 fetched = self._get_record(int(offset))
+                self._check_record(fetched, seqname, rec_start, rec_end, offset)
 
-                for record in fetched:
-                    if record.id == self._target_seqname:
-                        # start and size come from the maf lines
-                        start = record.annotations["start"]
-                        end = record.annotations["start"] + record.annotations["size"]
+                yield fetched
 
-                        if not (start == rec_start and end == rec_end):
-                            raise ValueError("Expected %s-%s @ offset %s, found %s-%s" %
-                                             (rec_start, rec_end, offset, start, end))
+    def batch_search(self, regions, seqname=None):
+        """Search index database for MAF records overlapping many sets of ranges.
 
-                yield fetched
+        *regions* should be a list of (starts, ends) pairs, each as would be
+        given to the *search* method. Returns a list holding a list of
+        *MultipleSeqAlignment* objects for each pair, in the same order, giving
+        the same results as calling *search* on each pair in turn.
+
+        The ranges from all the pairs are first sorted and merged, so that
+        the index database is queried once per merged region, and each
+        alignment block is read from the MAF file (in file order) and parsed
+        only once however many of the ranges it overlaps.
+        """
+        regions = [(list(starts), list(ends)) for starts, ends in regions]
+        for starts, ends in regions:
+            self._check_exons(starts, ends)
+
+        # Sort and merge all the ranges (including those just touching, as
+        # the search includes blocks which end where a range starts)
+        merged_starts = []
+        merged_ends = []
+        for exonstart, exonend in sorted(set((exonstart, exonend)
+                                              for starts, ends in regions
+                                              for exonstart, exonend in zip(starts, ends))):
+            if merged_ends and exonstart <= merged_ends[-1]:
+                merged_ends[-1] = max(merged_ends[-1], exonend)
+            else:
+                merged_starts.append(exonstart)
+                merged_ends.append(exonend)
+
+        # Any block matching one of the ranges also matches the merged
+        # region containing it, so query each merged region once
+        merged_rows = [self._query_rows(merged_start, merged_end, seqname)
+                       for merged_start, merged_end in zip(merged_starts, merged_ends)]
+
+        # Pick out the rows for each set of ranges
+        region_rows = []
+        for starts, ends in regions:
+            wanted = []
+            yielded_offsets = set([])
+            for exonstart, exonend in zip(starts, ends):
+                rows = merged_rows[bisect_right(merged_starts, exonstart) - 1]
+                for row in rows:
+                    rec_start, rec_end, offset = row
+                    # Apply the same test as the SQL query in _query_rows
+                    if not (exonstart <= rec_end <= exonend or
+                            rec_start <= exonend <= rec_end):
+                        continue
+                    # Avoid returning multiple time the same block
+                    if offset in yielded_offsets:
+                        continue
+                    yielded_offsets.add(offset)
+                    wanted.append(row)
+            region_rows.append(wanted)
+
+        # Parse every block needed, once, reading them in file order
+        blocks = {}
+        for rows in region_rows:
+            for row in rows:
+                blocks.setdefault(row[2], row)
+        for key in sorted(blocks, key=int):
+            rec_start, rec_end, offset = blocks[key]
+            fetched = self._get_record(int(offset))
+            self._check_record(fetched, seqname, rec_start, rec_end, offset)
+            blocks[key] = fetched
+
+        return [[blocks[row[2]] for row in rows] for rows in region_rows]
 
     def get_spliced(self, starts, ends, strand=1):
         """Return a multiple alignment of the exact sequence range provided.
@@ -558,6 +778,60 @@ class MafIndex(object):
         # pull all alignments that span the desired intervals
         fetched = [multiseq for multiseq in self.search(starts, ends)]
 
+        return self._splice(fetched, starts, ends, strand)
+
+    def batch_get_spliced(self, transcripts, processes=1):
+        """Return a list of spliced multiple alignments, one for each transcript.
+
+        *transcripts* should be a list of (starts, ends, strand) tuples, each
+        as would be given to the *get_spliced* method, and the results are
+        returned in the same order. The strand may be omitted, giving
+        (starts, ends) pairs, in which case it is taken as 1.
+
+        With the default of one process, the alignment blocks for all the
+        transcripts are fetched together using *batch_search*. Otherwise
+        the transcripts are divided between the given number of worker
+        processes (or one per CPU if this is None), each of which opens the
+        index file for itself. This requires the index to be stored in a
+        file (rather than an in memory database).
+        """
+        transcripts = [tuple(transcript) if len(transcript) == 3
+                       else tuple(transcript) + (1,)
+                       for transcript in transcripts]
+        for starts, ends, strand in transcripts:
+            if strand not in (1, -1):
+                raise ValueError("Strand must be 1 or -1, got %s" % str(strand))
+
+        if processes == 1 or len(transcripts) < 2:
+            fetched = self.batch_search([(starts, ends)
+                                         for starts, ends, strand in transcripts])
+            return [self._splice(multiseqs, starts, ends, strand)
+                    for multiseqs, (starts, ends, strand) in zip(fetched, transcripts)]
+
+        import multiprocessing
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        # Give each worker a few contiguous chunks, so that neighbouring
+        # transcripts (which often share blocks) are spliced together
+        chunk_size = max(1, len(transcripts) // (4 * processes))
+        chunks = [transcripts[i:i + chunk_size]
+                  for i in range(0, len(transcripts), chunk_size)]
+        pool = multiprocessing.Pool(processes, _init_splice_worker,
+                                    (self._index_filename, self._maf_file,
+                                     self._target_seqname, self._cache_size))
+        try:
+            results = pool.map(_splice_worker, chunks)
+        finally:
+            pool.close()
+            pool.join()
+        return [multiseq for chunk in results for multiseq in chunk]
+
+    def _splice(self, fetched, starts, ends, strand):
+        """Splice the given alignment blocks into a single alignment (PRIVATE).
+
+        This does the work for the *get_spliced* method.
+        """
         # keep track of the expected letter count
         # (sum of lengths of [start, end) segments,
         # where [start, end) half-open)
@@ -710,9 +984,25 @@ class MafIndex(object):
         return MultipleSeqAlignment(result_multiseq)
 
     def __repr__(self):
-        return "MafIO.MafIndex(%r, target_seqname=%r)" % (self._maf_fp.name,
+        return "MafIO.MafIndex(%r, target_seqname=%r)" % (self._maf_file,
                                                           self._target_seqname)
 
     def __len__(self):
         """Return the number of records in the index."""
         return self._record_count
+
+
+# The following are used by MafIndex.batch_get_spliced to share the
+# work between processes, and so must be at the top level of the module.
+_worker_index = None
+
+
+def _init_splice_worker(sqlite_file, maf_file, target_seqname, cache_size):
+    """Open the MAF index in a worker process (PRIVATE)."""
+    global _worker_index
+    _worker_index = MafIndex(sqlite_file, maf_file, target_seqname, cache_size)
+
+
+def _splice_worker(transcripts):
+    """Return spliced alignments for a list of transcripts (PRIVATE)."""
+    return _worker_index.batch_get_spliced(transcripts)
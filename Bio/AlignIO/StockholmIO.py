@@ -139,6 +139,7 @@ from collections import OrderedDict
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.Align import MultipleSeqAlignment
+from Bio.Alphabet import single_letter_alphabet
 from .Interfaces import AlignmentIterator, SequentialAlignmentWriter
 
 
@@ -302,6 +303,18 @@ class StockholmIterator(AlignmentIterator):
 
     For consistency with BioPerl and EMBOSS we call this the "stockholm"
     format.
+
+    Sequences are collected as lists of line fragments which are only joined
+    once the whole alignment has been read, and the per-residue "#=GR" markup
+    can be skipped entirely using the letter_annotations argument. For large
+    families (e.g. from a full PFAM dump) where only the sequences are wanted,
+    this keeps the memory needed close to the size of the alignment itself:
+
+    >>> from Bio.AlignIO.StockholmIO import StockholmIterator
+    >>> with open("Stockholm/simple.sth") as handle:
+    ...     for align in StockholmIterator(handle, letter_annotations=False):
+    ...         print(align[0].letter_annotations)
+    {}
     """
 
     # These dictionaries should be kept in sync with those
@@ -320,6 +333,26 @@ class StockholmIterator(AlignmentIterator):
 
     _header = None  # for caching lines between __next__ calls
 
+    def __init__(self, handle, seq_count=None,
+                 alphabet=single_letter_alphabet, letter_annotations=True):
+        """Create a StockholmIterator object.
+
+        Arguments:
+         - handle   - input file
+         - seq_count - optional, expected number of records per alignment
+         - alphabet - optional, e.g. Bio.Alphabet.generic_protein
+         - letter_annotations - optional, which "#=GR" per-residue features
+           to keep as SeqRecord letter annotations. Default True keeps them
+           all, False keeps none, or give a collection of the feature codes
+           wanted (e.g. ["SS"] for just the secondary structure).
+
+        """
+        AlignmentIterator.__init__(self, handle, seq_count, alphabet)
+        if letter_annotations is True or letter_annotations is False:
+            self._gr_features = letter_annotations
+        else:
+            self._gr_features = frozenset(letter_annotations)
+
     def __next__(self):
         """Parse the next alignment from the handle."""
         handle = self.handle
@@ -343,11 +376,14 @@ class StockholmIterator(AlignmentIterator):
         # We do not check for this - perhaps we should, and verify that
         # if present it agrees with our parsing.
 
+        # Sequences and GR data are held as lists of fragments (one per
+        # interlaced block) and joined once at the end of the alignment.
         seqs = {}
         ids = OrderedDict()  # Really only need an OrderedSet, but python lacks this
         gs = {}
         gr = {}
         gf = {}
+        gr_features = self._gr_features
         passed_end_alignment = False
         while True:
             line = handle.readline()
@@ -377,8 +413,9 @@ class StockholmIterator(AlignmentIterator):
                 seq_id, seq = parts
                 if seq_id not in ids:
                     ids[seq_id] = True
-                seqs.setdefault(seq_id, '')
-                seqs[seq_id] += seq.replace(".", "-")
+                    seqs[seq_id] = [seq.replace(".", "-")]
+                else:
+                    seqs[seq_id].append(seq.replace(".", "-"))
             elif len(line) >= 5:
                 # Comment line or meta-data
                 if line[:5] == "#=GF ":
@@ -410,20 +447,33 @@ class StockholmIterator(AlignmentIterator):
                 elif line[:5] == "#=GR ":
                     # Generic per-Sequence AND per-Column markup
                     # Format: "#=GR <seqname> <feature> <exactly 1 char per column>"
+                    if not gr_features:
+                        # Caller does not want any per-residue annotation
+                        continue
                     seq_id, feature, text = line[5:].strip().split(None, 2)
+                    if gr_features is not True and feature not in gr_features:
+                        continue
                     # if seq_id not in ids:
                     #    ids.append(seq_id)
                     if seq_id not in gr:
                         gr[seq_id] = {}
                     if feature not in gr[seq_id]:
-                        gr[seq_id][feature] = ""
-                    gr[seq_id][feature] += text.strip()  # append to any previous entry
+                        gr[seq_id][feature] = [text.strip()]
+                    else:
+                        # append to any previous entry
+                        gr[seq_id][feature].append(text.strip())
                     # TODO - Should we check the length matches the alignment length?
                     #       For iterlaced sequences the GR data can be split over
                     #       multiple lines
             # Next line...
 
         assert len(seqs) <= len(ids)
+
+        for seq_id in seqs:
+            seqs[seq_id] = "".join(seqs[seq_id])
+        for seq_col_data in gr.values():
+            for feature in seq_col_data:
+                seq_col_data[feature] = "".join(seq_col_data[feature])
         # assert len(gs)   <= len(ids)
         # assert len(gr)   <= len(ids)
 
@@ -55,6 +55,28 @@ different multiple sequence alignments as possible.  One common example
 is the output of the tool seqboot in the PHLYIP suite.  Sometimes there
 can be a file header and footer, as seen in the EMBOSS alignment output.
 
+Input - Alignment Dictionaries
+------------------------------
+For large files holding many alignments, such as the PFAM or RFAM Stockholm
+files, parsing everything to reach the alignment you want is slow. Instead,
+like Bio.SeqIO, you can use Bio.AlignIO.index(...) to scan the file once
+recording where each alignment starts, and get back a read only dictionary
+like object. Only the alignments you ask for are parsed:
+
+>>> from Bio import AlignIO
+>>> alignments = AlignIO.index("Stockholm/funny.sth", "stockholm")
+>>> list(alignments)
+['PF00571']
+>>> print(len(alignments["PF00571"]))
+6
+>>> alignments.close()
+
+Stockholm alignments are keyed on their "#=GF AC" accession (or "#=GF ID"
+line if there is no accession), while for file formats without an alignment
+identifier the keys are the position of each alignment in the file ("0",
+"1", ...). The related Bio.AlignIO.index_db(...) function stores the index
+in an SQLite database, and can index several files at once.
+
 Output
 ------
 Use the function Bio.AlignIO.write(...), which takes a complete set of
@@ -442,6 +464,145 @@ def read(handle, format, seq_count=None, alphabet=None):
     return first
 
 
+def index(filename, format, seq_count=None, alphabet=None,
+          key_function=None):
+    """Index an alignment file and return a dictionary like object.
+
+    Arguments:
+     - filename - string giving name of file to be indexed
+     - format   - lower case string describing the file format
+     - seq_count - Optional integer, number of sequences expected in each
+       alignment. Required to index a FASTA file holding several
+       alignments, otherwise the whole file is one alignment.
+     - alphabet - optional Alphabet object, useful when the sequence type
+       cannot be automatically inferred from the file itself
+       (e.g. fasta, phylip, clustal)
+     - key_function - Optional callback function which when given an
+       alignment identifier string should return a unique key for the
+       dictionary.
+
+    This indexing function will return a dictionary like object, giving the
+    MultipleSeqAlignment objects as values. Stockholm alignments (as used by
+    PFAM and RFAM) are keyed by the "#=GF AC" accession line, or if missing
+    the "#=GF ID" line. The other supported formats (clustal, fasta, nexus,
+    phylip, phylip-relaxed and phylip-sequential) have no identifier for
+    each alignment, so the keys are the position of each alignment in the
+    file as a string, counting from zero.
+
+    >>> from Bio import AlignIO
+    >>> alignments = AlignIO.index("Stockholm/funny.sth", "stockholm")
+    >>> len(alignments)
+    1
+    >>> print(alignments["PF00571"][0].id)
+    O83071/192-246
+    >>> alignments.close()
+
+    When you call the index function, it will scan through the file, noting
+    the location of each alignment. When you access a particular alignment
+    via the dictionary methods, the code will jump to the appropriate part
+    of the file and then parse just that section. As with Bio.SeqIO.index,
+    BGZF compressed files are detected automatically.
+
+    See Also: Bio.AlignIO.index_db() and Bio.SeqIO.index()
+    """
+    # Try and give helpful error messages:
+    if not isinstance(filename, basestring):
+        raise TypeError("Need a filename (not a handle)")
+    if not isinstance(format, basestring):
+        raise TypeError("Need a string for the file format (lower case)")
+    if not format:
+        raise ValueError("Format required (lower case string)")
+    if format != format.lower():
+        raise ValueError("Format string '%s' should be lower case" % format)
+    if alphabet is not None and not (isinstance(alphabet, Alphabet) or
+                                     isinstance(alphabet, AlphabetEncoder)):
+        raise ValueError("Invalid alphabet, %r" % alphabet)
+    if seq_count is not None and not isinstance(seq_count, int):
+        raise TypeError("Need integer for seq_count (sequences per alignment)")
+
+    # Map the file format to a random access proxy:
+    from ._index import _FormatToMarker  # Lazy import
+    from ._index import AlignmentFileRandomAccess, _IndexedAlignmentFileDict
+    if format not in _FormatToMarker:
+        raise ValueError("Unsupported format %r" % format)
+    repr = "AlignIO.index(%r, %r, seq_count=%r, alphabet=%r, key_function=%r)" \
+        % (filename, format, seq_count, alphabet, key_function)
+    return _IndexedAlignmentFileDict(
+        AlignmentFileRandomAccess(filename, format, seq_count, alphabet),
+        key_function, repr, "MultipleSeqAlignment")
+
+
+def index_db(index_filename, filenames=None, format=None, seq_count=None,
+             alphabet=None, key_function=None):
+    """Index several alignment files and return a dictionary like object.
+
+    The index is stored in an SQLite database rather than in memory (as in the
+    Bio.AlignIO.index(...) function), using the same layout as the
+    Bio.SeqIO.index_db(...) function.
+
+    Arguments:
+     - index_filename - Where to store the SQLite index
+     - filenames - list of strings specifying file(s) to be indexed, or when
+       indexing a single file this can be given as a string.
+       (optional if reloading an existing index, but must match)
+     - format   - lower case string describing the file format
+       (optional if reloading an existing index, but must match)
+     - seq_count - Optional integer, number of sequences expected in each
+       alignment (see Bio.AlignIO.index).
+     - alphabet - optional Alphabet object, useful when the sequence type
+       cannot be automatically inferred from the file itself
+       (e.g. fasta, phylip, clustal)
+     - key_function - Optional callback function which when given an
+       alignment identifier string should return a unique key for the
+       dictionary.
+
+    The keys are the same as used by Bio.AlignIO.index(...), so note that
+    when indexing several files in a format without alignment identifiers
+    you will need a key_function to avoid duplicate keys.
+
+    See Also: Bio.AlignIO.index() and Bio.SeqIO.index_db()
+    """
+    # Try and give helpful error messages:
+    if not isinstance(index_filename, basestring):
+        raise TypeError("Need a string for the index filename")
+    if isinstance(filenames, basestring):
+        # Make the API a little more friendly, and more similar
+        # to Bio.AlignIO.index(...) for indexing just one file.
+        filenames = [filenames]
+    if filenames is not None and not isinstance(filenames, list):
+        raise TypeError(
+            "Need a list of filenames (as strings), or one filename")
+    if format is not None and not isinstance(format, basestring):
+        raise TypeError("Need a string for the file format (lower case)")
+    if format and format != format.lower():
+        raise ValueError("Format string '%s' should be lower case" % format)
+    if alphabet is not None and not (isinstance(alphabet, Alphabet) or
+                                     isinstance(alphabet, AlphabetEncoder)):
+        raise ValueError("Invalid alphabet, %r" % alphabet)
+    if seq_count is not None and not isinstance(seq_count, int):
+        raise TypeError("Need integer for seq_count (sequences per alignment)")
+
+    # Map the file format to a random access proxy:
+    from ._index import _FormatToMarker  # Lazy import
+    from ._index import AlignmentFileRandomAccess, _SQLiteManyAlignmentFilesDict
+    repr = "AlignIO.index_db(%r, filenames=%r, format=%r, seq_count=%r, " \
+           "alphabet=%r, key_function=%r)" \
+           % (index_filename, filenames, format, seq_count, alphabet,
+              key_function)
+
+    def proxy_factory(format, filename=None):
+        """Given a filename returns proxy object, else boolean if format OK."""
+        if filename:
+            return AlignmentFileRandomAccess(filename, format, seq_count,
+                                             alphabet)
+        else:
+            return format in _FormatToMarker
+
+    return _SQLiteManyAlignmentFilesDict(index_filename, filenames,
+                                         proxy_factory, format,
+                                         key_function, repr)
+
+
 def convert(in_file, in_format, out_file, out_format, alphabet=None):
     """Convert between two alignment files, returns number of alignments.
 
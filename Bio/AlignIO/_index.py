@@ -0,0 +1,179 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Dictionary like indexing of alignment files (PRIVATE).
+
+You are not expected to access this module, or any of its code, directly. This
+is all handled internally by the Bio.AlignIO.index(...) and index_db(...)
+functions which are the public interface for this functionality.
+
+This follows the same approach as the indexing in Bio.SeqIO. We scan over the
+file looking for the line which starts each alignment (e.g. "# STOCKHOLM 1.0"
+or "CLUSTAL"), and record the file offset and length of each alignment block
+against its identifier. The blocks are only parsed into MultipleSeqAlignment
+objects on demand.
+
+Few alignment file formats give each alignment an identifier. For Stockholm
+files (e.g. from PFAM or RFAM) we use the accession from the "#=GF AC" line,
+or failing that the "#=GF ID" line. Otherwise, each alignment is keyed by
+its position in the file as a string (counting from zero, "0", "1", ...).
+"""
+
+from __future__ import print_function
+
+import re
+
+from Bio._py3k import StringIO
+from Bio._py3k import _bytes_to_string
+
+from Bio.File import _IndexedSeqFileProxy, _open_for_random_access
+from Bio.File import _IndexedSeqFileDict, _SQLiteManySeqFilesDict
+
+
+class AlignmentFileRandomAccess(_IndexedSeqFileProxy):
+    """Random access to the alignments in a file (PRIVATE).
+
+    Each alignment starts with a marker line. For FASTA files a record
+    starts with the marker, and the alignments are made up of seq_count
+    records (or if seq_count is not given, the whole file is one alignment).
+    """
+
+    def __init__(self, filename, format, seq_count, alphabet):
+        self._handle = _open_for_random_access(filename)
+        self._format = format
+        self._seq_count = seq_count
+        self._alphabet = alphabet
+        self._marker_re = _FormatToMarker[format]
+        if format == "fasta":
+            # This will be None if no seq_count was given
+            self._markers_per_alignment = seq_count
+        else:
+            self._markers_per_alignment = 1
+        # Lines giving the alignment identifier, in order of preference
+        self._identifier_tags = _FormatToIdentifierTags.get(format, ())
+
+    def __iter__(self):
+        """Return (identifier, offset, length) tuples."""
+        marker_re = self._marker_re
+        markers_per_alignment = self._markers_per_alignment
+        tags = self._identifier_tags
+        handle = self._handle
+        handle.seek(0)
+        # Skip any header before first alignment
+        while True:
+            start_offset = handle.tell()
+            line = handle.readline()
+            if marker_re.match(line) or not line:
+                break
+        count = 0
+        # Should now be at the start of an alignment, or end of the file
+        while marker_re.match(line):
+            length = len(line)
+            markers = 1
+            identifiers = {}
+            while True:
+                end_offset = handle.tell()
+                line = handle.readline()
+                if not line:
+                    break
+                if marker_re.match(line):
+                    if markers == markers_per_alignment:
+                        break
+                    markers += 1
+                elif tags and line[:1] == b"#":
+                    for tag in tags:
+                        if line.startswith(tag) and tag not in identifiers:
+                            identifiers[tag] = line[len(tag):].strip()
+                # Track this explicitly as can't do file offset difference on BGZF
+                length += len(line)
+            for tag in tags:
+                if tag in identifiers:
+                    key = _bytes_to_string(identifiers[tag])
+                    break
+            else:
+                key = str(count)
+            yield key, start_offset, length
+            start_offset = end_offset
+            count += 1
+        assert not line, repr(line)
+
+    def get(self, offset):
+        """Return the alignment starting at the given offset."""
+        from Bio import AlignIO
+        handle = StringIO(_bytes_to_string(self.get_raw(offset)))
+        return next(AlignIO.parse(handle, self._format,
+                                  self._seq_count, self._alphabet))
+
+    def get_raw(self, offset):
+        """Return the raw alignment from the file as a bytes string."""
+        marker_re = self._marker_re
+        markers_per_alignment = self._markers_per_alignment
+        handle = self._handle
+        handle.seek(offset)
+        lines = [handle.readline()]
+        markers = 1
+        while True:
+            line = handle.readline()
+            if not line:
+                break
+            if marker_re.match(line):
+                if markers == markers_per_alignment:
+                    # Start of next alignment => end of this alignment
+                    break
+                markers += 1
+            lines.append(line)
+        return b"".join(lines)
+
+
+class _IndexedAlignmentFileDict(_IndexedSeqFileDict):
+    """Read only dictionary interface to the alignments in a file (PRIVATE).
+
+    Unlike the SeqRecord objects in Bio.SeqIO, a MultipleSeqAlignment has no
+    identifier, so the key cannot be double checked after parsing.
+    """
+
+    def __getitem__(self, key):
+        """Return alignment for the specified key."""
+        # Pass the offset to the proxy
+        return self._proxy.get(self._offsets[key])
+
+
+class _SQLiteManyAlignmentFilesDict(_SQLiteManySeqFilesDict):
+    """Read only dictionary interface to the alignments in many files (PRIVATE).
+
+    Uses the same SQLite index layout as Bio.SeqIO.index_db, but again does
+    not double check the key after parsing.
+    """
+
+    def __getitem__(self, key):
+        """Return alignment for the specified key."""
+        row = self._con.execute(
+            "SELECT file_number, offset FROM offset_data WHERE key=?;",
+            (key,)).fetchone()
+        if not row:
+            raise KeyError
+        file_number, offset = row
+        proxies = self._proxies
+        if file_number not in proxies:
+            if len(proxies) >= self._max_open:
+                # Close an old handle...
+                proxies.popitem()[1]._handle.close()
+            # Open a new handle...
+            proxies[file_number] = self._proxy_factory(
+                self._format, self._filenames[file_number])
+        return proxies[file_number].get(offset)
+
+
+_FormatToMarker = {
+    "clustal": re.compile(b"^(CLUSTAL|PROBCONS|MUSCLE|MSAPROBS|Kalign)"),
+    "fasta": re.compile(b"^>"),
+    "nexus": re.compile(b"^#NEXUS", re.IGNORECASE),
+    "phylip": re.compile(b"^\\s*\\d+\\s+\\d+\\s*$"),
+    "phylip-relaxed": re.compile(b"^\\s*\\d+\\s+\\d+\\s*$"),
+    "phylip-sequential": re.compile(b"^\\s*\\d+\\s+\\d+\\s*$"),
+    "stockholm": re.compile(b"^# STOCKHOLM 1.0"),
+}
+
+_FormatToIdentifierTags = {
+    "stockholm": (b"#=GF AC ", b"#=GF ID "),
+}
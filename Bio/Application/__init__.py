@@ -18,6 +18,10 @@ These modules provide wrapper classes for command line tools to help you
 construct command line strings by setting the values of each parameter.
 The finished command line strings are then normally invoked via the built-in
 Python module subprocess.
+
+To run many wrapped commands at once (for example one per input file), the
+CommandlineRunner class runs them through a fixed size pool of threads, with
+optional timeouts and retries, and reports the output and timings of each.
 """
 from __future__ import print_function
 from Bio._py3k import basestring
@@ -27,6 +31,9 @@ import platform
 import sys
 import subprocess
 import re
+import signal
+import threading
+import time
 
 from subprocess import CalledProcessError as _ProcessCalledError
 
@@ -460,6 +467,23 @@ class AbstractCommandline(object):
         any stdout and stderr strings captured as attributes of the exception
         object, since they may be useful for diagnosing what went wrong.
         """
+        return_code, stdout_str, stderr_str, timed_out = self._run(
+            stdin, stdout, stderr, cwd, env)
+        if return_code:
+            raise ApplicationError(return_code, str(self),
+                                   stdout_str, stderr_str)
+        return stdout_str, stderr_str
+
+    def _run(self, stdin=None, stdout=True, stderr=True,
+             cwd=None, env=None, timeout=None):
+        """Execute command, returning exit status, stdout, stderr (PRIVATE).
+
+        Takes the same arguments as calling the object, plus an optional
+        timeout in seconds, after which the tool is killed. Returns a tuple
+        of the return code, the stdout and stderr strings, and a boolean
+        which is True if the tool was killed on reaching the timeout. No
+        exception is raised for a non-zero return code.
+        """
         if not stdout:
             stdout_arg = open(os.devnull, "w")
         elif isinstance(stdout, basestring):
@@ -495,13 +519,32 @@ class AbstractCommandline(object):
                 use_shell = True
             else:
                 use_shell = False
+        popen_kwargs = {}
+        if timeout is not None and os.name == "posix":
+            # Run the tool in its own process group, so that on a timeout
+            # we can kill both the shell and the tool it started
+            if sys.version_info[0] >= 3:
+                popen_kwargs["start_new_session"] = True
+            else:
+                popen_kwargs["preexec_fn"] = os.setsid
         child_process = subprocess.Popen(str(self), stdin=subprocess.PIPE,
                                          stdout=stdout_arg, stderr=stderr_arg,
                                          universal_newlines=True,
                                          cwd=cwd, env=env,
-                                         shell=use_shell)
-        # Use .communicate as can get deadlocks with .wait(), see Bug 2804
-        stdout_str, stderr_str = child_process.communicate(stdin)
+                                         shell=use_shell, **popen_kwargs)
+        timed_out = []
+        if timeout is not None:
+            # A timer thread works on Python 2 as well, where communicate
+            # does not take a timeout argument
+            timer = threading.Timer(timeout, _kill_process,
+                                    (child_process, timed_out))
+            timer.start()
+        try:
+            # Use .communicate as can get deadlocks with .wait(), see Bug 2804
+            stdout_str, stderr_str = child_process.communicate(stdin)
+        finally:
+            if timeout is not None:
+                timer.cancel()
         if not stdout:
             assert not stdout_str, stdout_str
         if not stderr:
@@ -518,10 +561,7 @@ class AbstractCommandline(object):
             # We opened /dev/null or a file
             stderr_arg.close()
 
-        if return_code:
-            raise ApplicationError(return_code, str(self),
-                                   stdout_str, stderr_str)
-        return stdout_str, stderr_str
+        return return_code, stdout_str, stderr_str, bool(timed_out)
 
 
 class _AbstractParameter(object):
@@ -750,6 +790,250 @@ def _escape_filename(filename):
         return '"%s"' % filename
 
 
+def _kill_process(process, timed_out):
+    """Kill a process and any children on reaching a timeout (PRIVATE).
+
+    The process is expected to be the leader of its own process group on
+    POSIX systems, since it is normally a shell running the tool. The
+    timed_out list is used to tell the caller the process was killed.
+    """
+    if process.poll() is not None:
+        # Finished just in time
+        return
+    timed_out.append(True)
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        elif sys.platform == "win32":
+            # Also kill the tool if it was started via cmd.exe
+            with open(os.devnull, "w") as null:
+                subprocess.call(["taskkill", "/F", "/T", "/PID",
+                                 str(process.pid)],
+                                stdout=null, stderr=null)
+        else:
+            process.kill()
+    except OSError:
+        # Already finished
+        pass
+
+
+class CommandlineResult(object):
+    """The outcome of running a command line wrapper via CommandlineRunner.
+
+    Attributes:
+     - commandline - The command line wrapper object which was run.
+     - returncode  - Exit status of the last attempt (None if the command
+       could not be started). This is negative if the tool was killed by
+       a signal, e.g. on reaching the timeout.
+     - stdout      - Standard output of the last attempt, as a string
+       (empty if it was not captured).
+     - stderr      - Standard error of the last attempt, as a string
+       (empty if it was not captured).
+     - timed_out   - True if the last attempt was killed on reaching the
+       timeout.
+     - timings     - List of the wall clock time in seconds taken by each
+       attempt.
+     - error       - None if the command succeeded, otherwise the exception
+       for the last attempt (an ApplicationError for a non-zero exit status
+       or a timeout, or for example an OSError if the command could not be
+       started).
+
+    """
+
+    def __init__(self, commandline):
+        """Initialize the class."""
+        self.commandline = commandline
+        self.returncode = None
+        self.stdout = ""
+        self.stderr = ""
+        self.timed_out = False
+        self.timings = []
+        self.error = None
+
+    def __repr__(self):
+        """Represent the result as a string for debugging."""
+        return "%s(%r, returncode=%r, attempts=%i, elapsed=%0.3f)" \
+               % (self.__class__.__name__, str(self.commandline),
+                  self.returncode, self.attempts, self.elapsed)
+
+    @property
+    def attempts(self):
+        """Number of times the command was run."""
+        return len(self.timings)
+
+    @property
+    def elapsed(self):
+        """Total wall clock time in seconds taken by all the attempts."""
+        return sum(self.timings)
+
+    @property
+    def ok(self):
+        """True if the command finished with a zero exit status."""
+        return self.error is None
+
+    def check(self):
+        """Raise the error of the last attempt, if the command failed."""
+        if self.error is not None:
+            raise self.error
+
+
+class CommandlineRunner(object):
+    """Run many command line wrappers at once, using a pool of threads.
+
+    Each command is run as its own process, so a thread is only used to
+    wait on the tool and collect its output. This makes threads a good fit
+    for the many independent jobs typical of a pipeline (e.g. one BLAST
+    search or alignment per input file), without the overheads and
+    pickling restrictions of the multiprocessing module. At most
+    max_workers tools run at the same time, and the results are returned
+    in the order the command lines were given.
+
+    Arguments:
+     - max_workers - Maximum number of tools to run at the same time
+       (defaults to the number of CPUs).
+     - timeout     - Optional number of seconds after which each attempt
+       is killed, and treated as having failed.
+     - retries     - Number of times a failed command is run again
+       (default zero).
+     - stdout      - Boolean, capture the stdout of each tool (True,
+       default) or discard it (False).
+     - stderr      - Boolean, capture the stderr of each tool (True,
+       default) or discard it (False).
+     - cwd         - Optional working directory to run the tools from.
+     - env         - Optional dictionary of environment variables for
+       the tools.
+
+    Output files should be set using the options of the wrappers, so that
+    each job writes to its own files. For example::
+
+        from Bio.Application import CommandlineRunner
+        from Bio.Blast.Applications import NcbiblastpCommandline
+        clines = [NcbiblastpCommandline(query=name + ".fasta", db="nr",
+                                        outfmt=6, out=name + ".tab")
+                  for name in ("alpha", "beta", "gamma")]
+        runner = CommandlineRunner(max_workers=2, timeout=3600, retries=1)
+        for result in runner.run(clines):
+            print("%s took %0.1fs" % (result.commandline, result.elapsed))
+            result.check()
+
+    Failures do not stop the other jobs; instead each CommandlineResult
+    records the exit status, captured output, timings and any error of its
+    command, and its check method raises the error.
+    """
+
+    def __init__(self, max_workers=None, timeout=None, retries=0,
+                 stdout=True, stderr=True, cwd=None, env=None):
+        """Initialize the class."""
+        if max_workers is None:
+            import multiprocessing
+            max_workers = multiprocessing.cpu_count()
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least one, not %r"
+                             % max_workers)
+        if retries < 0:
+            raise ValueError("retries must not be negative, not %r"
+                             % retries)
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive, not %r" % timeout)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.stdout = bool(stdout)
+        self.stderr = bool(stderr)
+        self.cwd = cwd
+        self.env = env
+
+    def run(self, commandlines, callback=None):
+        """Run the command lines, returning a list of CommandlineResults.
+
+        The command lines are started in the order given, and the results
+        are returned in the same order. The optional callback function is
+        called with each CommandlineResult as soon as its command finishes
+        (e.g. to report progress); these calls are made one at a time.
+        If the callback raises an exception, no further commands are
+        started and the exception is raised once the running commands have
+        finished. The same applies to any unexpected exception from running
+        a command, other than those recorded as its error (see
+        CommandlineResult).
+        """
+        commandlines = list(commandlines)
+        results = [None] * len(commandlines)
+        jobs = iter(enumerate(commandlines))
+        lock = threading.Lock()
+        errors = []
+
+        def worker():
+            while True:
+                with lock:
+                    if errors:
+                        return
+                    try:
+                        index, commandline = next(jobs)
+                    except StopIteration:
+                        return
+                try:
+                    result = self._run_job(commandline)
+                except Exception as err:
+                    # not a failure of the tool, so stop as for the callback
+                    with lock:
+                        errors.append(err)
+                    return
+                results[index] = result
+                if callback is not None:
+                    with lock:
+                        try:
+                            callback(result)
+                        except Exception as err:
+                            errors.append(err)
+
+        threads = [threading.Thread(target=worker)
+                   for i in range(min(self.max_workers, len(commandlines)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+    def _run_job(self, commandline):
+        """Run a single command line, retrying on failure (PRIVATE)."""
+        result = CommandlineResult(commandline)
+        for attempt in range(self.retries + 1):
+            start = time.time()
+            try:
+                returncode, stdout, stderr, timed_out = commandline._run(
+                    None, self.stdout, self.stderr, self.cwd, self.env,
+                    self.timeout)
+            except (OSError, ValueError) as err:
+                # e.g. missing working directory
+                result.timings.append(time.time() - start)
+                result.returncode = None
+                result.stdout = result.stderr = ""
+                result.timed_out = False
+                result.error = err
+                continue
+            result.timings.append(time.time() - start)
+            result.returncode = returncode
+            result.stdout = stdout or ""
+            result.stderr = stderr or ""
+            result.timed_out = timed_out
+            if timed_out:
+                result.error = ApplicationError(
+                    returncode, str(commandline), result.stdout,
+                    "Timed out after %s seconds\n%s"
+                    % (self.timeout, result.stderr))
+            elif returncode:
+                result.error = ApplicationError(
+                    returncode, str(commandline), result.stdout,
+                    result.stderr)
+            else:
+                result.error = None
+                break
+        return result
+
+
 def _test():
     """Run the Bio.Application module's doctests."""
     import doctest
@@ -20,6 +20,9 @@ Wrappers for the new NCBI BLAST+ tools (written in C++):
  - NcbideltablastCommandline - Protein-Protein domain enhanced lookup time accelerated blast
  - NcbiblastformatterCommandline - Convert ASN.1 to other BLAST output formats
 
+The run_split_query function runs one of these searches as several BLAST+
+processes at once, each searching part of the query file.
+
 For further details, see:
 
 Camacho et al. BLAST+: architecture and applications
@@ -28,6 +31,8 @@ doi:10.1186/1471-2105-10-421
 """
 from __future__ import print_function
 
+import os
+
 from Bio.Application import _Option, AbstractCommandline, _Switch
 
 
@@ -1212,6 +1217,170 @@ class NcbideltablastCommandline(_Ncbiblast2SeqCommandline):
         _Ncbiblast2SeqCommandline.__init__(self, cmd, **kwargs)
 
 
+def _split_balanced(lengths, chunks):
+    """Split a list of sequence lengths into balanced runs (PRIVATE).
+
+    Returns a list of (start, end) index pairs, dividing the sequences in
+    their original order into at most the given number of non-empty chunks,
+    each with roughly the same total length.
+
+    >>> _split_balanced([10, 10, 10, 10], 2)
+    [(0, 2), (2, 4)]
+    >>> _split_balanced([100, 1, 1, 1, 1], 3)
+    [(0, 1), (1, 2), (2, 5)]
+    >>> _split_balanced([5, 5], 4)
+    [(0, 1), (1, 2)]
+
+    """
+    chunks = min(chunks, len(lengths))
+    total = float(sum(lengths))
+    bounds = []
+    start = 0
+    done = 0
+    for index, length in enumerate(lengths):
+        done += length
+        left = len(lengths) - index - 1  # sequences after this one
+        wanted = chunks - len(bounds) - 1  # chunks still to fill after this
+        if wanted <= 0 or left < wanted:
+            continue
+        if left == wanted or done >= total * (len(bounds) + 1) / chunks:
+            bounds.append((start, index + 1))
+            start = index + 1
+    if lengths:
+        bounds.append((start, len(lengths)))
+    return bounds
+
+
+def _get_searchio_format(outfmt):
+    """Return the SearchIO format and arguments for a BLAST+ outfmt (PRIVATE).
+
+    >>> _get_searchio_format(5)
+    ('blast-xml', {})
+    >>> fmt, kwargs = _get_searchio_format("'7 qseqid sseqid evalue'")
+    >>> fmt
+    'blast-tab'
+    >>> sorted(kwargs.items())
+    [('comments', True), ('fields', ['qseqid', 'sseqid', 'evalue'])]
+
+    """
+    if outfmt is None:
+        raise ValueError("Split query BLAST runs need the outfmt option "
+                         "set to 5 (XML), 6 or 7 (tabular)")
+    values = str(outfmt).strip("'\"").split()
+    if values[0] == "5" and len(values) == 1:
+        return "blast-xml", {}
+    elif values[0] in ("6", "7"):
+        kwargs = {}
+        if values[0] == "7":
+            kwargs["comments"] = True
+        if len(values) > 1:
+            kwargs["fields"] = values[1:]
+        return "blast-tab", kwargs
+    raise ValueError("Split query BLAST runs need XML (outfmt 5) or "
+                     "tabular (outfmt 6 or 7) output, not %r" % outfmt)
+
+
+def run_split_query(cline, chunks=None, max_workers=None, timeout=None,
+                    retries=0, temp_dir=None):
+    """Run a BLAST+ search as several processes, each given part of the query.
+
+    Arguments:
+     - cline       - A BLAST+ command line wrapper (e.g. an instance of
+       NcbiblastnCommandline), with the query option set to a FASTA file,
+       the out option set to the output filename, and the outfmt option
+       set to XML (5) or tabular (6 or 7) output. This is not modified.
+     - chunks      - Number of parts to split the query into (defaults to
+       max_workers). The parts hold consecutive query sequences, with
+       roughly the same number of letters each.
+     - max_workers - Maximum number of BLAST processes to run at the same
+       time (defaults to the number of CPUs).
+     - timeout     - Optional number of seconds after which a BLAST process
+       is killed, see Bio.Application.CommandlineRunner.
+     - retries     - Number of times a failed BLAST process is run again.
+     - temp_dir    - Optional directory for the temporary query and output
+       files of each part (by default, a new temporary directory is used).
+
+    A single BLAST+ process only uses multiple cores for some stages of a
+    search (via its num_threads option), so on a machine with many cores
+    it is often faster to search parts of the query at the same time.
+    Each part is searched with a copy of the command line, then the output
+    of the parts is parsed with Bio.SearchIO and written to the out file,
+    with the queries in their original order. Any num_threads option is
+    kept, and applies to each process. For example::
+
+        from Bio.Blast.Applications import NcbiblastnCommandline
+        from Bio.Blast.Applications import run_split_query
+        cline = NcbiblastnCommandline(query="reads.fasta", db="nt",
+                                      evalue=0.001, outfmt=6,
+                                      out="reads.tab")
+        results = run_split_query(cline, chunks=8)
+
+    Returns a list of Bio.Application.CommandlineResult objects, one per
+    part, giving the output and timings of each BLAST process. If any part
+    fails, its ApplicationError is raised once all the parts have finished.
+    Note the e-values of a part are only the same as for the whole query
+    if the search space is fixed (e.g. using the dbsize and searchsp
+    options), as is normal when searching a database.
+    """
+    import copy
+    import shutil
+    import tempfile
+
+    from Bio import SeqIO
+    from Bio import SearchIO
+    from Bio.Application import CommandlineRunner
+
+    if not cline.query:
+        raise ValueError("Split query BLAST runs need the query option set")
+    if not cline.out:
+        raise ValueError("Split query BLAST runs need the out option set")
+    fmt, fmt_kwargs = _get_searchio_format(cline.outfmt)
+    query_file = cline.query.strip('"')
+    out_file = cline.out.strip('"')
+
+    runner = CommandlineRunner(max_workers=max_workers, timeout=timeout,
+                               retries=retries)
+    if chunks is None:
+        chunks = runner.max_workers
+    if chunks < 1:
+        raise ValueError("chunks must be at least one, not %r" % chunks)
+
+    records = list(SeqIO.parse(query_file, "fasta"))
+    bounds = _split_balanced([len(record) for record in records], chunks)
+    if temp_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="biopython_blast_")
+    else:
+        work_dir = tempfile.mkdtemp(prefix="biopython_blast_", dir=temp_dir)
+    try:
+        clines = []
+        out_files = []
+        for index, (start, end) in enumerate(bounds):
+            part_query = os.path.join(work_dir, "query_%i.fasta" % index)
+            part_out = os.path.join(work_dir, "out_%i" % index)
+            SeqIO.write(records[start:end], part_query, "fasta")
+            part_cline = copy.deepcopy(cline)
+            part_cline.query = part_query
+            part_cline.out = part_out
+            clines.append(part_cline)
+            out_files.append(part_out)
+        # The queries are held by the part files, so free the memory
+        del records
+
+        results = runner.run(clines)
+        for result in results:
+            result.check()
+
+        def merged():
+            for part_out in out_files:
+                for qresult in SearchIO.parse(part_out, fmt, **fmt_kwargs):
+                    yield qresult
+
+        SearchIO.write(merged(), out_file, fmt, **fmt_kwargs)
+    finally:
+        shutil.rmtree(work_dir)
+    return results
+
+
 def _test():
     """Run the Bio.Blast.Applications module's doctests."""
     import doctest
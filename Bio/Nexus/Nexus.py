@@ -20,6 +20,7 @@ from functools import reduce
 import copy
 import math
 import random
+import re
 import sys
 
 from Bio import File
@@ -41,6 +42,10 @@ MRBAYESSAFE = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890_'
 WHITESPACE = ' \t\n'
 # SPECIALCOMMENTS = ['!','&','%','/','\\','@'] # original list of special comments
 SPECIALCOMMENTS = ['&']  # supported special comment ('tree' command), all others are ignored
+# unquoted NEXUS word, see CharBuffer.next_word
+_MATRIX_WORD = re.compile('[^%s]+' % re.escape(PUNCTUATION + WHITESPACE))
+# characters which may change the state when scanning for comments
+_COMMENT_SCAN_CHARS = re.compile('[\\[\\]\'";]')
 CHARSET = 'chars'
 TAXSET = 'taxa'
 CODONPOSITIONS = 'codonpositions'
@@ -436,24 +441,23 @@ def _kill_comments_and_break_lines(text):
     but no nesting inside these special comments allowed (like [&   [\   ]]).
     ';' ist deleted from end of line.
 
-    NOTE: this function is very slow for large files, and obsolete when using C extension cnexus
+    This is the pure Python equivalent of the C extension cnexus, used if that
+    is not available. Rather than looking at every character, it jumps from
+    one quote, bracket or semicolon to the next and copies the text between.
     """
-    contents = iter(text)
     newtext = []
     newline = []
     quotelevel = ''
     speciallevel = False
     commlevel = 0
-    # Parse with one character look ahead (for special comments)
-    t2 = next(contents)
-    while True:
-        t = t2
-        try:
-            t2 = next(contents)
-        except StopIteration:
-            t2 = None
-        if t is None:
-            break
+    start = 0
+    for match in _COMMENT_SCAN_CHARS.finditer(text):
+        pos = match.start()
+        # the text since the previous special character, if not in a comment
+        if commlevel == 0:
+            newline.append(text[start:pos])
+        start = pos + 1
+        t = text[pos]
         if t == quotelevel and not (commlevel or speciallevel):
             # matching quote ends quotation
             quotelevel = ''
@@ -462,7 +466,7 @@ def _kill_comments_and_break_lines(text):
             quotelevel = t
         elif not quotelevel and t == '[':
             # opening bracket outside a quote
-            if t2 in SPECIALCOMMENTS and commlevel == 0 and not speciallevel:
+            if text[start:start + 1] in SPECIALCOMMENTS and commlevel == 0 and not speciallevel:
                 speciallevel = True
             else:
                 commlevel += 1
@@ -482,11 +486,14 @@ def _kill_comments_and_break_lines(text):
                 newline = []
             else:
                 newline.append(t)
+    if commlevel == 0:
+        newline.append(text[start:])
     # level of comments should be 0 at the end of the file
-    if newline:
-        newtext.append('\n'.join(newline))
     if commlevel > 0:
         raise NexusError('Nexus formatting error: unmatched [')
+    newline = ''.join(newline)
+    if newline:
+        newtext.append(newline)
     return newtext
 
 
@@ -669,8 +676,7 @@ class Nexus(object):
         """Generator for looping through Nexus blocks."""
         inblock = False
         blocklines = []
-        while file_contents:
-            cl = file_contents.pop(0)
+        for cl in file_contents:
             if cl.lower().startswith('begin'):
                 if not inblock:
                     inblock = True
@@ -944,6 +950,16 @@ class Nexus(object):
         # eliminate empty lines and leading/trailing whitespace
         lines = [l.strip() for l in options.split('\n') if l.strip() != '']
         lineiter = iter(lines)
+        # sequence pieces of each taxon, joined once all have been read
+        pieces = {}
+        # taxa seen so far in the current block of an interleaved matrix
+        block_taxa = set()
+        # taxon names with underscores for spaces (see _check_taxlabels)
+        nextaxa = None
+        standard = self.datatype == 'standard'
+        if not standard:
+            # characters allowed besides the valid ones
+            other_characters = set([self.gap, self.missing])
         while True:
             try:
                 l = next(lineiter)
@@ -962,10 +978,17 @@ class Nexus(object):
                 else:
                     taxcount = 1
                     first_matrix_block = False
+                    block_taxa = set()
             # get taxon name and sequence
-            linechars = CharBuffer(l)
-            id = quotestrip(linechars.next_word())
-            l = linechars.rest().strip()
+            word = _MATRIX_WORD.match(l)
+            if word:
+                # plain name, no need to go through it character by character
+                id = word.group()
+                l = l[word.end():].strip()
+            else:
+                linechars = CharBuffer(l)
+                id = quotestrip(linechars.next_word())
+                l = linechars.rest().strip()
             chars = ''
             if self.interleave:
                 # interleaved matrix
@@ -975,32 +998,33 @@ class Nexus(object):
                     chars = ''.join(next(lineiter).split())
             else:
                 # non-interleaved matrix
-                chars = ''.join(l.split())
-                while len(chars) < self.nchar:
+                chars = [''.join(l.split())]
+                length = len(chars[0])
+                while length < self.nchar:
                     l = next(lineiter)
-                    chars += ''.join(l.split())
+                    chars.append(''.join(l.split()))
+                    length += len(chars[-1])
+                chars = ''.join(chars)
 
             # Reformat sequence for non-standard datatypes
-            if self.datatype != 'standard':
-                iupac_seq = Seq(_replace_parenthesized_ambigs(
-                    chars, self.rev_ambiguous_values), self.alphabet)
+            if not standard:
+                iupac_seq = _replace_parenthesized_ambigs(
+                    chars, self.rev_ambiguous_values)
                 # first taxon has the reference sequence if matchhar is used
                 if taxcount == 1:
                     refseq = iupac_seq
-                else:
-                    if self.matchchar:
-                        while True:
-                            p = str(iupac_seq).find(self.matchchar)
-                            if p == -1:
-                                break
-                            iupac_seq = Seq(str(iupac_seq)[:p] + refseq[
-                                            p] + str(iupac_seq)[p + 1:], self.alphabet)
+                elif self.matchchar and self.matchchar in iupac_seq:
+                    iupac_seq = ''.join(c if c != self.matchchar else refseq[p]
+                                        for p, c in enumerate(iupac_seq))
 
                 # Check for invalid characters
-                for i, c in enumerate(str(iupac_seq)):
-                    if c not in self.valid_characters and c != self.gap and c != self.missing:
-                        raise NexusError("Taxon %s: Illegal character %s in sequence %s "
-                                         "(check dimensions/interleaving)" % (id, c, iupac_seq))
+                invalid = set(iupac_seq).difference(self.valid_characters,
+                                                    other_characters)
+                if invalid:
+                    for c in iupac_seq:
+                        if c in invalid:
+                            raise NexusError("Taxon %s: Illegal character %s in sequence %s "
+                                             "(check dimensions/interleaving)" % (id, c, iupac_seq))
             else:
                 iupac_seq = StandardData(chars)
 
@@ -1018,18 +1042,29 @@ class Nexus(object):
             # add sequence to matrix
             if first_matrix_block:
                 self.unaltered_taxlabels.append(id)
-                id = _unique_label(list(self.matrix.keys()), id)
-                self.matrix[id] = iupac_seq
+                id = _unique_label(pieces, id)
+                pieces[id] = [iupac_seq]
                 self.taxlabels.append(id)
             else:
                 # taxon names need to be in the same order in each interleaved block
-                id = _unique_label(self.taxlabels[:taxcount - 1], id)
-                taxon_present = self._check_taxlabels(id)
+                id = _unique_label(block_taxa, id)
+                block_taxa.add(self.taxlabels[taxcount - 1])
+                if nextaxa is None:
+                    nextaxa = dict((t.replace(' ', '_'), t) for t in self.taxlabels)
+                taxon_present = nextaxa.get(id.replace(' ', '_'))
                 if taxon_present:
-                    self.matrix[taxon_present] += iupac_seq
+                    pieces[taxon_present].append(iupac_seq)
                 else:
                     raise NexusError("Taxon %s not in first block of interleaved "
                                      "matrix. Check matrix dimensions and interleave." % id)
+        for taxon in pieces:
+            if not standard:
+                self.matrix[taxon] = Seq(''.join(pieces[taxon]), self.alphabet)
+            else:
+                sequence = pieces[taxon][0]
+                for piece in pieces[taxon][1:]:
+                    sequence += piece
+                self.matrix[taxon] = sequence
         # check all sequences for length according to nchar
         for taxon in self.matrix:
             if len(self.matrix[taxon]) != self.nchar:
@@ -1882,7 +1917,7 @@ class Nexus(object):
 
 
 try:
-    import cnexus
+    from Bio.Nexus import cnexus
 except ImportError:
     def _get_command_lines(file_contents):
         lines = _kill_comments_and_break_lines(file_contents)
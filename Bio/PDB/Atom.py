@@ -15,6 +15,43 @@ from Bio.PDB.Vector import Vector
 from Bio.Data import IUPACData
 
 
+class _AtomArrays(object):
+    """Coordinates, B factors and occupancies of many atoms (PRIVATE).
+
+    Holds the data of the atoms of a model in contiguous NumPy arrays, with
+    a row for each atom. The coord attribute of each Atom is then a view of
+    its row of the coordinate array, and changes to the coordinates, B
+    factor or occupancy of an Atom are written to the arrays. Missing B
+    factors and occupancies (None) are stored as NaN.
+
+    When atoms are packed into new arrays, their old arrays are marked as
+    stale, so that rows cached by the entities can be checked.
+    """
+
+    def __init__(self, atoms):
+        self.stale = False
+        count = len(atoms)
+        self.coord = numpy.empty((count, 3))
+        self.bfactor = numpy.empty(count)
+        self.occupancy = numpy.empty(count)
+        for row, atom in enumerate(atoms):
+            self.coord[row] = atom.coord
+            self.bfactor[row] = _as_array_value(atom.bfactor)
+            self.occupancy[row] = _as_array_value(atom.occupancy)
+            if atom._arrays is not None:
+                atom._arrays.stale = True
+            atom._arrays = self
+            atom._row = row
+            atom._coord = self.coord[row]
+
+
+def _as_array_value(value):
+    """Return a B factor or occupancy as stored in _AtomArrays (PRIVATE)."""
+    if value is None:
+        return numpy.nan
+    return value
+
+
 class Atom(object):
     def __init__(self, name, coord, bfactor, occupancy, altloc, fullname, serial_number,
                  element=None):
@@ -48,6 +85,10 @@ class Atom(object):
         @type element: uppercase string (or None if unknown)
         """
         self.level = "A"
+        # The arrays of the model holding the coordinates etc. (if any),
+        # set when the atom is packed by the model
+        self._arrays = None
+        self._row = None
         # Reference to the residue
         self.parent = None
         # the atomic data
@@ -106,8 +147,63 @@ class Atom(object):
         else:
             return float('NaN')
 
+    # Atomic data, kept in the arrays of the model if packed
+
+    @property
+    def coord(self):
+        """Atomic coordinates, as a NumPy array of size 3."""
+        return self._coord
+
+    @coord.setter
+    def coord(self, value):
+        if self._arrays is None:
+            self._coord = value
+        else:
+            # keep using the row of the coordinate array of the model
+            self._coord[:] = value
+
+    @property
+    def bfactor(self):
+        """Isotropic B factor."""
+        return self._bfactor
+
+    @bfactor.setter
+    def bfactor(self, value):
+        self._bfactor = value
+        if self._arrays is not None:
+            self._arrays.bfactor[self._row] = _as_array_value(value)
+
+    @property
+    def occupancy(self):
+        """Occupancy."""
+        return self._occupancy
+
+    @occupancy.setter
+    def occupancy(self, value):
+        self._occupancy = value
+        if self._arrays is not None:
+            self._arrays.occupancy[self._row] = _as_array_value(value)
+
     # Special methods
 
+    def __getstate__(self):
+        """Return the state for pickling and copying, without the arrays."""
+        state = self.__dict__.copy()
+        if self._arrays is not None:
+            state["_arrays"] = None
+            state["_row"] = None
+            state["_coord"] = self._coord.copy()
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state, including that pickled by older versions."""
+        for name in ("coord", "bfactor", "occupancy"):
+            if name in state:
+                state["_" + name] = state.pop(name)
+        state.setdefault("_arrays", None)
+        state.setdefault("_row", None)
+        self.__dict__.update(state)
+
     def __repr__(self):
         """Print Atom object as <Atom atom_name>."""
         return "<Atom %s>" % self.get_id()
@@ -285,6 +381,7 @@ class Atom(object):
         Parent information is lost.
         """
         # Do a shallow copy then explicitly copy what needs to be deeper.
+        # The copy does not share the arrays of the model (see __getstate__).
         shallow = copy.copy(self)
         shallow.detach_parent()
         shallow.set_coord(copy.copy(self.get_coord()))
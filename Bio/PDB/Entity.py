@@ -10,6 +10,8 @@ It is a simple container class, with list and dictionary like properties.
 
 from copy import copy
 
+import numpy
+
 from Bio.PDB.PDBExceptions import PDBConstructionException
 
 
@@ -28,6 +30,8 @@ class Entity(object):
         self.child_dict = {}
         # Dictionary that keeps additional properties
         self.xtra = {}
+        # Arrays and rows holding the data of the atoms, see _get_atom_rows
+        self._atom_rows = None
 
     # Special methods
 
@@ -52,8 +56,74 @@ class Entity(object):
         for child in self.child_list:
             yield child
 
+    def __getstate__(self):
+        """Return the state for pickling and copying, without cached rows."""
+        state = self.__dict__.copy()
+        state["_atom_rows"] = None
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state, including that pickled by older versions."""
+        state.setdefault("_atom_rows", None)
+        self.__dict__.update(state)
+
     # Private methods
 
+    def _reset_atom_rows(self):
+        """Forget the cached rows of the atoms (PRIVATE).
+
+        Called when atoms are added, removed or reordered, here or in a
+        child, so also resets the parents.
+        """
+        entity = self
+        while entity is not None:
+            entity._atom_rows = None
+            entity = entity.parent
+
+    def _get_atom_rows(self):
+        """Return the arrays and rows holding the data of the atoms (PRIVATE).
+
+        The data of the atoms of a model is held in contiguous arrays (see
+        Model). Returns the _AtomArrays object and an array of the rows of
+        the atoms, in the order of get_atoms, or None if the atoms are not
+        all held in the arrays of the same model. In that case, if this
+        entity is part of a model and has atoms, the atoms of the model are
+        packed into new arrays first. The result is cached until atoms are
+        added, removed or reordered, or packed into other arrays.
+        """
+        atom_rows = self._atom_rows
+        if atom_rows is not None and not atom_rows[0].stale:
+            return atom_rows
+        atom_rows = self._find_atom_rows()
+        if atom_rows is None:
+            model = self
+            while model is not None and model.level != "M":
+                model = model.parent
+            has_atoms = next(iter(self.get_atoms()), None) is not None
+            if model is not None and has_atoms:
+                model._pack_atoms()
+                atom_rows = self._find_atom_rows()
+        self._atom_rows = atom_rows
+        return atom_rows
+
+    def _find_atom_rows(self):
+        """Look up the arrays and rows of the atoms, or return None (PRIVATE)."""
+        arrays = None
+        rows = []
+        for atom in self.get_atoms():
+            if atom._arrays is None:
+                return None
+            if arrays is None:
+                arrays = atom._arrays
+            elif atom._arrays is not arrays:
+                return None
+            rows.append(atom._row)
+        if arrays is None:
+            return None
+        return arrays, numpy.array(rows, int)
+
+    # Public methods
+
     def _reset_full_id(self):
         """Reset the full_id.
 
@@ -69,6 +139,16 @@ class Entity(object):
                 pass  # Atoms do not cache their full ids.
         self.full_id = None
 
+    def _get_atom_values(self, name):
+        """Return the B factors or occupancies of the atoms (PRIVATE)."""
+        atom_rows = self._get_atom_rows()
+        if atom_rows is None:
+            values = [getattr(atom, name) for atom in self.get_atoms()]
+            return numpy.array([numpy.nan if value is None else value
+                                for value in values], float)
+        arrays, rows = atom_rows
+        return getattr(arrays, name)[rows]
+
     # Public methods
 
     @property
@@ -121,6 +201,7 @@ class Entity(object):
         child.detach_parent()
         del self.child_dict[id]
         self.child_list.remove(child)
+        self._reset_atom_rows()
 
     def add(self, entity):
         """Add a child to the Entity."""
@@ -131,6 +212,7 @@ class Entity(object):
         entity.set_parent(self)
         self.child_list.append(entity)
         self.child_dict[entity_id] = entity
+        self._reset_atom_rows()
 
     def insert(self, pos, entity):
         """Add a child to the Entity at a specified position."""
@@ -141,6 +223,7 @@ class Entity(object):
         entity.set_parent(self)
         self.child_list[pos:pos] = [entity]
         self.child_dict[entity_id] = entity
+        self._reset_atom_rows()
 
     def get_iterator(self):
         """Return iterator over children."""
@@ -208,9 +291,46 @@ class Entity(object):
 
         @param tran: the translation vector
         @type tran: size 3 Numeric array
+
+        Where the atoms are held in the arrays of a model, all of them are
+        transformed in a single matrix operation.
+        """
+        atom_rows = self._get_atom_rows()
+        if atom_rows is None:
+            for o in self.get_list():
+                o.transform(rot, tran)
+        else:
+            arrays, rows = atom_rows
+            arrays.coord[rows] = numpy.dot(arrays.coord[rows], rot) + tran
+
+    def get_coord_array(self):
+        """Return the coordinates of the atoms as an (N, 3) NumPy array.
+
+        The rows are in the order of the atoms from get_atoms. This is a
+        new array, so changing it does not move the atoms. Where the atoms
+        are held in the arrays of a model, it is taken from these without
+        looking at each atom.
+        """
+        atom_rows = self._get_atom_rows()
+        if atom_rows is None:
+            return numpy.array([atom.coord for atom in self.get_atoms()],
+                               float).reshape(-1, 3)
+        arrays, rows = atom_rows
+        return arrays.coord[rows]
+
+    def get_bfactor_array(self):
+        """Return the B factors of the atoms as a NumPy array.
+
+        As for get_coord_array, with NaN for missing B factors.
+        """
+        return self._get_atom_values("bfactor")
+
+    def get_occupancy_array(self):
+        """Return the occupancies of the atoms as a NumPy array.
+
+        As for get_coord_array, with NaN for missing occupancies.
         """
-        for o in self.get_list():
-            o.transform(rot, tran)
+        return self._get_atom_values("occupancy")
 
     def copy(self):
         shallow = copy(self)
@@ -218,6 +338,7 @@ class Entity(object):
         shallow.child_list = []
         shallow.child_dict = {}
         shallow.xtra = copy(self.xtra)
+        shallow._atom_rows = None
 
         shallow.detach_parent()
 
@@ -248,8 +369,9 @@ class DisorderedEntityWrapper(object):
 
     def __getattr__(self, method):
         """Forward the method call to the selected child."""
-        if method == '__setstate__':
-            # Avoid issues with recursion when attempting deepcopy
+        if method in ('__getstate__', '__setstate__'):
+            # Avoid issues with recursion when attempting deepcopy,
+            # and pickling the state of the selected child instead
             raise AttributeError
         if not hasattr(self, 'selected_child'):
             # Avoid problems with pickling
@@ -315,6 +437,8 @@ class DisorderedEntityWrapper(object):
         Uncaught method calls are forwarded to the selected child object.
         """
         self.selected_child = self.child_dict[id]
+        if self.parent is not None:
+            self.parent._reset_atom_rows()
 
     def disordered_add(self, child):
         """Add disordered entry.
@@ -5,6 +5,7 @@
 
 """Model class, used in Structure objects."""
 
+from Bio.PDB.Atom import _AtomArrays
 from Bio.PDB.Entity import Entity
 
 
@@ -13,6 +14,13 @@ class Model(Entity):
     derived from an X-ray crystallography experiment, only a single
     model will be present (with some exceptions). NMR structures
     normally contain many different models.
+
+    The coordinates, B factors and occupancies of all the atoms of a model
+    (including the alternative locations of disordered atoms) are held in
+    contiguous NumPy arrays, with the coord of each Atom a view of a row
+    of the coordinate array. The get_coord_array and transform methods of
+    the model, and of its chains and residues, then work on all their
+    atoms with single array operations.
     """
 
     def __init__(self, id, serial_num=None):
@@ -53,6 +61,21 @@ class Model(Entity):
             return -1
         return cmp(id1, id2)
 
+    def _pack_atoms(self):
+        """Hold the data of all the atoms in new contiguous arrays (PRIVATE).
+
+        Called by the StructureBuilder once the model is complete, and
+        otherwise when needed, e.g. after atoms from elsewhere were added.
+        """
+        atoms = []
+        for chain in self:
+            chain._atom_rows = None
+            for residue in chain.get_unpacked_list():
+                residue._atom_rows = None
+                atoms.extend(residue.get_unpacked_list())
+        _AtomArrays(atoms)
+        self._reset_atom_rows()
+
     # Special methods
 
     def __repr__(self):
@@ -102,7 +102,7 @@ class Residue(Entity):
         atom_list = self.get_list()
         undisordered_atom_list = []
         for atom in atom_list:
-            if atom.is_disordered():
+            if atom.is_disordered() == 2:
                 undisordered_atom_list = (undisordered_atom_list + atom.disordered_get_list())
             else:
                 undisordered_atom_list.append(atom)
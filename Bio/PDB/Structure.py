@@ -5,6 +5,8 @@
 
 """The structure class, representing a macromolecular structure."""
 
+import numpy
+
 from Bio.PDB.Entity import Entity
 
 
@@ -55,3 +57,22 @@ class Structure(Entity):
         for r in self.get_residues():
             for a in r:
                 yield a
+
+    def get_coord_array(self):
+        """Return the coordinates of the atoms as an (N, 3) NumPy array.
+
+        The rows are in the order of the atoms from get_atoms, with those
+        of each model taken from its arrays (see Model.get_coord_array).
+        """
+        arrays = [model.get_coord_array() for model in self]
+        if not arrays:
+            return numpy.zeros((0, 3))
+        return numpy.concatenate(arrays)
+
+    def transform(self, rot, tran):
+        """Apply rotation and translation to the atomic coordinates.
+
+        Each model is transformed in turn (see Entity.transform).
+        """
+        for model in self:
+            model.transform(rot, tran)
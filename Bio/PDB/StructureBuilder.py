@@ -260,6 +260,9 @@ class StructureBuilder(object):
         # self.structure.sort()
         # Add the header dict
         self.structure.header = self.header
+        # Hold the coordinates etc. of each model in contiguous arrays
+        for model in self.structure:
+            model._pack_atoms()
         return self.structure
 
     def set_symmetry(self, spacegroup, cell):
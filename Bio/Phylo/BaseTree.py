@@ -16,6 +16,7 @@ import copy
 import itertools
 import random
 import re
+import weakref
 
 from Bio import _utils
 
@@ -45,24 +46,28 @@ def _level_traverse(root, get_children):
 
 def _preorder_traverse(root, get_children):
     """Traverse a tree in depth-first pre-order (parent before children)."""
-    def dfs(elem):
-        yield elem
-        for v in get_children(elem):
-            for u in dfs(v):
-                yield u
-    for elem in dfs(root):
+    # Explicit stack rather than recursion, so deep trees are OK
+    stack = [root]
+    while stack:
+        elem = stack.pop()
         yield elem
+        children = list(get_children(elem))
+        children.reverse()
+        stack.extend(children)
 
 
 def _postorder_traverse(root, get_children):
     """Traverse a tree in depth-first post-order (children before parent)."""
-    def dfs(elem):
-        for v in get_children(elem):
-            for u in dfs(v):
-                yield u
-        yield elem
-    for elem in dfs(root):
-        yield elem
+    # Explicit stack of (element, iterator over its children)
+    stack = [(root, iter(get_children(root)))]
+    while stack:
+        elem, children = stack[-1]
+        for v in children:
+            stack.append((v, iter(get_children(v))))
+            break
+        else:
+            stack.pop()
+            yield elem
 
 
 def _sorted_attrs(elem):
@@ -233,6 +238,160 @@ def _combine_args(first, *rest):
     return itertools.chain([first], rest)
 
 
+# Precomputed index for tree queries
+
+# Indexes built by TreeMixin.build_index, held separately from the trees
+_indexes = weakref.WeakKeyDictionary()
+
+
+def _mark_changed(*clades):
+    """Record that the given clades were changed (PRIVATE).
+
+    Only the indexes which include any of these clades are rebuilt.
+    """
+    for index in list(_indexes.values()):
+        numbers = index.numbers
+        if any(clade in numbers for clade in clades):
+            index.changed = True
+
+
+class _TreeIndex(object):
+    """Precomputed parents, distances and ancestors of a tree's clades (PRIVATE).
+
+    The clades are numbered in preorder, with each clade's parent and its
+    distance from the root (the sum of the branch lengths in between) held
+    in lists. The most recent common ancestor of two clades is found in
+    constant time using the Euler tour of the tree (the clades in the order
+    they are visited when walking around the tree) and a sparse table of the
+    minimum clade number over each run of 1, 2, 4, 8, ... clades in the tour.
+    As the clades are numbered in preorder, the common ancestor is the
+    lowest numbered clade visited on the tour between the two clades.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        # Set by _mark_changed if the clades are changed
+        self.changed = False
+        clades = []
+        parents = []
+        dists = []
+        stack = [(root, -1, 0)]
+        while stack:
+            clade, parent, dist = stack.pop()
+            number = len(clades)
+            clades.append(clade)
+            parents.append(parent)
+            dists.append(dist)
+            stack.extend((child, number, dist + (child.branch_length or 0))
+                         for child in reversed(clade.clades))
+        self.clades = clades
+        self.parents = parents
+        self.dists = dists
+        self.numbers = dict((clade, i) for i, clade in enumerate(clades))
+        # Name lookups find the first clade in preorder, as with get_path
+        self.names = {}
+        for i, clade in enumerate(clades):
+            if clade.name is not None and clade.name not in self.names:
+                self.names[clade.name] = i
+        # Build the Euler tour, noting where each clade is first visited
+        tour = []
+        first = [0] * len(clades)
+        path = []
+        for i, parent in enumerate(parents):
+            while path and path[-1] != parent:
+                path.pop()
+                tour.append(path[-1])
+            first[i] = len(tour)
+            tour.append(i)
+            path.append(i)
+        self.first = first
+        table = [tour]
+        width = 1
+        while 2 * width <= len(tour):
+            previous = table[-1]
+            table.append(list(map(min, previous, previous[width:])))
+            width *= 2
+        self.table = table
+
+    def find(self, target, kwargs=None):
+        """Return the number of the first clade matching the target, or None."""
+        if not kwargs:
+            if isinstance(target, TreeElement):
+                return self.numbers.get(target)
+            if isinstance(target, basestring):
+                return self.names.get(target)
+        match = _combine_matchers(target, kwargs, True)
+        for i, clade in enumerate(self.clades):
+            if match(clade):
+                return i
+        return None
+
+    def common_ancestor(self, i, j):
+        """Return the number of the common ancestor of two clades."""
+        start = self.first[i]
+        end = self.first[j]
+        if start > end:
+            start, end = end, start
+        level = (end - start + 1).bit_length() - 1
+        row = self.table[level]
+        return min(row[start], row[end - (1 << level) + 1])
+
+    def path(self, i, ancestor=0):
+        """List the clades below the given ancestor down to clade i."""
+        clades = self.clades
+        parents = self.parents
+        path = []
+        while i != ancestor:
+            path.append(clades[i])
+            i = parents[i]
+        path.reverse()
+        return path
+
+    def terminal_distances(self):
+        """Return the terminal names and distances between them.
+
+        The distances are in condensed form, as a NumPy array if available
+        (otherwise as a list of lists, including the zero diagonal). Each
+        row is made from the previous one, as for the terminals before both
+        in preorder the common ancestors are the same, and for the rest
+        (up to the previous terminal) it is their common ancestor.
+        """
+        clades = self.clades
+        dists = self.dists
+        terms = []
+        # Number of terminals before each clade in preorder
+        before = []
+        for i, clade in enumerate(clades):
+            before.append(len(terms))
+            if not clade.clades:
+                terms.append(i)
+        names = [clades[i].name for i in terms]
+        count = len(terms)
+        term_dists = [dists[i] for i in terms]
+        try:
+            import numpy
+        except ImportError:
+            ancestor_dists = [0] * count
+            rows = [[0]]
+            for r in range(1, count):
+                ancestor = self.common_ancestor(terms[r - 1], terms[r])
+                ancestor_dists[before[ancestor]:r] = \
+                    [dists[ancestor]] * (r - before[ancestor])
+                rows.append([term_dists[r] + term_dists[j] -
+                             2 * ancestor_dists[j] for j in range(r)] + [0])
+            return names, rows
+        condensed = numpy.empty(count * (count - 1) // 2)
+        term_dists = numpy.array(term_dists, float)
+        ancestor_dists = numpy.zeros(count)
+        for r in range(1, count):
+            ancestor = self.common_ancestor(terms[r - 1], terms[r])
+            ancestor_dists[before[ancestor]:r] = dists[ancestor]
+            row = condensed[r * (r - 1) // 2:r * (r + 1) // 2]
+            numpy.add(term_dists[:r], term_dists[r], row)
+            row -= 2 * ancestor_dists[:r]
+        return names, condensed
+
+
 # Class definitions
 
 class TreeElement(object):
@@ -379,6 +538,12 @@ class TreeMixin(object):
             given target, but excluding the root clade.
 
         """
+        index = self._get_index()
+        if index is not None:
+            found = index.find(target, kwargs)
+            if found is None:
+                return None
+            return index.path(found)
         # Only one path will work -- ignore weights and visits
         path = []
         match = _combine_matchers(target, kwargs, True)
@@ -412,11 +577,54 @@ class TreeMixin(object):
 
         Excluding `start`, including `finish`.
         """
+        index = self._get_index()
+        if index is not None:
+            ends = [index.find(start), index.find(finish)]
+            for found, target in zip(ends, (start, finish)):
+                if found is None:
+                    raise ValueError("target %s is not in this tree"
+                                     % repr(target))
+            mrca = index.common_ancestor(*ends)
+            fromstart = index.path(ends[0], mrca)[-2::-1]
+            to = index.path(ends[1], mrca)
+            return fromstart + [index.clades[mrca]] + to
         mrca = self.common_ancestor(start, finish)
         fromstart = mrca.get_path(start)[-2::-1]
         to = mrca.get_path(finish)
         return fromstart + [mrca] + to
 
+    # Indexing methods
+
+    def build_index(self):
+        """Precompute an index to speed up path, ancestor and distance queries.
+
+        Once built, get_path, trace, common_ancestor and distance use the
+        parent and ancestor of each clade and its distance from the root
+        from the index, instead of searching through the tree each time.
+        Finding the common ancestor of two clades then takes constant time.
+        Looking up targets given as clade objects or names takes constant
+        time too, while other kinds of target still need a search.
+
+        The index is rebuilt on next use after the tree is changed by any of
+        the tree manipulation methods (collapse, prune, root_with_outgroup,
+        etc.). If you change a tree directly, e.g. by editing the list of
+        child clades or the branch lengths, call build_index again (or
+        clear_index to stop using one).
+        """
+        _indexes[self] = _TreeIndex(self.root)
+
+    def clear_index(self):
+        """Discard this tree's index, if any (see build_index)."""
+        _indexes.pop(self, None)
+
+    def _get_index(self):
+        """Return this tree's index if one was built, updated if needed."""
+        index = _indexes.get(self)
+        if index is not None and (index.changed or
+                                  index.root is not self.root):
+            index = _indexes[self] = _TreeIndex(self.root)
+        return index
+
     # Information methods
 
     def common_ancestor(self, targets, *more_targets):
@@ -428,6 +636,18 @@ class TreeMixin(object):
          - If any target is not found in this tree, raises a ValueError
 
         """
+        index = self._get_index()
+        if index is not None:
+            mrca = None
+            for t in _combine_args(targets, *more_targets):
+                found = index.find(t)
+                if found is None:
+                    raise ValueError("target %s is not in this tree" % repr(t))
+                if mrca is None:
+                    mrca = found
+                else:
+                    mrca = index.common_ancestor(mrca, found)
+            return index.clades[mrca or 0]
         paths = [self.get_path(t)
                  for t in _combine_args(targets, *more_targets)]
         # Validation -- otherwise izip throws a spooky error below
@@ -484,12 +704,44 @@ class TreeMixin(object):
 
         If only one target is specified, the other is the root of this tree.
         """
+        index = self._get_index()
+        if index is not None:
+            dists = index.dists
+            found = []
+            for target in (target1, target2):
+                if target is None:
+                    continue
+                found.append(index.find(target))
+                if found[-1] is None:
+                    raise ValueError("target %s is not in this tree"
+                                     % repr(target))
+            if len(found) == 1:
+                return dists[found[0]]
+            mrca = index.common_ancestor(*found)
+            return dists[found[0]] + dists[found[1]] - 2 * dists[mrca]
         if target2 is None:
             return sum(n.branch_length for n in self.get_path(target1)
                        if n.branch_length is not None)
         mrca = self.common_ancestor(target1, target2)
         return mrca.distance(target1) + mrca.distance(target2)
 
+    def distance_matrix(self):
+        """Calculate the distances between all the terminals of this tree.
+
+        :returns: a `Bio.Phylo.TreeConstruction.DistanceMatrix`, with the
+            terminals named in the order given by get_terminals().
+
+        This takes time proportional to the size of the matrix, using the
+        common ancestors from the tree's index (see build_index) if built.
+        """
+        from Bio.Phylo.TreeConstruction import DistanceMatrix
+
+        index = self._get_index() or _TreeIndex(self.root)
+        names, distances = index.terminal_distances()
+        if isinstance(distances, list):
+            return DistanceMatrix(names, distances)
+        return DistanceMatrix._from_condensed(names, distances)
+
     def is_bifurcating(self):
         """Return True if tree downstream of node is strictly bifurcating.
 
@@ -587,6 +839,7 @@ class TreeMixin(object):
         for child in popped:
             child.branch_length += extra_length
         parent.clades.extend(popped.clades)
+        _mark_changed(parent, popped)
         return parent
 
     def collapse_all(self, target=None, **kwargs):
@@ -647,6 +900,7 @@ class TreeMixin(object):
         """
         self.root.clades.sort(key=lambda c: c.count_terminals(),
                               reverse=reverse)
+        _mark_changed(self.root)
         for subclade in self.root.clades:
             subclade.ladderize(reverse=reverse)
 
@@ -670,6 +924,7 @@ class TreeMixin(object):
         else:
             parent = path[-2]
         parent.clades.remove(path[-1])
+        _mark_changed(parent)
         if len(parent) == 1:
             # We deleted a branch from a bifurcation
             if parent == self.root:
@@ -711,6 +966,7 @@ class TreeMixin(object):
             clade = clade_cls(name=base_name + str(i),
                               branch_length=branch_length)
             self.root.clades.append(clade)
+        _mark_changed(self.root)
 
 
 class Tree(TreeElement, TreeMixin):
@@ -897,6 +1153,7 @@ class Tree(TreeElement, TreeMixin):
 
         self.root = new_root
         self.rooted = True
+        _mark_changed(old_root, *outgroup_path)
         return
 
     def root_at_midpoint(self):
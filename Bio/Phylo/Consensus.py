@@ -5,9 +5,10 @@
 
 """Classes and methods for finding consensus trees.
 
-This module contains a ``_BitString`` class to assist the consensus tree
-searching and some common consensus algorithms such as strict, majority rule and
-adam consensus.
+This module contains some common consensus algorithms such as strict, majority
+rule and adam consensus. Clades are represented as integers used as bit sets of
+their terminals (see the ``_BitString`` class for an explanation of the idea,
+with the first terminal as the most significant bit).
 """
 from __future__ import division
 
@@ -16,6 +17,10 @@ import itertools
 
 from ast import literal_eval
 from Bio.Phylo import BaseTree
+from Bio.Align import MultipleSeqAlignment
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio._py3k import _as_string, basestring
 
 
 class _BitString(str):
@@ -236,10 +241,10 @@ def strict_consensus(trees):
     # Store bitstrs for strict clades
     strict_bitstrs = [bitstr for bitstr, t in bitstr_counts.items()
                       if t[0] == tree_count]
-    strict_bitstrs.sort(key=lambda bitstr: bitstr.count('1'), reverse=True)
+    strict_bitstrs.sort(key=_count_ones, reverse=True)
     # Create root
     root = BaseTree.Clade()
-    if strict_bitstrs[0].count('1') == len(terms):
+    if _count_ones(strict_bitstrs[0]) == len(terms):
         root.clades.extend(terms)
     else:
         raise ValueError('Taxons in provided trees should be consistent')
@@ -247,12 +252,12 @@ def strict_consensus(trees):
     bitstr_clades = {strict_bitstrs[0]: root}
     # create inner clades
     for bitstr in strict_bitstrs[1:]:
-        clade_terms = [terms[i] for i in bitstr.index_one()]
+        clade_terms = [terms[i] for i in _index_one(bitstr, len(terms))]
         clade = BaseTree.Clade()
         clade.clades.extend(clade_terms)
         for bs, c in bitstr_clades.items():
             # check if it should be the parent of current clade
-            if bs.contains(bitstr):
+            if bs & bitstr == bitstr:
                 # remove old bitstring
                 del bitstr_clades[bs]
                 # update clade childs
@@ -296,11 +301,11 @@ def majority_consensus(trees, cutoff=0):
     # Sort bitstrs by descending #occurrences, then #tips, then tip order
     bitstrs = sorted(bitstr_counts.keys(),
                      key=lambda bitstr: (bitstr_counts[bitstr][0],
-                                         bitstr.count('1'),
-                                         str(bitstr)),
+                                         _count_ones(bitstr),
+                                         bitstr),
                      reverse=True)
     root = BaseTree.Clade()
-    if bitstrs[0].count('1') == len(terms):
+    if _count_ones(bitstrs[0]) == len(terms):
         root.clades.extend(terms)
     else:
         raise ValueError('Taxons in provided trees should be consistent')
@@ -313,13 +318,12 @@ def majority_consensus(trees, cutoff=0):
         confidence = 100.0 * count_in_trees / tree_count
         if confidence < cutoff * 100.0:
             break
-        clade_terms = [terms[i] for i in bitstr.index_one()]
+        clade_terms = [terms[i] for i in _index_one(bitstr, len(terms))]
         clade = BaseTree.Clade()
         clade.clades.extend(clade_terms)
         clade.confidence = confidence
         clade.branch_length = branch_length_sum / count_in_trees
-        bsckeys = sorted(bitstr_clades, key=lambda bs: bs.count('1'),
-                         reverse=True)
+        bsckeys = sorted(bitstr_clades, key=_count_ones, reverse=True)
 
         # check if current clade is compatible with previous clades and
         # record it's possible parent and child clades.
@@ -327,17 +331,19 @@ def majority_consensus(trees, cutoff=0):
         parent_bitstr = None
         child_bitstrs = []  # multiple independent childs
         for bs in bsckeys:
-            if not bs.iscompatible(bitstr):
+            common = bs & bitstr
+            # compatible if one contains the other, or they are independent
+            if common and common != bs and common != bitstr:
                 compatible = False
                 break
             # assign the closest ancestor as its parent
             # as bsckeys is sorted, it should be the last one
-            if bs.contains(bitstr):
+            if common == bitstr:
                 parent_bitstr = bs
             # assign the closest descendant as its child
             # the largest and independent clades
-            if (bitstr.contains(bs) and bs != bitstr and
-                    all(c.independent(bs) for c in child_bitstrs)):
+            if (common == bs and bs != bitstr and
+                    all(not c & bs for c in child_bitstrs)):
                 child_bitstrs.append(bs)
         if not compatible:
             continue
@@ -358,7 +364,7 @@ def majority_consensus(trees, cutoff=0):
         if child_bitstrs:
             remove_list = []
             for c in child_bitstrs:
-                remove_list.extend(c.index_one())
+                remove_list.extend(_index_one(c, len(terms)))
                 child_clade = bitstr_clades[c]
                 parent_clade.clades.remove(child_clade)
                 clade.clades.append(child_clade)
@@ -392,22 +398,23 @@ def _part(clades):
     if len(terms) == 1 or len(terms) == 2:
         new_clade = clades[0]
     else:
-        bitstrs = set([_BitString('1' * len(terms))])
+        term_bits = _terminal_bits(term_names)
+        bitstrs = set([(1 << len(terms)) - 1])
         for clade in clades:
             for child in clade.clades:
-                bitstr = _clade_to_bitstr(child, term_names)
+                bitstr = _clade_to_bitstr(child, term_bits)
                 to_remove = set()
                 to_add = set()
                 for bs in bitstrs:
                     if bs == bitstr:
                         continue
-                    elif bs.contains(bitstr):
+                    elif bs & bitstr == bitstr:
                         to_add.add(bitstr)
                         to_add.add(bs ^ bitstr)
                         to_remove.add(bs)
-                    elif bitstr.contains(bs):
+                    elif bs & bitstr == bs:
                         to_add.add(bs ^ bitstr)
-                    elif not bs.independent(bitstr):
+                    elif bs & bitstr:
                         to_add.add(bs & bitstr)
                         to_add.add(bs & bitstr ^ bitstr)
                         to_add.add(bs & bitstr ^ bs)
@@ -415,17 +422,17 @@ def _part(clades):
                 # bitstrs = bitstrs | to_add
                 bitstrs ^= to_remove
                 if to_add:
-                    for ta in sorted(to_add, key=lambda bs: bs.count('1')):
+                    for ta in sorted(to_add, key=_count_ones):
                         independent = True
                         for bs in bitstrs:
-                            if not ta.independent(bs):
+                            if ta & bs:
                                 independent = False
                                 break
                         if independent:
                             bitstrs.add(ta)
         new_clade = BaseTree.Clade()
         for bitstr in sorted(bitstrs):
-            indices = bitstr.index_one()
+            indices = _index_one(bitstr, len(terms))
             if len(indices) == 1:
                 new_clade.clades.append(terms[indices[0]])
             elif len(indices) == 2:
@@ -471,7 +478,7 @@ def _sub_clade(clade, term_names):
 def _count_clades(trees):
     """Count distinct clades (different sets of terminal names) in the trees.
 
-    Return a tuple first a dict of bitstring (representing clade) and a tuple of its count of
+    Return a tuple first a dict of bit sets (representing clades) and a tuple of its count of
     occurrences and sum of branch length for that clade, second the number of trees processed.
 
     :Parameters:
@@ -481,11 +488,14 @@ def _count_clades(trees):
     """
     bitstrs = {}
     tree_count = 0
+    term_bits = None
     for tree in trees:
         tree_count += 1
-        clade_bitstrs = _tree_to_bitstrs(tree)
-        for clade in tree.find_clades(terminal=False):
-            bitstr = clade_bitstrs[clade]
+        if term_bits is None:
+            # Use the order of the terminals in the first tree
+            term_bits = _terminal_bits(term.name for term in
+                                       tree.find_clades(terminal=True))
+        for clade, bitstr in _clade_bitstrs(tree, term_bits):
             if bitstr in bitstrs:
                 count, sum_bl = bitstrs[bitstr]
                 count += 1
@@ -509,8 +519,8 @@ def get_support(target_tree, trees, len_trees=None):
             when len(trees) is not a valid operation.
 
     """
-    term_names = sorted(term.name
-                        for term in target_tree.find_clades(terminal=True))
+    term_bits = _terminal_bits(sorted(
+        term.name for term in target_tree.find_clades(terminal=True)))
     bitstrs = {}
 
     size = len_trees
@@ -522,12 +532,10 @@ def get_support(target_tree, trees, len_trees=None):
                             "you must provide the number of replicates in trees "
                             "as the optional parameter len_trees.")
 
-    for clade in target_tree.find_clades(terminal=False):
-        bitstr = _clade_to_bitstr(clade, term_names)
+    for clade, bitstr in _clade_bitstrs(target_tree, term_bits):
         bitstrs[bitstr] = (clade, 0)
     for tree in trees:
-        for clade in tree.find_clades(terminal=False):
-            bitstr = _clade_to_bitstr(clade, term_names)
+        for clade, bitstr in _clade_bitstrs(tree, term_bits):
             if bitstr in bitstrs:
                 c, t = bitstrs[bitstr]
                 c.confidence = (t + 1) * 100.0 / size
@@ -538,6 +546,9 @@ def get_support(target_tree, trees, len_trees=None):
 def bootstrap(msa, times):
     """Generate bootstrap replicates from a multiple sequence alignment object
 
+    Each replicate is built directly from a random list of column indices,
+    using the alignment's NumPy array if available.
+
     :Parameters:
         msa : MultipleSeqAlignment
             multiple sequence alignment to generate replicates.
@@ -545,23 +556,17 @@ def bootstrap(msa, times):
             number of bootstrap times.
 
     """
-    length = len(msa[0])
-    i = 0
-    while i < times:
-        i += 1
-        item = None
-        for j in range(length):
-            col = random.randint(0, length - 1)
-            if not item:
-                item = msa[:, col:col + 1]
-            else:
-                item += msa[:, col:col + 1]
-        yield item
+    for columns in _bootstrap_columns(msa, times):
+        yield _bootstrap_replicate(msa, columns)
 
 
-def bootstrap_trees(msa, times, tree_constructor):
+def bootstrap_trees(msa, times, tree_constructor, processes=1):
     """Generate bootstrap replicate trees from a multiple sequence alignment.
 
+    The replicates are the same whether or not the trees are built in
+    parallel, and the trees are returned in the same order as they would
+    be otherwise.
+
     :Parameters:
         msa : MultipleSeqAlignment
             multiple sequence alignment to generate replicates.
@@ -569,17 +574,39 @@ def bootstrap_trees(msa, times, tree_constructor):
             number of bootstrap times.
         tree_constructor : TreeConstructor
             tree constructor to be used to build trees.
+        processes : int
+            Number of worker processes to build the trees in (default 1,
+            use None for one per CPU). The tree constructor must be
+            picklable to use more than one.
 
     """
-    msas = bootstrap(msa, times)
-    for aln in msas:
-        tree = tree_constructor.build_tree(aln)
-        yield tree
-
-
-def bootstrap_consensus(msa, times, tree_constructor, consensus):
+    columns = _bootstrap_columns(msa, times)
+    if processes == 1:
+        for cols in columns:
+            yield tree_constructor.build_tree(_bootstrap_replicate(msa, cols))
+        return
+
+    import multiprocessing
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(processes, _init_bootstrap_worker,
+                                (msa, tree_constructor))
+    try:
+        # Hand out a few replicates at a time, taking the trees as they come
+        for tree in pool.imap(_bootstrap_worker, columns, 4):
+            yield tree
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def bootstrap_consensus(msa, times, tree_constructor, consensus, processes=1):
     """Consensus tree of a series of bootstrap trees for a multiple sequence alignment
 
+    The strict and majority rule methods count the clades of each tree as it
+    is built, so the trees are not all held in memory at once.
+
     :Parameters:
         msa : MultipleSeqAlignment
             Multiple sequence alignment to generate replicates.
@@ -590,39 +617,133 @@ def bootstrap_consensus(msa, times, tree_constructor, consensus):
         consensus : function
             Consensus method in this module: `strict_consensus`,
             `majority_consensus`, `adam_consensus`.
+        processes : int
+            Number of worker processes to build the trees in (default 1,
+            use None for one per CPU).
 
     """
-    trees = bootstrap_trees(msa, times, tree_constructor)
-    tree = consensus(list(trees))
+    trees = bootstrap_trees(msa, times, tree_constructor, processes)
+    if consensus not in (strict_consensus, majority_consensus):
+        trees = list(trees)
+    tree = consensus(trees)
     return tree
 
 
-def _clade_to_bitstr(clade, tree_term_names):
-    """Create a BitString representing a clade, given ordered tree taxon names."""
-    clade_term_names = set(term.name for term in
-                           clade.find_clades(terminal=True))
-    return _BitString.from_bool((name in clade_term_names)
-                                for name in tree_term_names)
+def _bootstrap_columns(msa, times):
+    """Generate lists of randomly chosen column indices (PRIVATE)."""
+    length = len(msa[0])
+    for i in range(times):
+        yield [random.randint(0, length - 1) for j in range(length)]
+
+
+def _bootstrap_replicate(msa, columns):
+    """Build an alignment from the given columns of another (PRIVATE).
+
+    The records keep their identifiers, descriptions and per-letter
+    annotation, as when joining up single column slices of the alignment.
+    """
+    try:
+        letters = msa._make_array()[:, columns]
+    except ImportError:
+        seqs = [str(rec.seq) for rec in msa]
+        seqs = ["".join([seq[i] for i in columns]) for seq in seqs]
+    else:
+        seqs = [_as_string(row.tobytes()) for row in letters]
+    records = []
+    for rec, seq in zip(msa, seqs):
+        new = SeqRecord(Seq(seq, rec.seq.alphabet), id=rec.id, name=rec.name,
+                        description=rec.description, dbxrefs=rec.dbxrefs[:])
+        for key, value in rec.letter_annotations.items():
+            if isinstance(value, basestring):
+                new.letter_annotations[key] = "".join(value[i]
+                                                      for i in columns)
+            else:
+                new.letter_annotations[key] = [value[i] for i in columns]
+        records.append(new)
+    return MultipleSeqAlignment(records, msa._alphabet)
+
+
+# The following are used by bootstrap_trees to build the trees in other
+# processes, and so must be at the top level of the module.
+_worker_data = None
 
 
-def _tree_to_bitstrs(tree):
-    """Create a dict of a tree's clades to corresponding BitStrings."""
-    clades_bitstrs = {}
-    term_names = [term.name for term in tree.find_clades(terminal=True)]
-    for clade in tree.find_clades(terminal=False):
-        bitstr = _clade_to_bitstr(clade, term_names)
-        clades_bitstrs[clade] = bitstr
-    return clades_bitstrs
+def _init_bootstrap_worker(msa, tree_constructor):
+    """Store the alignment and tree constructor in a worker (PRIVATE)."""
+    global _worker_data
+    _worker_data = (msa, tree_constructor)
+
+
+def _bootstrap_worker(columns):
+    """Build the tree for one bootstrap replicate (PRIVATE)."""
+    msa, tree_constructor = _worker_data
+    return tree_constructor.build_tree(_bootstrap_replicate(msa, columns))
+
+
+def _count_ones(bitstr):
+    """Count the terminals in a clade's bit set (PRIVATE)."""
+    return bin(bitstr).count('1')
+
+
+def _index_one(bitstr, length):
+    """Return the indices of the terminals in a clade's bit set (PRIVATE)."""
+    return [i for i in range(length) if bitstr >> (length - 1 - i) & 1]
+
+
+def _terminal_bits(tree_term_names):
+    """Map ordered taxon names to their bits, first name highest (PRIVATE)."""
+    tree_term_names = list(tree_term_names)
+    length = len(tree_term_names)
+    return dict((name, 1 << (length - 1 - i))
+                for i, name in enumerate(tree_term_names))
+
+
+def _clade_to_bitstr(clade, term_bits):
+    """Create a bit set representing a clade, given the taxon name bits."""
+    bitstr = 0
+    for term in clade.find_clades(terminal=True):
+        bitstr |= term_bits.get(term.name, 0)
+    return bitstr
+
+
+def _clade_bitstrs(tree, term_bits=None):
+    """List the non-terminal clades of a tree with their bit sets (PRIVATE).
+
+    The bit sets of the clades are built up from their children, so each
+    tree only needs to be traversed once. The clades are in the same order
+    as from ``tree.find_clades(terminal=False)``. If no taxon name bits are
+    given, the order of the tree's own terminals is used.
+    """
+    # Walk the tree in preorder (without the overhead of find_clades)
+    preorder = []
+    stack = [tree.root]
+    while stack:
+        clade = stack.pop()
+        preorder.append(clade)
+        stack.extend(reversed(clade.clades))
+    if term_bits is None:
+        term_bits = _terminal_bits(clade.name for clade in preorder
+                                   if not clade.clades)
+    bits = {}
+    for clade in reversed(preorder):
+        if clade.clades:
+            bitstr = 0
+            for child in clade.clades:
+                bitstr |= bits[child]
+            bits[clade] = bitstr
+        else:
+            bits[clade] = term_bits.get(clade.name, 0)
+    return [(clade, bits[clade]) for clade in preorder if clade.clades]
 
 
-def _bitstring_topology(tree):
-    """Generates a branch length dict for a tree, keyed by BitStrings.
+def _bitstring_topology(tree, term_bits=None):
+    """Generates a branch length dict for a tree, keyed by bit sets.
 
-    Create a dict of all clades' BitStrings to the corresponding branch
+    Create a dict of all clades' bit sets to the corresponding branch
     lengths (rounded to 5 decimal places).
     """
     bitstrs = {}
-    for clade, bitstr in _tree_to_bitstrs(tree).items():
+    for clade, bitstr in _clade_bitstrs(tree, term_bits):
         bitstrs[bitstr] = round(clade.branch_length or 0.0, 5)
     return bitstrs
 
@@ -634,5 +755,8 @@ def _equal_topology(tree1, tree2):
     """
     term_names1 = set(term.name for term in tree1.find_clades(terminal=True))
     term_names2 = set(term.name for term in tree2.find_clades(terminal=True))
+    # Use the same bits for both trees, whatever the order of the terminals
+    term_bits = _terminal_bits(sorted(term_names1))
     return ((term_names1 == term_names2) and
-            (_bitstring_topology(tree1) == _bitstring_topology(tree2)))
+            (_bitstring_topology(tree1, term_bits) ==
+             _bitstring_topology(tree2, term_bits)))
@@ -11,7 +11,7 @@ See: http://evolution.genetics.washington.edu/phylip/newick_doc.html
 """
 
 import re
-from Bio._py3k import StringIO
+from Bio._py3k import StringIO, basestring
 
 from Bio.Phylo import Newick
 
@@ -35,6 +35,9 @@ tokens = [
 ]
 tokenizer = re.compile('(%s)' % '|'.join(token[0] for token in tokens))
 token_dict = dict((name, re.compile(token)) for (token, name) in tokens)
+# The same tokens without capturing groups, so findall gives whole tokens
+_tokenizer = re.compile('|'.join(re.sub(r"(?<!\\)\((?!\?)", "(?:", token[0])
+                                 for token in tokens))
 
 
 # ---------------------------------------------------------
@@ -74,6 +77,14 @@ def _parse_confidence(text):
         return None
 
 
+def _label_to_confidence(clade):
+    """Use an internal node's label as its confidence value, if numeric."""
+    if clade.name and clade.confidence is None:
+        clade.confidence = _parse_confidence(clade.name)
+        if clade.confidence is not None:
+            clade.name = None
+
+
 def _format_comment(text):
     return '[%s]' % (text.replace('[', '\\[').replace(']', '\\]'))
 
@@ -127,72 +138,81 @@ class Parser(object):
             yield self._parse_tree(buf)
 
     def _parse_tree(self, text):
-        """Parses the text representation into an Tree object."""
-        tokens = re.finditer(tokenizer, text.strip())
+        """Parses the text representation into an Tree object.
 
-        new_clade = self.new_clade
+        This works through the tokens with an explicit stack of the open
+        clades (rather than recursion), so very deep trees are fine too.
+        """
+        tokens = _tokenizer.findall(text.strip())
+
+        new_clade = Newick.Clade
+        values_are_confidence = self.values_are_confidence
+        comments_are_confidence = self.comments_are_confidence
+        # Convert internal node labels to confidence values unless told the
+        # confidence values are elsewhere
+        labels_are_confidence = not (values_are_confidence or
+                                     comments_are_confidence)
         root_clade = new_clade()
-
         current_clade = root_clade
-        entering_branch_length = False
-
+        # Clades still being added to, the innermost last
+        parents = []
         lp_count = 0
         rp_count = 0
-        for match in tokens:
-            token = match.group()
+        index = -1
+        for index, token in enumerate(tokens):
+            char = token[0]
 
-            if token.startswith("'"):
-                # quoted label; add characters to clade name
-                current_clade.name = token[1:-1]
-
-            elif token.startswith('['):
-                # comment
-                current_clade.comment = token[1:-1]
-                if self.comments_are_confidence:
-                    # Try to use this comment as a numeric support value
-                    current_clade.confidence = _parse_confidence(current_clade.comment)
-
-            elif token == '(':
-                # start a new clade, which is a child of the current clade
-                current_clade = new_clade(current_clade)
-                entering_branch_length = False
-                lp_count += 1
+            if char == ':':
+                # branch length or confidence
+                if values_are_confidence:
+                    current_clade.confidence = float(token[1:])
+                else:
+                    current_clade.branch_length = float(token[1:])
 
-            elif token == ',':
+            elif char == ',':
                 # if the current clade is the root, then the external parentheses
                 # are missing and a new root should be created
                 if current_clade is root_clade:
                     root_clade = new_clade()
-                    current_clade.parent = root_clade
+                    parents.append(root_clade)
                 # start a new child clade at the same level as the current clade
-                parent = self.process_clade(current_clade)
-                current_clade = new_clade(parent)
-                entering_branch_length = False
+                if labels_are_confidence and current_clade.clades:
+                    _label_to_confidence(current_clade)
+                parents[-1].clades.append(current_clade)
+                current_clade = new_clade()
 
-            elif token == ')':
+            elif char == '(':
+                # start a new clade, which is a child of the current clade
+                parents.append(current_clade)
+                current_clade = new_clade()
+                lp_count += 1
+
+            elif char == ')':
                 # done adding children for this parent clade
-                parent = self.process_clade(current_clade)
-                if not parent:
+                if not parents:
                     raise NewickError('Parenthesis mismatch.')
+                if labels_are_confidence and current_clade.clades:
+                    _label_to_confidence(current_clade)
+                parent = parents.pop()
+                parent.clades.append(current_clade)
                 current_clade = parent
-                entering_branch_length = False
                 rp_count += 1
 
-            elif token == ';':
-                break
+            elif char == "'":
+                # quoted label; add characters to clade name
+                current_clade.name = token[1:-1]
 
-            elif token.startswith(':'):
-                # branch length or confidence
-                value = float(token[1:])
-                if self.values_are_confidence:
-                    current_clade.confidence = value
-                else:
-                    current_clade.branch_length = value
+            elif char == '[':
+                # comment
+                current_clade.comment = token[1:-1]
+                if comments_are_confidence:
+                    # Try to use this comment as a numeric support value
+                    current_clade.confidence = _parse_confidence(current_clade.comment)
 
-            elif token == '\n':
-                pass
+            elif char == ';':
+                break
 
-            else:
+            elif char != '\n':
                 # unquoted node label
                 current_clade.name = token
 
@@ -200,30 +220,45 @@ class Parser(object):
             raise NewickError('Number of open/close parentheses do not match.')
 
         # if ; token broke out of for loop, there should be no remaining tokens
-        try:
-            next_token = next(tokens)
+        if index + 1 < len(tokens):
             raise NewickError('Text after semicolon in Newick tree: %s'
-                              % next_token.group())
-        except StopIteration:
-            pass
-
-        self.process_clade(current_clade)
-        self.process_clade(root_clade)
+                              % tokens[index + 1])
+
+        if labels_are_confidence and current_clade.clades:
+            _label_to_confidence(current_clade)
+        if parents:
+            parents[-1].clades.append(current_clade)
+            if labels_are_confidence and root_clade.clades:
+                _label_to_confidence(root_clade)
         return Newick.Tree(root=root_clade, rooted=self.rooted)
 
     def new_clade(self, parent=None):
-        """Returns a new Newick.Clade, optionally with a temporary reference
-        to its parent clade.
+        """Return a new Newick.Clade, optionally with a parent (DEPRECATED).
+
+        The parent is held as a temporary reference to the parent clade.
+        This method is deprecated, and no longer used by the parser.
         """
+        # Deprecated in Biopython 1.70
+        import warnings
+        from Bio import BiopythonDeprecationWarning
+        warnings.warn("Parser.new_clade is deprecated, and no longer used by "
+                      "the parser", BiopythonDeprecationWarning)
         clade = Newick.Clade()
         if parent:
             clade.parent = parent
         return clade
 
     def process_clade(self, clade):
-        """Final processing of a parsed clade. Removes the node's parent and
-        returns it.
+        """Add a parsed clade to its parent and return that (DEPRECATED).
+
+        The temporary reference to the parent clade is removed. This method
+        is deprecated, and no longer used by the parser.
         """
+        # Deprecated in Biopython 1.70
+        import warnings
+        from Bio import BiopythonDeprecationWarning
+        warnings.warn("Parser.process_clade is deprecated, and no longer used "
+                      "by the parser", BiopythonDeprecationWarning)
         if ((clade.name) and not
                 (self.values_are_confidence or self.comments_are_confidence) and
                 (clade.confidence is None) and
@@ -269,21 +304,44 @@ class Writer(object):
                                               confidence_as_branch_length, branch_length_only, max_confidence,
                                               format_confidence, format_branch_length)
 
-        def newickize(clade):
-            """Convert a node tree to a Newick tree string, recursively."""
+        unquoted_label = token_dict['unquoted node label'].match
+
+        def format_label(clade):
+            """Return the clade's name, quoted if necessary."""
             label = clade.name or ''
             if label:
-                unquoted_label = re.match(token_dict['unquoted node label'], label)
-                if (not unquoted_label) or (unquoted_label.end() < len(label)):
+                match = unquoted_label(label)
+                if (not match) or (match.end() < len(label)):
                     label = "'%s'" % label.replace(
                         '\\', '\\\\').replace("'", "\\'")
+            return label
 
-            if clade.is_terminal():    # terminal
-                return (label + make_info_string(clade, terminal=True))
-            else:
-                subtrees = (newickize(sub) for sub in clade)
-                return '(%s)%s' % (','.join(subtrees),
-                                   label + make_info_string(clade))
+        def newickize(clade):
+            """Convert a node tree to a Newick tree string.
+
+            Uses an explicit stack of clades and closing strings rather than
+            recursion, so very deep trees can be written too.
+            """
+            parts = []
+            stack = [clade]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, basestring):
+                    # closing text of an internal clade
+                    parts.append(item)
+                elif not item.clades:    # terminal
+                    parts.append(format_label(item) +
+                                 make_info_string(item, terminal=True))
+                else:
+                    parts.append('(')
+                    stack.append(')' + format_label(item) +
+                                 make_info_string(item))
+                    subclades = item.clades
+                    stack.append(subclades[-1])
+                    for sub in reversed(subclades[:-1]):
+                        stack.append(',')
+                        stack.append(sub)
+            return ''.join(parts)
 
         # Convert each tree to a string
         for tree in self.trees:
@@ -144,12 +144,19 @@ def _local(tag):
     return tag
 
 
-def _split_namespace(tag):
+def _split_namespace(tag, _cache={}):
     """Split a tag into namespace and local tag strings."""
+    # Called for every parsing event, but there are only a few distinct tags
     try:
-        return tag[1:].split('}', 1)
+        return _cache[tag]
+    except KeyError:
+        pass
+    try:
+        parts = tuple(tag[1:].split('}', 1))
     except ValueError:
-        return ('', tag)
+        parts = ('', tag)
+    _cache[tag] = parts
+    return parts
 
 
 def _ns(tag, namespace=NAMESPACES['phy']):
@@ -283,11 +290,14 @@ class Parser(object):
     """Methods for parsing all phyloXML nodes from an XML stream.
 
     To minimize memory use, the tree of ElementTree parsing events is cleared
-    after completing each phylogeny, clade, and top-level 'other' element.
+    after completing each phylogeny, clade, and top-level 'other' element, and
+    completed phylogeny and clade elements are removed from their parents.
     Elements below the clade level are kept in memory until parsing of the
     current clade is finished -- this shouldn't be a problem because clade is
     the only recursive element, and non-clade nodes below this level are of
-    bounded size.
+    bounded size. So the memory used by the XML parsing depends on the depth
+    of the tree rather than its size, and ``parse`` hands back each phylogeny
+    as soon as its closing tag is reached.
     """
 
     def __init__(self, file):
@@ -311,6 +321,7 @@ class Parser(object):
                 if localtag == 'phylogeny':
                     phylogeny = self._parse_phylogeny(elem)
                     phyloxml.phylogenies.append(phylogeny)
+                    self.root.remove(elem)
             if event == 'end' and namespace != NAMESPACES['phy']:
                 # Deal with items not specified by phyloXML
                 other_depth -= 1
@@ -326,7 +337,10 @@ class Parser(object):
         phytag = _ns('phylogeny')
         for event, elem in self.context:
             if event == 'start' and elem.tag == phytag:
-                yield self._parse_phylogeny(elem)
+                phylogeny = self._parse_phylogeny(elem)
+                # Drop the finished element before handing back the result
+                self.root.remove(elem)
+                yield phylogeny
 
     # Special parsing cases -- incremental, using self.context
 
@@ -398,6 +412,8 @@ class Parser(object):
             if event == 'start':
                 if tag == 'clade':
                     clade.clades.append(self._parse_clade(elem))
+                    # Drop the cleared element, it is no longer needed
+                    parent.remove(elem)
                     continue
                 if tag == 'taxonomy':
                     clade.taxonomies.append(self._parse_taxonomy(elem))
@@ -303,12 +303,72 @@ class DistanceMatrix(_Matrix):
     """Distance matrix class that can be used for distance based tree algorithms.
 
     All diagonal elements will be zero no matter what the users provide.
+
+    Distance matrices calculated by the DistanceCalculator using NumPy are
+    held in condensed form, as a one dimensional NumPy array of the values
+    below the diagonal (row by row), and are only converted into the nested
+    list form of the matrix attribute if that is used.
     """
 
+    # Either the nested lists or the condensed array will be set
+    _matrix = None
+    _condensed = None
+
     def __init__(self, names, matrix=None):
         _Matrix.__init__(self, names, matrix)
         self._set_zero_diagonal()
 
+    @classmethod
+    def _from_condensed(cls, names, condensed):
+        """Create a distance matrix from a condensed NumPy array (PRIVATE)."""
+        if not isinstance(names, list) or not all(isinstance(s, str) for s in names):
+            raise TypeError("'names' should be a list of strings")
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate names found")
+        if len(condensed) != len(names) * (len(names) - 1) // 2:
+            raise ValueError("'names' and 'matrix' should be the same size")
+        dm = cls.__new__(cls)
+        dm.names = names
+        dm._condensed = condensed
+        return dm
+
+    def _get_matrix(self):
+        if self._matrix is None:
+            # Expand the condensed array into nested lists
+            values = self._condensed.tolist()
+            self._matrix = [values[i * (i - 1) // 2:i * (i + 1) // 2] + [0]
+                            for i in range(len(self.names))]
+            self._condensed = None
+        return self._matrix
+
+    def _set_matrix(self, matrix):
+        self._matrix = matrix
+        self._condensed = None
+
+    matrix = property(_get_matrix, _set_matrix,
+                      doc="Nested list of the lower triangular matrix values.")
+
+    def _condensed_array(self):
+        """Return the values below the diagonal as a NumPy array (PRIVATE)."""
+        import numpy
+
+        if self._condensed is not None:
+            return self._condensed
+        return numpy.array([value for row in self._matrix for value in row[:-1]],
+                           numpy.float64)
+
+    def __getitem__(self, item):
+        if self._condensed is not None and isinstance(item, tuple) \
+                and len(item) == 2 and all(i in self.names for i in item):
+            # Look up a single value without expanding the condensed array
+            row_index, col_index = [self.names.index(i) for i in item]
+            if row_index < col_index:
+                row_index, col_index = col_index, row_index
+            if row_index == col_index:
+                return 0
+            return float(self._condensed[row_index * (row_index - 1) // 2 + col_index])
+        return _Matrix.__getitem__(self, item)
+
     def __setitem__(self, item, value):
         _Matrix.__setitem__(self, item, value)
         self._set_zero_diagonal()
@@ -492,22 +552,118 @@ class DistanceCalculator(object):
             return 1  # max possible scaled distance
         return 1 - (score * 1.0 / max_score)
 
-    def get_distance(self, msa):
+    def get_distance(self, msa, processes=1):
         """Return a DistanceMatrix for MSA object
 
+        If NumPy is available, the alignment is encoded as an array once
+        and the scores for all pairs of sequences are calculated together
+        using matrix products over blocks of rows and columns. Otherwise
+        (or if the sequences differ in length) each pair of sequences is
+        compared in turn.
+
         :Parameters:
             msa : MultipleSeqAlignment
                 DNA or Protein multiple sequence alignment.
+            processes : int
+                Number of worker processes to share the blocks of rows
+                between (default 1, use None for one per CPU). Only used
+                with NumPy.
 
         """
         if not isinstance(msa, MultipleSeqAlignment):
             raise TypeError("Must provide a MultipleSeqAlignment object.")
 
         names = [s.id for s in msa]
-        dm = DistanceMatrix(names)
-        for seq1, seq2 in itertools.combinations(msa, 2):
-            dm[seq1.id, seq2.id] = self._pairwise(seq1, seq2)
-        return dm
+        try:
+            array = msa._make_array()
+        except (ImportError, ValueError):
+            # No NumPy, sequences of different lengths, or non-ASCII letters
+            array = None
+        if array is None or not len(msa):
+            dm = DistanceMatrix(names)
+            for seq1, seq2 in itertools.combinations(msa, 2):
+                dm[seq1.id, seq2.id] = self._pairwise(seq1, seq2)
+            return dm
+
+        import numpy
+
+        distances = self._array_distances(msa, array, processes)
+        return DistanceMatrix._from_condensed(
+            names, distances[numpy.tril_indices(len(names), -1)])
+
+    def _array_distances(self, msa, array, processes=1):
+        """Calculate the distances between all rows of an alignment array.
+
+        Returns a square NumPy array with the distances (matching those
+        from the _pairwise method) in its lower triangle.
+        """
+        import numpy
+
+        n, length = array.shape
+        # Encode each letter as its index in the scoring matrix, with -1
+        # for letters to skip and -2 for letters missing from the matrix
+        present = numpy.flatnonzero(numpy.bincount(array.ravel(order="K"),
+                                                   minlength=256))
+        skip = set(ord(l) for l in self.skip_letters if len(l) == 1)
+        lookup = numpy.full(256, -2, numpy.int16)
+        for code in skip:
+            lookup[code] = -1
+        if self.scoring_matrix:
+            letters = [chr(code) for code in present if code not in skip and
+                       chr(code) in self.scoring_matrix.names]
+            matrix = numpy.zeros((len(letters), len(letters)))
+            for i, l1 in enumerate(letters):
+                for j, l2 in enumerate(letters):
+                    matrix[i, j] = self.scoring_matrix[l1, l2]
+        else:
+            letters = [chr(code) for code in present if code not in skip]
+            matrix = numpy.identity(len(letters))
+        for index, letter in enumerate(letters):
+            lookup[ord(letter)] = index
+        codes = lookup[array]
+
+        if self.scoring_matrix:
+            # Letters missing from the matrix are only an error if compared
+            # to a letter which is not skipped
+            bad = codes == -2
+            valid = codes != -1
+            if (bad & (valid.sum(axis=0) > 1)).any():
+                row, col = _first_bad_letter(bad, valid)
+                raise ValueError("Bad alphabet '%s' in sequence '%s' at position '%s'"
+                                 % (chr(array[row, col]), msa[row].id, col))
+
+        distances = numpy.zeros((n, n))
+        use_max_score = bool(self.scoring_matrix)
+        # Rows per block, so the temporary arrays stay small for large n
+        block = 256
+        if processes == 1 or n < 2:
+            for start in range(0, n, block):
+                end = min(start + block, n)
+                distances[start:end, :end] = _distance_block(
+                    codes, matrix, use_max_score, start, end)
+            return distances
+
+        import multiprocessing
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        # Later rows have more work (lower triangle), so use several blocks
+        # per process, of roughly equal numbers of pairs (and no more pairs
+        # than a block of rows from the end of the matrix)
+        count = max(4 * processes, n // block)
+        starts = sorted(set(int(n * (i / float(count)) ** 0.5)
+                            for i in range(count)))
+        ends = starts[1:] + [n]
+        pool = multiprocessing.Pool(processes, _init_distance_worker,
+                                    (codes, matrix, use_max_score))
+        try:
+            blocks = pool.imap(_distance_worker, list(zip(starts, ends)))
+            for start, end, values in zip(starts, ends, blocks):
+                distances[start:end, :end] = values
+        finally:
+            pool.close()
+            pool.join()
+        return distances
 
     def _build_protein_matrix(self, subsmat):
         """Convert matrix from SubsMat format to _Matrix object"""
@@ -518,6 +674,104 @@ class DistanceCalculator(object):
         return protein_matrix
 
 
+def _distance_block(codes, matrix, use_max_score, start, end):
+    """Return distances from rows start to end, to rows 0 to end (PRIVATE).
+
+    Here codes is an integer array giving the index of each letter of the
+    alignment in the square scoring matrix (negative for letters to skip).
+    If use_max_score is false the scores are divided by the alignment length
+    (as for the identity model), otherwise by the larger of the two scores of
+    the sequences against themselves, over the columns where neither has a
+    letter to skip.
+    """
+    import numpy
+
+    length = codes.shape[1]
+    size = len(matrix)
+    rows = codes[start:end]
+    others = codes[:end]
+    score = numpy.zeros((end - start, end))
+    max_score1 = numpy.zeros((end - start, end))
+    max_score2 = numpy.zeros((end - start, end))
+    letters = numpy.arange(size)
+    diagonal = numpy.append(numpy.diagonal(matrix), 0)
+    # Keep the one-hot encoded columns to roughly a million values
+    width = max(1, 1000000 // (end * max(size, 1)))
+    for col in range(0, length, width):
+        row_hot = (rows[:, col:col + width, None] == letters).astype(numpy.float64)
+        other_hot = (others[:, col:col + width, None] == letters).astype(numpy.float64)
+        chunk = row_hot.shape[1] * size
+        score += numpy.dot(numpy.dot(row_hot, matrix).reshape(end - start, chunk),
+                           other_hot.reshape(end, chunk).T)
+        if use_max_score:
+            row_valid = rows[:, col:col + width] >= 0
+            other_valid = others[:, col:col + width] >= 0
+            # Self scores, zero for skipped letters
+            row_self = diagonal[numpy.where(row_valid, rows[:, col:col + width], -1)]
+            other_self = diagonal[numpy.where(other_valid, others[:, col:col + width], -1)]
+            max_score1 += numpy.dot(row_self, other_valid.T.astype(numpy.float64))
+            max_score2 += numpy.dot(row_valid.astype(numpy.float64), other_self.T)
+    if use_max_score:
+        # Take the higher score if the matrix is asymmetrical
+        max_score = numpy.maximum(max_score1, max_score2)
+    else:
+        max_score = numpy.full(score.shape, float(length))
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        distances = 1 - score / max_score
+    # max possible scaled distance
+    distances[max_score == 0] = 1
+    return distances
+
+
+def _first_bad_letter(bad, valid):
+    """Return the row and column of the letter _pairwise rejects (PRIVATE).
+
+    Here bad and valid are boolean arrays marking the letters missing from
+    the scoring matrix, and the letters which are not skipped (including
+    the bad ones). As in DistanceCalculator._pairwise, the pairs of rows are
+    taken in order, and the first pair comparing a bad letter to a letter
+    which is not skipped fails at its first such column, on the first of
+    the pair's letters which is bad.
+    """
+    import numpy
+
+    # Number of columns where each row is compared to a bad letter of each
+    # row with any bad letters
+    bad_rows = numpy.flatnonzero(bad.any(axis=1))
+    counts = numpy.dot(valid.astype(numpy.float64),
+                       bad[bad_rows].T.astype(numpy.float64))
+    rows, index = numpy.nonzero(counts)
+    others = bad_rows[index]
+    rows, others = rows[rows != others], others[rows != others]
+    first = numpy.minimum(rows, others)
+    second = numpy.maximum(rows, others)
+    pair = numpy.lexsort((second, first))[0]
+    row1, row2 = int(first[pair]), int(second[pair])
+    failing = valid[row1] & valid[row2] & (bad[row1] | bad[row2])
+    col = int(numpy.flatnonzero(failing)[0])
+    if bad[row1, col]:
+        return row1, col
+    return row2, col
+
+
+# The following are used by DistanceCalculator.get_distance to share the
+# work between processes, and so must be at the top level of the module.
+_worker_data = None
+
+
+def _init_distance_worker(codes, matrix, use_max_score):
+    """Store the encoded alignment in a worker process (PRIVATE)."""
+    global _worker_data
+    _worker_data = (codes, matrix, use_max_score)
+
+
+def _distance_worker(bounds):
+    """Return the distances for a block of rows (PRIVATE)."""
+    codes, matrix, use_max_score = _worker_data
+    start, end = bounds
+    return _distance_block(codes, matrix, use_max_score, start, end)
+
+
 class TreeConstructor(object):
     """Base class for all tree constructor."""
 
@@ -616,6 +870,13 @@ class DistanceTreeConstructor(TreeConstructor):
         if not isinstance(distance_matrix, DistanceMatrix):
             raise TypeError("Must provide a DistanceMatrix object.")
 
+        if len(distance_matrix) > 1:
+            try:
+                return self._upgma_array(distance_matrix)
+            except ImportError:
+                # No NumPy, use the pure Python code below
+                pass
+
         # make a copy of the distance matrix to be used
         dm = copy.deepcopy(distance_matrix)
         # init terminal clades
@@ -681,6 +942,13 @@ class DistanceTreeConstructor(TreeConstructor):
         if not isinstance(distance_matrix, DistanceMatrix):
             raise TypeError("Must provide a DistanceMatrix object.")
 
+        if len(distance_matrix) > 2:
+            try:
+                return self._nj_array(distance_matrix)
+            except ImportError:
+                # No NumPy, use the pure Python code below
+                pass
+
         # make a copy of the distance matrix to be used
         dm = copy.deepcopy(distance_matrix)
         # init terminal clades
@@ -751,6 +1019,223 @@ class DistanceTreeConstructor(TreeConstructor):
 
         return BaseTree.Tree(root, rooted=False)
 
+    def _upgma_array(self, distance_matrix):
+        """Construct an UPGMA tree using NumPy (PRIVATE).
+
+        This makes the same choices (including between tied distances) as
+        the pure Python code in the upgma method, but rather than scanning
+        the whole matrix for every merge, keeps the minimum of each row
+        (and its column) and only updates the rows affected by each merge.
+        Rows stay in their original slots, with the new inner clade taking
+        the slot of the second clade merged.
+        """
+        import numpy
+
+        names = distance_matrix.names
+        n = len(names)
+        dm = numpy.zeros((n, n))
+        dm[numpy.tril_indices(n, -1)] = distance_matrix._condensed_array()
+        dm += dm.T
+        active = numpy.ones(n, bool)
+        slots = numpy.arange(n)
+        # Minimum of each row to the left of the diagonal, and the column
+        # of the last occurrence of this minimum
+        row_min = numpy.full(n, numpy.inf)
+        row_arg = numpy.zeros(n, int)
+
+        def update_row(i):
+            values = numpy.where(active[:i], dm[i, :i], numpy.inf)
+            if i and active[:i].any():
+                j = i - 1 - int(numpy.argmin(values[::-1]))
+                row_min[i] = values[j]
+                row_arg[i] = j
+            else:
+                row_min[i] = numpy.inf
+
+        for i in range(1, n):
+            update_row(i)
+
+        clades = [BaseTree.Clade(None, name) for name in names]
+        # Height of each inner clade, as from the _height_of method
+        heights = [None] * n
+        inner_count = 0
+        for _ in range(n - 1):
+            # The last row holding the minimum (as for the >= test used in
+            # the pure Python code)
+            min_dist = row_min.min()
+            min_i = n - 1 - int(numpy.argmin(row_min[::-1]))
+            min_j = int(row_arg[min_i])
+            min_dist = float(min_dist)
+
+            # create clade
+            clade1 = clades[min_i]
+            clade2 = clades[min_j]
+            inner_count += 1
+            inner_clade = BaseTree.Clade(None, "Inner" + str(inner_count))
+            inner_clade.clades.append(clade1)
+            inner_clade.clades.append(clade2)
+            # assign branch length
+            for clade, slot in ((clade1, min_i), (clade2, min_j)):
+                if clade.is_terminal():
+                    clade.branch_length = min_dist * 1.0 / 2
+                else:
+                    clade.branch_length = min_dist * 1.0 / 2 - heights[slot]
+            heights[min_j] = max(c.branch_length if c.is_terminal() else h
+                                 for c, h in ((clade1, heights[min_i]),
+                                              (clade2, heights[min_j])))
+
+            # update node list
+            clades[min_j] = inner_clade
+            clades[min_i] = None
+            active[min_i] = False
+            row_min[min_i] = numpy.inf
+
+            # set the distances of new node at the slot of min_j
+            others = active.copy()
+            others[min_j] = False
+            new_dist = (dm[min_i] + dm[min_j]) * 1.0 / 2
+            dm[min_j, others] = new_dist[others]
+            dm[others, min_j] = new_dist[others]
+
+            # update the row minimums affected
+            update_row(min_j)
+            later = others & (slots > min_j)
+            stale = later & ((row_arg == min_i) | (row_arg == min_j))
+            for k in numpy.flatnonzero(stale):
+                update_row(k)
+            later &= ~stale
+            values = dm[later, min_j]
+            better = (values < row_min[later]) | \
+                ((values == row_min[later]) & (row_arg[later] < min_j))
+            rows = numpy.flatnonzero(later)[better]
+            row_min[rows] = values[better]
+            row_arg[rows] = min_j
+
+        inner_clade.branch_length = 0
+        return BaseTree.Tree(inner_clade)
+
+    def _nj_array(self, distance_matrix):
+        """Construct a Neighbor Joining tree using NumPy (PRIVATE).
+
+        This follows the pure Python code in the nj method, but searches for
+        the pair to join using whole array operations over blocks of rows.
+        Joined nodes are only dropped from the array once half the rows are
+        unused, and otherwise the rows keep their order so that ties are
+        broken in the same way. The row sums are updated after each join,
+        rather than added up again, until few rows are left.
+        """
+        import numpy
+
+        names = distance_matrix.names
+        n = len(names)
+        dm = numpy.zeros((n, n))
+        dm[numpy.tril_indices(n, -1)] = distance_matrix._condensed_array()
+        dm += dm.T
+        alive = numpy.ones(n, bool)
+        live = n
+        clades = [BaseTree.Clade(None, name) for name in names]
+        block = 1024
+        # Added to the diagonal blocks to ignore the values above them
+        upper = numpy.triu(numpy.full((block, block), numpy.inf))
+        inner_count = 0
+        # The sum of each row, updated after each join
+        sums = dm.sum(axis=1)
+        while live > 2:
+            size = len(dm)
+            if size <= block:
+                # Add up each row in order as the pure Python code does,
+                # since ties (as always for the last three nodes) come down
+                # to rounding
+                sums = numpy.cumsum(dm, axis=1)[:, -1]
+            # calculate nodeDist, making Q infinite for any unused rows
+            node_dist = numpy.where(alive, sums / (live - 2), -numpy.inf)
+
+            # Find the rows which (allowing for rounding) may hold the
+            # minimum of Q = dm[i, j] - node_dist[i] - node_dist[j], only
+            # looking below the diagonal
+            row_min = numpy.empty(size)
+            for start in range(0, size, block):
+                end = min(start + block, size)
+                temp = dm[start:end, :end] - node_dist[:end]
+                temp[:, start:] += upper[:end - start, :end - start]
+                row_min[start:end] = temp.min(axis=1)
+            row_min -= node_dist
+            best = row_min.min()
+            tolerance = 1e-10 * (1 + abs(best) + abs(node_dist[alive]).max())
+            candidates = numpy.flatnonzero(row_min <= best + tolerance)
+
+            # Then find the first minimum distance pair (by row then
+            # column), calculated exactly as in the pure Python code
+            min_dist = None
+            for i in candidates:
+                temp = dm[i, :i] - node_dist[i] - node_dist[:i]
+                j = int(numpy.argmin(temp))
+                if min_dist is None or min_dist > temp[j]:
+                    min_dist = temp[j]
+                    min_i = int(i)
+                    min_j = j
+            first, second = numpy.flatnonzero(alive)[:2]
+            if (min_i, min_j) == (second, first):
+                # The pure Python code starts with this pair the other way
+                min_i, min_j = min_j, min_i
+            # create clade
+            clade1 = clades[min_i]
+            clade2 = clades[min_j]
+            inner_count += 1
+            inner_clade = BaseTree.Clade(None, "Inner" + str(inner_count))
+            inner_clade.clades.append(clade1)
+            inner_clade.clades.append(clade2)
+            # assign branch length
+            clade1.branch_length = float(dm[min_i, min_j] + node_dist[min_i] -
+                                         node_dist[min_j]) / 2.0
+            clade2.branch_length = float(dm[min_i, min_j]) - clade1.branch_length
+
+            # update node list
+            clades[min_j] = inner_clade
+            clades[min_i] = None
+            alive[min_i] = False
+            live -= 1
+
+            # set the distances of new node at the index of min_j
+            new_dist = (dm[min_i] + dm[min_j] - dm[min_i, min_j]) / 2.0
+            new_dist[~alive] = 0
+            new_dist[min_j] = 0
+            sums += new_dist - dm[:, min_i] - dm[:, min_j]
+            sums[min_j] = new_dist.sum()
+            sums[min_i] = 0
+            dm[min_j] = new_dist
+            dm[:, min_j] = new_dist
+            dm[min_i] = 0
+            dm[:, min_i] = 0
+
+            if live < size // 2:
+                # Drop the unused rows and columns
+                keep = numpy.flatnonzero(alive)
+                dm = dm[numpy.ix_(keep, keep)]
+                clades = [clades[k] for k in keep]
+                alive = numpy.ones(live, bool)
+                # Start again from exact sums, rather than let the rounding
+                # errors of the updates build up
+                sums = dm.sum(axis=1)
+
+        # set the last clade as one of the child of the inner_clade
+        keep = numpy.flatnonzero(alive)
+        clades = [clades[k] for k in keep]
+        last_dist = float(dm[keep[1], keep[0]])
+        root = None
+        if clades[0] == inner_clade:
+            clades[0].branch_length = 0
+            clades[1].branch_length = last_dist
+            clades[0].clades.append(clades[1])
+            root = clades[0]
+        else:
+            clades[0].branch_length = last_dist
+            clades[1].branch_length = 0
+            clades[1].clades.append(clades[0])
+            root = clades[1]
+
+        return BaseTree.Tree(root, rooted=False)
+
     def _height_of(self, clade):
         """Calculate clade height -- the longest path to any terminal."""
         height = 0
@@ -820,11 +1305,12 @@ class NNITreeSearcher(TreeSearcher):
         while True:
             best_score = self.scorer.get_score(best_tree, alignment)
             temp = best_score
-            for t in self._get_neighbors(best_tree):
+            # Score each neighbor in place, only copying the best ones
+            for t in self._iter_neighbors(best_tree):
                 score = self.scorer.get_score(t, alignment)
                 if score < best_score:
                     best_score = score
-                    best_tree = t
+                    best_tree = copy.deepcopy(t)
             # stop if no smaller score exist
             if best_score >= temp:
                 break
@@ -835,17 +1321,20 @@ class NNITreeSearcher(TreeSearcher):
 
         Currently only for binary rooted trees.
         """
+        return [copy.deepcopy(t) for t in self._iter_neighbors(tree)]
+
+    def _iter_neighbors(self, tree):
+        """Rearrange the given tree into each of its neighbors in turn.
+
+        This yields the given tree itself after each rearrangement, and
+        changes it back at the end, so the neighbors must be used (or copied)
+        before asking for the next one.
+        """
         # make child to parent dict
         parents = {}
         for clade in tree.find_clades():
-            if clade != tree.root:
-                node_path = tree.get_path(clade)
-                # cannot get the parent if the parent is root. Bug?
-                if len(node_path) == 1:
-                    parents[clade] = tree.root
-                else:
-                    parents[clade] = node_path[-2]
-        neighbors = []
+            for child in clade.clades:
+                parents[child] = clade
         root_childs = []
         for clade in tree.get_nonterminals(order="level"):
             if clade == tree.root:
@@ -864,15 +1353,13 @@ class NNITreeSearcher(TreeSearcher):
                     del right.clades[1]
                     left.clades.append(right_right)
                     right.clades.append(left_right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    yield tree
                     # neighbor 2 (left_left + right_left)
                     del left.clades[1]
                     del right.clades[0]
                     left.clades.append(right_left)
                     right.clades.append(right_right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    yield tree
                     # change back (left_left + left_right)
                     del left.clades[1]
                     del right.clades[0]
@@ -894,15 +1381,13 @@ class NNITreeSearcher(TreeSearcher):
                     del clade.clades[1]
                     parent.clades.append(right)
                     clade.clades.append(sister)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    yield tree
                     # neighbor 2 (parent + left)
                     del parent.clades[1]
                     del clade.clades[0]
                     parent.clades.append(left)
                     clade.clades.append(right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    yield tree
                     # change back (parent + sister)
                     del parent.clades[1]
                     del clade.clades[0]
@@ -915,21 +1400,18 @@ class NNITreeSearcher(TreeSearcher):
                     del clade.clades[1]
                     parent.clades.insert(0, right)
                     clade.clades.append(sister)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    yield tree
                     # neighbor 2 (parent + left)
                     del parent.clades[0]
                     del clade.clades[0]
                     parent.clades.insert(0, left)
                     clade.clades.append(right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    yield tree
                     # change back (parent + sister)
                     del parent.clades[0]
                     del clade.clades[0]
                     parent.clades.insert(0, sister)
                     clade.clades.insert(0, left)
-        return neighbors
 
 # ######################## Parsimony Classes ##########################
 
@@ -951,13 +1433,18 @@ class ParsimonyScorer(Scorer):
             self.matrix = matrix
         else:
             raise TypeError("Must provide a _Matrix object.")
+        # Site patterns and subtree states for the last alignment scored
+        self._array = None
+        self._array_matrix = None
+        self._cache = {}
 
     def get_score(self, tree, alignment):
         """Calculate parsimony score using the Fitch algorithm
 
         Calculate and return the parsimony score given a tree and the
         MSA using either the Fitch algorithm (without a penalty matrix)
-        or the Sankoff algorithm (with a matrix).
+        or the Sankoff algorithm (with a matrix). All three children of a
+        trifurcating root are included in the score.
         """
         # make sure the tree is rooted and bifurcating
         if not tree.is_bifurcating():
@@ -971,6 +1458,10 @@ class ParsimonyScorer(Scorer):
         if not all(t.name == a.id for t, a in zip(terms, alignment)):
             raise ValueError(
                 "Taxon names of the input tree should be the same with the alignment.")
+        try:
+            return self._get_score_array(tree, terms, alignment)
+        except ImportError:
+            pass
         # term_align = dict(zip(terms, alignment))
         score = 0
         for i in range(len(alignment[0])):
@@ -990,12 +1481,15 @@ class ParsimonyScorer(Scorer):
                 clade_states = dict(zip(terms, [set([c]) for c in column_i]))
                 for clade in tree.get_nonterminals(order="postorder"):
                     clade_childs = clade.clades
-                    left_state = clade_states[clade_childs[0]]
-                    right_state = clade_states[clade_childs[1]]
-                    state = left_state & right_state
-                    if not state:
-                        state = left_state | right_state
-                        score_i = score_i + 1
+                    state = clade_states[clade_childs[0]]
+                    # a trifurcating root takes the third child in turn
+                    for child in clade_childs[1:]:
+                        right_state = clade_states[child]
+                        left_state = state
+                        state = left_state & right_state
+                        if not state:
+                            state = left_state | right_state
+                            score_i = score_i + 1
                     clade_states[clade] = state
             # Sankoff algorithm with the penalty matrix
             else:
@@ -1011,23 +1505,18 @@ class ParsimonyScorer(Scorer):
                     clade_scores[terms[j]] = array
                 # bottom up calculation
                 for clade in tree.get_nonterminals(order="postorder"):
-                    clade_childs = clade.clades
-                    left_score = clade_scores[clade_childs[0]]
-                    right_score = clade_scores[clade_childs[1]]
-                    array = []
-                    for m in range(length):
-                        min_l = inf
-                        min_r = inf
-                        for n in range(length):
-                            sl = self.matrix[
-                                alphabet[m], alphabet[n]] + left_score[n]
-                            sr = self.matrix[
-                                alphabet[m], alphabet[n]] + right_score[n]
-                            if min_l > sl:
-                                min_l = sl
-                            if min_r > sr:
-                                min_r = sr
-                        array.append(min_l + min_r)
+                    # the cost of each child (three for a trifurcating root)
+                    array = [0] * length
+                    for child in clade.clades:
+                        child_score = clade_scores[child]
+                        for m in range(length):
+                            min_c = inf
+                            for n in range(length):
+                                sc = self.matrix[
+                                    alphabet[m], alphabet[n]] + child_score[n]
+                                if min_c > sc:
+                                    min_c = sc
+                            array[m] += min_c
                     clade_scores[clade] = array
                 # minimum from root score
                 score_i = min(array)
@@ -1035,6 +1524,116 @@ class ParsimonyScorer(Scorer):
             score = score + score_i
         return score
 
+    def _get_score_array(self, tree, terms, alignment):
+        """Calculate the parsimony score using NumPy (PRIVATE).
+
+        Identical informative columns are only scored once, weighted by how
+        often they occur, and the states of every column are held in arrays
+        (as bit masks for the Fitch algorithm) so each clade takes a single
+        step. The states of each subtree are cached, so a tree which only
+        differs from those already scored by a rearrangement (as in an NNI
+        search) only needs the rearranged subtrees recalculated.
+        """
+        import numpy
+
+        array = alignment._make_array()
+        if self._array is None or self.matrix is not self._array_matrix or \
+                not numpy.array_equal(array, self._array):
+            self._set_site_patterns(array)
+        if not self._weights.size or tree.root.is_terminal():
+            return 0
+        cache = self._cache
+        if len(cache) > self._max_cache:
+            cache.clear()
+        # Subtrees are keyed on the (unordered) sets of their child keys,
+        # starting from the terminals' rows in the sorted alignment
+        keys = dict((term, i) for i, term in enumerate(terms))
+        for clade in tree.get_nonterminals(order="postorder"):
+            # Two children, or three for a trifurcating root (in order, as
+            # the Fitch states then depend on the order they are taken in)
+            child_keys = [keys[child] for child in clade.clades]
+            if len(child_keys) == 2:
+                key = frozenset(child_keys)
+            else:
+                key = tuple(child_keys)
+            keys[clade] = key
+            if key in cache:
+                continue
+            children = [self._tip_states[k] if isinstance(k, int)
+                        else cache[k] for k in child_keys]
+            if not self.matrix:
+                # Fitch algorithm, storing the states and score, taking any
+                # third child in turn as the pure Python code does
+                state, score = children[0]
+                for right in children[1:]:
+                    left = state
+                    state = left & right[0]
+                    empty = state == 0
+                    state[empty] = left[empty] | right[0][empty]
+                    score = score + right[1] + self._weights[empty].sum()
+                cache[key] = (state, score)
+            else:
+                # Sankoff algorithm, storing the minimum costs of each state
+                step = self._step_matrix
+                cost = sum(numpy.min(step + child[0][:, None, :], axis=2)
+                           for child in children)
+                cache[key] = (cost,)
+        root = cache[keys[tree.root]]
+        if not self.matrix:
+            return int(root[1])
+        return float(numpy.dot(self._weights, root[0].min(axis=1)))
+
+    def _set_site_patterns(self, array):
+        """Find the distinct informative columns and terminal states (PRIVATE)."""
+        import numpy
+
+        self._array = array
+        self._array_matrix = self.matrix
+        self._cache = {}
+        informative = (array != array[0]).any(axis=0)
+        columns = numpy.ascontiguousarray(array[:, informative].T)
+        if columns.size:
+            rows = columns.view(numpy.dtype((numpy.void, columns.shape[1])))
+            index, weights = numpy.unique(rows.ravel(), return_index=True,
+                                          return_counts=True)[1:]
+            patterns = columns[index].T
+        else:
+            patterns = columns.T
+            weights = numpy.zeros(0, int)
+        self._weights = weights
+        if not self.matrix:
+            # A bit for each letter, using Python integers if too many
+            letters = numpy.unique(patterns)
+            for dtype in (numpy.uint8, numpy.uint16, numpy.uint32,
+                          numpy.uint64, object):
+                if dtype is object or len(letters) <= 8 * dtype().itemsize:
+                    break
+            bits = numpy.zeros(256, dtype)
+            bits[letters] = [1 << i for i in range(len(letters))]
+            self._tip_states = [(state, 0) for state in bits[patterns]]
+        else:
+            alphabet = self.matrix.names
+            self._step_matrix = numpy.array([[self.matrix[a, b]
+                                              for b in alphabet]
+                                             for a in alphabet], float)
+            codes = numpy.full(256, -1, int)
+            for i, letter in enumerate(alphabet):
+                if len(letter) == 1:
+                    codes[ord(letter)] = i
+            letters = patterns
+            patterns = codes[letters]
+            if (patterns < 0).any():
+                letter = chr(letters[patterns < 0][0])
+                raise ValueError("%r is not in list" % letter)
+            self._tip_states = []
+            for row in patterns:
+                cost = numpy.full((len(row), len(alphabet)), numpy.inf)
+                cost[numpy.arange(len(row)), row] = 0
+                self._tip_states.append((cost,))
+        # Keep up to about 64MB of subtree states
+        size = self._tip_states[0][0].nbytes if weights.size else 1
+        self._max_cache = max(4 * len(array), 2 ** 26 // size)
+
 
 class ParsimonyTreeConstructor(TreeConstructor):
     """Parsimony tree constructor.
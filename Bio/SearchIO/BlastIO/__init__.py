@@ -169,6 +169,22 @@ The blast-xml write function also accepts 'use_raw_query_ids' and
 writer are set to 'True'. This is because the writer is meant to mimic native
 BLAST result as much as possible.
 
+For large BLAST XML files with many long alignments, the parser also accepts
+a boolean 'lazy_seqs' parameter (default 'False'). When set to 'True', the
+aligned query and hit sequences of each HSP fragment are stored as plain
+strings and only turned into SeqRecord objects when the fragment's 'query'
+or 'hit' attribute is first accessed. This reduces the memory used and the
+time taken when only the coordinates or scores of the HSPs are needed:
+
+    >>> from Bio import SearchIO
+    >>> qresult = next(SearchIO.parse('Blast/xml_2226_blastp_004.xml',
+    ...                               'blast-xml', lazy_seqs=True))
+    >>> hsp = qresult[0][0]
+    >>> hsp.hit_start, hsp.hit_end
+    (3, 101)
+    >>> print(hsp.hit.seq[:10])
+    KRIREGYLVK
+
 
 blast-tab
 =========
@@ -315,6 +331,14 @@ well:
 |              | version       | BLAST version              |
 +--------------+---------------+----------------------------+
 
+For very large tabular files where only a few fields are needed, creating the
+SearchIO objects for every row can take much longer than reading the file.
+In that case, the BlastTabRowParser class in this module can be used
+directly. It accepts the same 'comments' and 'fields' arguments, plus a list
+of the fields to return ('columns'), and yields the query ID and a list of
+value tuples (or a NumPy structured array, using 'arrays=True') for each
+query. The values are not changed to the SearchIO coordinate conventions.
+
 
 blast-text
 ==========
@@ -407,6 +431,7 @@ The blast-text parser provides the following object attributes:
 """
 
 from .blast_tab import BlastTabParser, BlastTabIndexer, BlastTabWriter
+from .blast_tab import BlastTabRowParser
 from .blast_xml import BlastXmlParser, BlastXmlIndexer, BlastXmlWriter
 from .blast_text import BlastTextParser
 
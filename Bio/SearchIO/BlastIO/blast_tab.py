@@ -6,6 +6,7 @@
 """Bio.SearchIO parser for BLAST+ tab output format, with or without comments."""
 
 import re
+from itertools import groupby
 
 from Bio._py3k import _as_bytes, _bytes_to_string
 from Bio._py3k import basestring
@@ -14,7 +15,8 @@ from Bio.SearchIO._index import SearchIndexer
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
 
 
-__all__ = ('BlastTabIndexer', 'BlastTabParser', 'BlastTabWriter')
+__all__ = ('BlastTabIndexer', 'BlastTabParser', 'BlastTabRowParser',
+           'BlastTabWriter')
 
 
 # longname-shortname map
@@ -144,6 +146,25 @@ _MIN_HIT_FIELDS = set(['sseqid', 'sacc', 'saccver', 'sallseqid'])
 _RE_GAPOPEN = re.compile(r'\w-')
 
 
+def _get_field_maps(fields):
+    """Returns the (object, attribute, caster) tuple of each field (PRIVATE).
+
+    Unsupported fields get None instead of a tuple.
+    """
+    field_maps = []
+    for field in fields:
+        for level, mapping in (('qresult', _COLUMN_QRESULT),
+                               ('hit', _COLUMN_HIT),
+                               ('hsp', _COLUMN_HSP),
+                               ('frag', _COLUMN_FRAG)):
+            if field in mapping:
+                field_maps.append((level,) + mapping[field])
+                break
+        else:
+            field_maps.append(None)
+    return field_maps
+
+
 def _compute_gapopen_num(hsp):
     """Returns the number of gap openings in the given HSP."""
     gapopen = 0
@@ -210,7 +231,7 @@ class BlastTabParser(object):
     def __iter__(self):
         # stop iteration if file has no lines
         if not self.line:
-            raise StopIteration
+            return
         # determine which iterator to use
         elif self.has_comments:
             iterfunc = self._parse_commented_qresult
@@ -220,7 +241,8 @@ class BlastTabParser(object):
         for qresult in iterfunc():
             yield qresult
 
-    def _prep_fields(self, fields):
+    @staticmethod
+    def _prep_fields(fields):
         """Validates and formats the given fields for use by the parser."""
         # cast into list if fields is a space-separated string
         if isinstance(fields, basestring):
@@ -312,6 +334,60 @@ class BlastTabParser(object):
         fields = [_LONG_SHORT_MAP[long_name] for long_name in long_fields]
         return self._prep_fields(fields)
 
+    def _iter_rows(self):
+        """Iterator returning the parsed values of each result row (PRIVATE).
+
+        Used by Bio.SearchIO.read_columns, which stores the values as column
+        arrays instead of building QueryResult objects. The rows are those
+        the QueryResult objects from parsing the file would have, with the
+        query and hit IDs and the fragment values (see _get_frag_values)
+        resolved in the same way.
+        """
+        if not self.line:
+            return
+        if not self.has_comments:
+            for parsed in self._iter_qresult_rows():
+                yield parsed
+            return
+        # as in _parse_commented_qresult
+        while True:
+            comments = self._parse_comments()
+            if not comments:
+                break
+            if 'fields' not in comments:
+                # the query has no results
+                continue
+            self.fields = comments['fields']
+            for parsed in self._iter_qresult_rows():
+                for key, value in comments.items():
+                    if key != 'fields':
+                        parsed['qresult'][key] = value
+                yield parsed
+
+    def _iter_qresult_rows(self):
+        """Iterator returning the parsed rows up to a comment line (PRIVATE).
+
+        Like _parse_qresult, any comment lines before the first row are
+        skipped.
+        """
+        has_rows = False
+        while self.line:
+            if self.line.startswith('#'):
+                if has_rows:
+                    break
+                self.line = self.handle.readline().strip()
+                continue
+            has_rows = True
+            parsed = self._parse_result_row()
+            parsed['qresult']['id'] = self._get_id(parsed['qresult'])
+            parsed['hit']['id'] = self._get_id(parsed['hit'])
+            # values left as None (e.g. without frames) need no columns
+            parsed['frag'] = dict((attr, value) for attr, value in
+                                  self._get_frag_values(parsed['frag']).items()
+                                  if value is not None)
+            yield parsed
+            self.line = self.handle.readline().strip()
+
     def _parse_result_row(self):
         """Returns a dictionary of parsed row values."""
         fields = self.fields
@@ -319,30 +395,21 @@ class BlastTabParser(object):
         assert len(fields) == len(columns), "Expected %i columns, found: " \
             "%i" % (len(fields), len(columns))
 
-        qresult, hit, hsp, frag = {}, {}, {}, {}
-        for idx, value in enumerate(columns):
-            sname = fields[idx]
-            # flag to check if any of the _COLUMNs contain sname
-            in_mapping = False
-            # iterate over each dict, mapping pair to determine
-            # attribute name and value of each column
-            for parsed_dict, mapping in (
-                    (qresult, _COLUMN_QRESULT),
-                    (hit, _COLUMN_HIT),
-                    (hsp, _COLUMN_HSP),
-                    (frag, _COLUMN_FRAG)):
-                # process parsed value according to mapping
-                if sname in mapping:
-                    attr_name, caster = mapping[sname]
-                    if caster is not str:
-                        value = caster(value)
-                    parsed_dict[attr_name] = value
-                    in_mapping = True
-            # make sure that any unhandled field is not supported
-            if not in_mapping:
-                assert sname not in _SUPPORTED_FIELDS
-
-        return {'qresult': qresult, 'hit': hit, 'hsp': hsp, 'frag': frag}
+        # the attribute name and caster of each field only change with
+        # the fields, so look them up once instead of for every row
+        if getattr(self, '_mapped_fields', None) is not fields:
+            self._field_maps = _get_field_maps(fields)
+            self._mapped_fields = fields
+
+        parsed = {'qresult': {}, 'hit': {}, 'hsp': {}, 'frag': {}}
+        for value, field_map in zip(columns, self._field_maps):
+            if field_map is not None:
+                level, attr_name, caster = field_map
+                if caster is not str:
+                    value = caster(value)
+                parsed[level][attr_name] = value
+
+        return parsed
 
     def _get_id(self, parsed):
         """Returns the value used for a QueryResult or Hit ID from a parsed row."""
@@ -413,31 +480,8 @@ class BlastTabParser(object):
                 # every line is essentially an HSP with one fragment, so we
                 # create both of these for every line
                 frag = HSPFragment(prev_hid, prev_qid)
-                for attr, value in prev['frag'].items():
-                    # adjust coordinates to Python range
-                    # NOTE: this requires both start and end coords to be
-                    # present, otherwise a KeyError will be raised.
-                    # Without this limitation, we might misleadingly set the
-                    # start / end coords
-                    for seq_type in ('query', 'hit'):
-                        if attr == seq_type + '_start':
-                            value = min(value,
-                                    prev['frag'][seq_type + '_end']) - 1
-                        elif attr == seq_type + '_end':
-                            value = max(value,
-                                    prev['frag'][seq_type + '_start'])
+                for attr, value in self._get_frag_values(prev['frag']).items():
                     setattr(frag, attr, value)
-                # strand and frame setattr require the full parsed values
-                # to be set first
-                for seq_type in ('hit', 'query'):
-                    # try to set hit and query frame
-                    frame = self._get_frag_frame(frag, seq_type,
-                            prev['frag'])
-                    setattr(frag, '%s_frame' % seq_type, frame)
-                    # try to set hit and query strand
-                    strand = self._get_frag_strand(frag, seq_type,
-                            prev['frag'])
-                    setattr(frag, '%s_strand' % seq_type, strand)
 
                 hsp = HSP([frag])
                 for attr, value in prev['hsp'].items():
@@ -470,12 +514,39 @@ class BlastTabParser(object):
 
             self.line = self.handle.readline().strip()
 
-    def _get_frag_frame(self, frag, seq_type, parsedict):
-        """Returns `HSPFragment` frame given the object, its sequence type,
+    def _get_frag_values(self, parsedict):
+        """Returns the `HSPFragment` attribute values from its parsed values.
+
+        The coordinates are adjusted to Python ranges, and the hit and query
+        frames and strands are added.
+        """
+        values = {}
+        for attr, value in parsedict.items():
+            # adjust coordinates to Python range
+            # NOTE: this requires both start and end coords to be
+            # present, otherwise a KeyError will be raised.
+            # Without this limitation, we might misleadingly set the
+            # start / end coords
+            for seq_type in ('query', 'hit'):
+                if attr == seq_type + '_start':
+                    value = min(value, parsedict[seq_type + '_end']) - 1
+                elif attr == seq_type + '_end':
+                    value = max(value, parsedict[seq_type + '_start'])
+            values[attr] = value
+        # strand and frame require the full parsed values to be set first
+        for seq_type in ('hit', 'query'):
+            values['%s_frame' % seq_type] = self._get_frag_frame(
+                values, seq_type, parsedict)
+            values['%s_strand' % seq_type] = self._get_frag_strand(
+                values, seq_type, parsedict)
+        return values
+
+    def _get_frag_frame(self, values, seq_type, parsedict):
+        """Returns `HSPFragment` frame given its values, its sequence type,
         and its parsed dictionary values.
         """
         assert seq_type in ('query', 'hit')
-        frame = getattr(frag, '%s_frame' % seq_type, None)
+        frame = values.get('%s_frame' % seq_type)
         if frame is not None:
             return frame
         else:
@@ -485,17 +556,24 @@ class BlastTabParser(object):
                 return int(parsedict['frames'].split('/')[idx])
             # else implicit None return
 
-    def _get_frag_strand(self, frag, seq_type, parsedict):
-        """Returns `HSPFragment` strand given the object, its sequence type,
+    def _get_frag_strand(self, values, seq_type, parsedict):
+        """Returns `HSPFragment` strand given its values, its sequence type,
         and its parsed dictionary values.
         """
         # NOTE: this will never set the strands as 0 for protein
         # queries / hits, since we can't detect the blast flavors
         # from the columns alone.
         assert seq_type in ('query', 'hit')
-        strand = getattr(frag, '%s_strand' % seq_type, None)
+        strand = values.get('%s_strand' % seq_type)
         if strand is not None:
             return strand
+        # as in HSPFragment, the strand follows from any frame
+        frame = values.get('%s_frame' % seq_type)
+        if frame is not None:
+            try:
+                return frame // abs(frame)
+            except ZeroDivisionError:
+                return 0
         else:
             # using parsedict instead of the fragment object since
             # we need the unadjusted coordinated values
@@ -506,6 +584,199 @@ class BlastTabParser(object):
             # else implicit None return
 
 
+class BlastTabRowParser(object):
+    """Fast parser for the BLAST tabular format, returning plain values.
+
+    Unlike BlastTabParser, this parser does not create any QueryResult, Hit,
+    HSP or HSPFragment objects. The file is read in large chunks which are
+    split into values in one go, and only the requested columns are
+    converted. The rows are grouped by query in the same way as indexing
+    does: consecutive rows with the same query ID (the 'qseqid', 'qacc' or
+    'qaccver' field) form one group. Iterating over the parser yields the
+    query ID and its rows for each group:
+
+    >>> from Bio.SearchIO.BlastIO import BlastTabRowParser
+    >>> with open('Blast/tab_2226_tblastn_001.txt') as handle:
+    ...     parser = BlastTabRowParser(handle, columns=['sseqid', 'evalue'])
+    ...     for query_id, rows in parser:
+    ...         print("%s %i %r" % (query_id, len(rows), rows[0]))
+    ...
+    gi|16080617|ref|NP_391444.1| 3 ('gi|145479850|ref|XM_001425911.1|', 1e-05)
+    gi|11464971:4-101 9 ('gi|350596019|ref|XM_003360601.2|', 2e-67)
+
+    The values are converted to the same types as in the SearchIO objects,
+    but are otherwise given as they are in the file. In particular the
+    coordinates are not changed to the SearchIO conventions (zero-based,
+    with the start smaller than the end). Comment lines are skipped; if
+    'comments' is True, the field order is taken from the '# Fields:' line.
+
+    With 'arrays' set to True, the rows of each query are given as a NumPy
+    structured array with the column names as field names instead of a list
+    of tuples. This requires NumPy.
+    """
+
+    def __init__(self, handle, comments=False, fields=_DEFAULT_FIELDS,
+                 columns=None, arrays=False, chunk_size=1048576):
+        """Initialize the parser.
+
+        Arguments:
+         - handle     - Handle to the BLAST tabular file.
+         - comments   - Whether to read the fields from the comment lines.
+         - fields     - Fields of the file, as for BlastTabParser.
+         - columns    - List of the fields to return, defaults to all.
+         - arrays     - Whether to return NumPy arrays instead of tuples.
+         - chunk_size - Number of characters to read from the file at once.
+
+        """
+        self.handle = handle
+        self.has_comments = comments
+        self.arrays = arrays
+        self.chunk_size = chunk_size
+        self._columns = columns
+        self._rows_seen = False
+        self._set_fields(BlastTabParser._prep_fields(fields))
+
+    def _set_fields(self, fields):
+        """Sets the fields of the file and the columns to return (PRIVATE)."""
+        columns = self._columns
+        if columns is None:
+            columns = fields
+        elif isinstance(columns, basestring):
+            columns = columns.strip().split(' ')
+        for key_field in ('qseqid', 'qacc', 'qaccver'):
+            if key_field in fields:
+                self._key_idx = fields.index(key_field)
+                break
+        for column in columns:
+            if column not in fields:
+                raise ValueError("Column %r is not one of the fields %r"
+                                 % (column, fields))
+        self.fields = fields
+        self.columns = list(columns)
+        self._col_idxs = [fields.index(column) for column in columns]
+        field_maps = _get_field_maps(fields)
+        self._casters = [str if field_maps[idx] is None else
+                         field_maps[idx][2] for idx in self._col_idxs]
+
+    def __iter__(self):
+        key = None
+        parts = []
+        for keys, rows in self._iter_chunk_rows():
+            start = 0
+            for chunk_key, group in groupby(keys):
+                end = start + len(list(group))
+                if chunk_key != key:
+                    if parts:
+                        yield key, self._join(parts)
+                    key, parts = chunk_key, []
+                parts.append(rows[start:end])
+                start = end
+        if parts:
+            yield key, self._join(parts)
+
+    def _join(self, parts):
+        """Joins the rows of a query split over several chunks (PRIVATE)."""
+        if len(parts) == 1:
+            return parts[0]
+        if self.arrays:
+            import numpy
+            return numpy.concatenate(parts)
+        return [row for part in parts for row in part]
+
+    def _iter_chunks(self):
+        """Iterator returning blocks of complete lines from the file (PRIVATE)."""
+        read = self.handle.read
+        chunk_size = self.chunk_size
+        remainder = ''
+        while True:
+            data = read(chunk_size)
+            if not data:
+                break
+            data = remainder + data
+            cut = data.rfind('\n') + 1
+            remainder = data[cut:]
+            if cut:
+                yield data[:cut]
+        if remainder:
+            yield remainder + '\n'
+
+    def _strip_comments(self, chunk):
+        """Removes comment and blank lines from a block of lines (PRIVATE)."""
+        lines = []
+        for line in chunk.splitlines(True):
+            if line.startswith('#'):
+                if self.has_comments and line.startswith('# Fields: '):
+                    long_fields = line[len('# Fields: '):].strip().split(', ')
+                    fields = [_LONG_SHORT_MAP[long_name] for long_name
+                              in long_fields]
+                    if fields != self.fields:
+                        if self._rows_seen:
+                            raise ValueError("Fields changed within the "
+                                             "file, from %r to %r"
+                                             % (self.fields, fields))
+                        self._set_fields(BlastTabParser._prep_fields(fields))
+            elif line.strip():
+                lines.append(line)
+        return ''.join(lines)
+
+    def _iter_chunk_rows(self):
+        """Iterator returning the query IDs and rows of each chunk (PRIVATE)."""
+        for chunk in self._iter_chunks():
+            if chunk[0] in '#\n' or '\n#' in chunk or '\n\n' in chunk:
+                chunk = self._strip_comments(chunk)
+            row_count = chunk.count('\n')
+            if not row_count:
+                continue
+            self._rows_seen = True
+            field_count = len(self.fields)
+            # all the lines are split at once, so each column is found as
+            # every field_count-th value
+            values = chunk.replace('\n', '\t').split('\t')
+            values.pop()
+            if len(values) != row_count * field_count:
+                for line in chunk.splitlines():
+                    column_count = len(line.split('\t'))
+                    if column_count != field_count:
+                        raise ValueError("Expected %i columns, found %i: %r"
+                                         % (field_count, column_count, line))
+            keys = values[self._key_idx::field_count]
+            columns = [values[idx::field_count] for idx in self._col_idxs]
+            if self.arrays:
+                rows = self._make_array(columns, row_count)
+            else:
+                columns = [column if caster is str else
+                           list(map(caster, column)) for column, caster
+                           in zip(columns, self._casters)]
+                if columns:
+                    rows = list(zip(*columns))
+                else:
+                    rows = [()] * row_count
+            yield keys, rows
+
+    def _make_array(self, columns, row_count):
+        """Returns the columns as a NumPy structured array (PRIVATE)."""
+        import numpy
+
+        arrays = []
+        for column, caster in zip(columns, self._casters):
+            if caster in (int, float):
+                # NumPy converts the strings itself, which is faster
+                arrays.append(numpy.array(column, dtype=caster))
+            else:
+                array = numpy.empty(row_count, dtype=object)
+                if caster is str:
+                    array[:] = column
+                else:
+                    array[:] = [caster(value) for value in column]
+                arrays.append(array)
+        rows = numpy.empty(row_count, dtype=[
+            (str(name), array.dtype) for name, array
+            in zip(self.columns, arrays)])
+        for name, array in zip(self.columns, arrays):
+            rows[name] = array
+        return rows
+
+
 class BlastTabIndexer(SearchIndexer):
     """Indexer class for BLAST+ tab output."""
 
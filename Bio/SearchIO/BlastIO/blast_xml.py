@@ -76,6 +76,9 @@ _ELEM_FRAG = {
     'Hsp_hseq': ('hit', str),
     'Hsp_qseq': ('query', str),
 }
+# elements with the query ID, description, and length within <Iteration>
+_ELEM_QRESULT_INFO = ('Iteration_query-ID', 'Iteration_query-def',
+                      'Iteration_query-len')
 # dictionary for mapping tag name and meta key name
 _ELEM_META = {
     'BlastOutput_db': ('target', str),
@@ -223,10 +226,14 @@ def _extract_ids_and_descs(raw_id, raw_desc):
 class BlastXmlParser(object):
     """Parser for the BLAST XML format"""
 
-    def __init__(self, handle, use_raw_query_ids=False, use_raw_hit_ids=False):
+    def __init__(self, handle, use_raw_query_ids=False, use_raw_hit_ids=False,
+                 lazy_seqs=False):
         self.xml_iter = iter(ElementTree.iterparse(handle, events=('start', 'end')))
         self._use_raw_query_ids = use_raw_query_ids
         self._use_raw_hit_ids = use_raw_hit_ids
+        self._lazy_seqs = lazy_seqs
+        # parent of the Iteration elements, if any
+        self._iterations_elem = None
         self._meta, self._fallback = self._parse_preamble()
 
     def __iter__(self):
@@ -268,7 +275,9 @@ class BlastXmlParser(object):
                 elem.clear()
                 continue
 
-            if event == 'start' and elem.tag == 'Iteration':
+            if event == 'start' and elem.tag == 'BlastOutput_iterations':
+                self._iterations_elem = elem
+            elif event == 'start' and elem.tag == 'Iteration':
                 break
 
         # we only want the version number, sans the program name or date
@@ -280,55 +289,30 @@ class BlastXmlParser(object):
 
     def _parse_qresult(self):
         """Parses query results."""
+        # values of the query ID, description, and length elements
+        query_info = {}
+        query_id = None
+        # hits are parsed as soon as each <Hit> is complete, rather than at the
+        # end of the query, so the XML elements of all hits need not be kept
+        hits_elem = None
+        hit_list, key_set = [], set()
         # parse the queries
         for event, qresult_elem in self.xml_iter:
-            # </Iteration> marks the end of a single query
-            # which means we can process it
-            if event == 'end' and qresult_elem.tag == 'Iteration':
+            if event == 'end' and qresult_elem.tag in _ELEM_QRESULT_INFO:
+                query_info[qresult_elem.tag] = qresult_elem.text or ''
 
-                # we'll use the following schema
-                # <!ELEMENT Iteration (
-                #        Iteration_iter-num,
-                #        Iteration_query-ID?,
-                #        Iteration_query-def?,
-                #        Iteration_query-len?,
-                #        Iteration_hits?,
-                #        Iteration_stat?,
-                #        Iteration_message?)>
+            elif event == 'start' and qresult_elem.tag == 'Iteration_hits':
+                hits_elem = qresult_elem
 
-                # assign query attributes with fallbacks
-                query_id = qresult_elem.findtext('Iteration_query-ID')
+            elif event == 'end' and qresult_elem.tag == 'Hit':
                 if query_id is None:
-                    query_id = self._fallback['id']
-
-                query_desc = qresult_elem.findtext('Iteration_query-def')
-                if query_desc is None:
-                    query_desc = self._fallback['description']
-
-                query_len = qresult_elem.findtext('Iteration_query-len')
-                if query_len is None:
-                    query_len = self._fallback['len']
-
-                blast_query_id = query_id
-                # handle blast searches against databases with Blast's IDs
-                # 'Query_' marks the beginning of a BLAST+-generated ID,
-                # 'lcl|' marks the beginning of a BLAST legacy-generated ID
-                if not self._use_raw_query_ids and \
-                        (query_id.startswith('Query_') or query_id.startswith('lcl|')):
-                    # store the Blast-generated query ID
-                    id_desc = query_desc.split(' ', 1)
-                    query_id = id_desc[0]
-                    try:
-                        query_desc = id_desc[1]
-                    except IndexError:
-                        query_desc = ''
-
-                hit_list, key_list = [], []
-                for hit in self._parse_hit(qresult_elem.find('Iteration_hits'),
-                        query_id):
+                    # all query elements come before the hits
+                    query_id, query_desc, query_len, blast_query_id = \
+                        self._get_query_info(query_info)
+                for hit in self._parse_hit([qresult_elem], query_id):
                     if hit:
                         # need to keep track of hit IDs, since there could be duplicates,
-                        if hit.id in key_list:
+                        if hit.id in key_set:
                             warnings.warn("Renaming hit ID %r to a BLAST-generated ID "
                                     "%r since the ID was already matched "
                                     "by your query %r. Your BLAST database may contain "
@@ -342,9 +326,29 @@ class BlastXmlParser(object):
                             for hsp in hit:
                                 hsp.hit_id = hit.blast_id
                         else:
-                            key_list.append(hit.id)
+                            key_set.add(hit.id)
 
                         hit_list.append(hit)
+                # the hit element has been cleared, drop it altogether
+                hits_elem.remove(qresult_elem)
+
+            # </Iteration> marks the end of a single query
+            # which means we can process it
+            elif event == 'end' and qresult_elem.tag == 'Iteration':
+
+                # we'll use the following schema
+                # <!ELEMENT Iteration (
+                #        Iteration_iter-num,
+                #        Iteration_query-ID?,
+                #        Iteration_query-def?,
+                #        Iteration_query-len?,
+                #        Iteration_hits?,
+                #        Iteration_stat?,
+                #        Iteration_message?)>
+
+                if query_id is None:
+                    query_id, query_desc, query_len, blast_query_id = \
+                        self._get_query_info(query_info)
 
                 # create qresult and assign its attributes
                 qresult = QueryResult(hit_list, query_id)
@@ -380,13 +384,56 @@ class BlastXmlParser(object):
 
                 # delete element after we finish parsing it
                 qresult_elem.clear()
+                if self._iterations_elem is not None:
+                    self._iterations_elem.remove(qresult_elem)
+                query_info = {}
+                query_id = None
+                hits_elem = None
+                hit_list, key_set = [], set()
                 yield qresult
 
+    def _get_query_info(self, query_info):
+        """Return the query ID, description, length, and BLAST ID (PRIVATE).
+
+        :param query_info: text of the query elements of the Iteration
+        :type query_info: dictionary {element tag: text}
+
+        """
+        # assign query attributes with fallbacks
+        query_id = query_info.get('Iteration_query-ID')
+        if query_id is None:
+            query_id = self._fallback['id']
+
+        query_desc = query_info.get('Iteration_query-def')
+        if query_desc is None:
+            query_desc = self._fallback['description']
+
+        query_len = query_info.get('Iteration_query-len')
+        if query_len is None:
+            query_len = self._fallback['len']
+
+        blast_query_id = query_id
+        # handle blast searches against databases with Blast's IDs
+        # 'Query_' marks the beginning of a BLAST+-generated ID,
+        # 'lcl|' marks the beginning of a BLAST legacy-generated ID
+        if not self._use_raw_query_ids and \
+                (query_id.startswith('Query_') or query_id.startswith('lcl|')):
+            # store the Blast-generated query ID
+            id_desc = query_desc.split(' ', 1)
+            query_id = id_desc[0]
+            try:
+                query_desc = id_desc[1]
+            except IndexError:
+                query_desc = ''
+
+        return query_id, query_desc, query_len, blast_query_id
+
     def _parse_hit(self, root_hit_elem, query_id):
-        """Generator that transforms Iteration_hits XML elements into Hit objects.
+        """Generator that transforms Hit XML elements into Hit objects.
 
-        :param root_hit_elem: root element of the Iteration_hits tag.
-        :type root_hit_elem: XML element tag
+        :param root_hit_elem: Hit elements, e.g. the Iteration_hits element
+                              or a list with a single complete Hit element.
+        :type root_hit_elem: XML element tag or list of them
         :param query_id: QueryResult ID of this Hit
         :type query_id: string
 
@@ -497,6 +544,11 @@ class BlastXmlParser(object):
                     # recast only if value is not intended to be str
                     elif caster is not str:
                         value = caster(value)
+                    elif self._lazy_seqs and val_info[0] in ('hit', 'query'):
+                        # store the plain string, the fragment only makes
+                        # it into a SeqRecord when it is first accessed
+                        setattr(frag, '_' + val_info[0], value)
+                        continue
                     setattr(frag, val_info[0], value)
 
             # set the similarity characters into aln_annotation dict
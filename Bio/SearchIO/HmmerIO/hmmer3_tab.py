@@ -33,6 +33,18 @@ class Hmmer3TabParser(object):
             for qresult in self._parse_qresult():
                 yield qresult
 
+    def _iter_rows(self):
+        """Iterator returning the parsed values of each result row (PRIVATE).
+
+        Used by Bio.SearchIO.read_columns, which stores the values as column
+        arrays instead of building QueryResult objects.
+        """
+        while self.line.startswith('#'):
+            self.line = self.handle.readline()
+        while self.line and not self.line.startswith('#'):
+            yield self._parse_row()
+            self.line = self.handle.readline()
+
     def _parse_row(self):
         """Returns a dictionary of parsed row values."""
         cols = [x for x in self.line.strip().split(' ') if x]
@@ -66,6 +66,14 @@ functions Bio.SearchIO.index(...) or Bio.SearchIO.index_db(...). They have a
 similar interface to their counterparts in SeqIO and AlignIO, with the addition
 of optional, format-specific keyword arguments.
 
+For filtering or summarizing very many hits, the tabular formats can also be
+read with Bio.SearchIO.read_columns(...), which stores the results as NumPy
+column arrays (one row per HSP) instead of QueryResult objects. Existing
+QueryResult objects can be stored this way with Bio.SearchIO.to_columns(...).
+The resulting SearchColumns objects support bulk filtering, sorting and
+grouping, and can be turned back into QueryResult objects when needed. These
+functions require NumPy.
+
 
 Output
 ======
@@ -211,7 +219,8 @@ warnings.warn('Bio.SearchIO is an experimental submodule which may undergo '
         BiopythonExperimentalWarning)
 
 
-__all__ = ('read', 'parse', 'to_dict', 'index', 'index_db', 'write', 'convert')
+__all__ = ('read', 'parse', 'to_dict', 'index', 'index_db', 'write', 'convert',
+           'read_columns', 'to_columns')
 
 
 # dictionary of supported formats for parse() and read()
@@ -251,6 +260,15 @@ _INDEXER_MAP = {
         'phmmer3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmqueryIndexer'),
 }
 
+# dictionary of supported formats for read_columns()
+_COLUMNS_MAP = {
+        'blast-tab': ('BlastIO', 'BlastTabParser'),
+        'hmmer3-tab': ('HmmerIO', 'Hmmer3TabParser'),
+        'hmmscan3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmhitParser'),
+        'hmmsearch3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmqueryParser'),
+        'phmmer3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmqueryParser'),
+}
+
 # dictionary of supported formats for write()
 _WRITER_MAP = {
         'blast-tab': ('BlastIO', 'BlastTabWriter'),
@@ -419,6 +437,60 @@ def to_dict(qresults, key_function=lambda rec: rec.id):
     return qdict
 
 
+def read_columns(handle, format=None, **kwargs):
+    """Reads a tabular search output file into NumPy column arrays.
+
+     - handle - Handle to the file, or the filename as a string.
+     - format - Lower case string denoting one of the supported formats.
+     - kwargs - Format-specific keyword arguments.
+
+    Returns a SearchColumns object holding one row per HSP, with columns
+    named after the SearchIO attributes (query and hit attributes prefixed
+    by 'query_' and 'hit_'). This is supported for the 'blast-tab',
+    'hmmer3-tab', and the HMMER3 domain table formats, and requires NumPy::
+
+        from Bio import SearchIO
+        cols = SearchIO.read_columns('Blast/mirna.tab', 'blast-tab',
+                                     comments=True)
+        best = cols.filter(cols['evalue'] < 1e-20)
+        for query_id, group in best.group_by('query_id'):
+            print("Search %s has %i HSPs" % (query_id, len(group)))
+
+    Unlike `parse`, the QueryResult objects are only created when asked for,
+    using the SearchColumns ``to_qresults`` method. These only have the
+    attributes stored in the columns (e.g. no sequences or program details).
+
+    """
+    # check the format before importing NumPy
+    parser = get_processor(format, _COLUMNS_MAP)
+    from Bio.SearchIO._columns import SearchColumns
+
+    with as_handle(handle, 'rU') as source_file:
+        rows = parser(source_file, **kwargs)._iter_rows()
+        return SearchColumns._from_rows(rows)
+
+
+def to_columns(qresults):
+    """Turns QueryResult objects into NumPy column arrays.
+
+     - qresults - Iterable returning QueryResult objects.
+
+    Returns a SearchColumns object (see `read_columns`) with one row per HSP.
+    The columns stored are the attributes present on the first HSP, its hit
+    and query, so all HSPs are expected to have the same attributes. This
+    requires NumPy::
+
+        from Bio import SearchIO
+        qresults = SearchIO.parse('Blast/mirna.xml', 'blast-xml')
+        cols = SearchIO.to_columns(qresults)
+        top = cols.sort('bitscore', reverse=True)
+
+    """
+    from Bio.SearchIO._columns import SearchColumns
+
+    return SearchColumns.from_qresults(qresults)
+
+
 def index(filename, format=None, key_function=None, **kwargs):
     """Indexes a search output file and returns a dictionary-like object.
 
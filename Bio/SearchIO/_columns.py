@@ -0,0 +1,318 @@
+# Copyright 2017 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Column based storage of search results (PRIVATE).
+
+You are not expected to access this module directly. Instead, use the
+Bio.SearchIO.read_columns and Bio.SearchIO.to_columns functions, which
+return SearchColumns objects.
+
+Each row of a SearchColumns object is one HSP (with a single fragment), and
+each column holds one attribute of the HSP, its fragment, its hit, or its
+query. Column names follow the SearchIO attribute names, with the query and
+hit attributes prefixed by 'query_' and 'hit_' respectively, for example:
+
+    - query_id, query_seq_len - QueryResult.id, QueryResult.seq_len
+    - hit_id, hit_evalue      - Hit.id, Hit.evalue
+    - evalue, bitscore        - HSP.evalue, HSP.bitscore
+    - query_start, hit_end    - HSPFragment.query_start, HSPFragment.hit_end
+
+Coordinates use the same zero-based, half-open convention as the rest of
+Bio.SearchIO.
+"""
+
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SearchIO columns.")
+
+from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+
+
+# attributes stored as columns, for each object level
+# list-valued and sequence attributes are not stored
+_LEVEL_ATTRS = (
+    ('qresult', 'query_', ('id', 'accession', 'accession_version', 'gi',
+                           'seq_len', 'description')),
+    ('hit', 'hit_', ('id', 'accession', 'accession_version', 'gi',
+                     'seq_len', 'description', 'title', 'evalue', 'bitscore',
+                     'bias', 'domain_exp_num', 'region_num', 'cluster_num',
+                     'overlap_num', 'env_num', 'domain_obs_num',
+                     'domain_reported_num', 'domain_included_num',
+                     'query_coverage')),
+    ('hsp', '', ('evalue', 'bitscore', 'bitscore_raw', 'bias', 'ident_num',
+                 'ident_pct', 'pos_num', 'pos_pct', 'mismatch_num', 'gap_num',
+                 'gapopen_num', 'query_coverage', 'btop', 'domain_index',
+                 'evalue_cond', 'env_start', 'env_end', 'acc_avg')),
+    ('frag', '', ('aln_span', 'query_start', 'query_end', 'hit_start',
+                  'hit_end', 'query_strand', 'hit_strand', 'query_frame',
+                  'hit_frame')),
+)
+
+# column name -> (object level, attribute name)
+_COLUMN_ATTRS = OrderedDict(
+    (prefix + attr, (level, attr))
+    for level, prefix, attrs in _LEVEL_ATTRS for attr in attrs)
+
+
+def _to_array(values):
+    """Return a NumPy array of the given column values (PRIVATE).
+
+    Numbers are stored as integer or float arrays, anything else (e.g.
+    strings, or numbers mixed with missing values) as object arrays.
+    """
+    array = numpy.array(values)
+    if array.dtype.kind not in 'biuf' or array.ndim != 1:
+        array = numpy.empty(len(values), dtype=object)
+        array[:] = values
+    return array
+
+
+def _get_attrs(obj, attrs):
+    """Return a dictionary of the given attributes set on an object (PRIVATE)."""
+    values = {}
+    for attr in attrs:
+        try:
+            value = getattr(obj, attr)
+        except (AttributeError, ValueError):
+            # ValueError is raised by HSP for single fragment
+            # attributes of multiple fragment HSPs
+            continue
+        if value is not None:
+            values[attr] = value
+    return values
+
+
+class SearchColumns(object):
+    """Search results held as one NumPy array per attribute.
+
+    The results are stored in a NumPy structured array, available as the
+    ``array`` attribute, with one row per HSP. A single column is returned
+    by indexing with its name:
+
+    >>> from Bio import SearchIO
+    >>> cols = SearchIO.read_columns('Blast/tab_2226_tblastn_001.txt',
+    ...                              'blast-tab')
+    >>> len(cols)
+    12
+    >>> cols.fields[:4]
+    ('query_id', 'hit_id', 'evalue', 'bitscore')
+
+    Rows are selected using boolean arrays, so filters that would be written
+    as ``hit_filter`` or ``hsp_filter`` callbacks on QueryResult objects
+    become a single NumPy expression over all queries:
+
+    >>> strong = cols.filter((cols['evalue'] < 1e-10) & (cols['aln_span'] > 90))
+    >>> len(strong)
+    4
+    >>> for hit_id in strong['hit_id']:
+    ...     print(hit_id)
+    gi|350596019|ref|XM_003360601.2|
+    gi|301779869|ref|XM_002925302.1|
+    gi|296223671|ref|XM_002757683.1|
+    gi|338714227|ref|XM_001492113.3|
+
+    Rows can also be sorted on any column, and grouped on any column:
+
+    >>> for query_id, group in cols.sort('bitscore', reverse=True).group_by():
+    ...     print("%s %i %s" % (query_id, len(group), group['hit_id'][0]))
+    gi|11464971:4-101 9 gi|301779869|ref|XM_002925302.1|
+    gi|16080617|ref|NP_391444.1| 3 gi|145479850|ref|XM_001425911.1|
+
+    Finally, the rows can be turned back into QueryResult objects:
+
+    >>> for qresult in strong.to_qresults():
+    ...     print(repr(qresult))
+    QueryResult(id='gi|11464971:4-101', 4 hits)
+
+    """
+
+    def __init__(self, array):
+        """Initialize the class from a NumPy structured array."""
+        self.array = array
+
+    @classmethod
+    def _from_rows(cls, rows):
+        """Build a SearchColumns object from parsed values (PRIVATE).
+
+        The rows argument is an iterable of dictionaries, each mapping the
+        'qresult', 'hit', 'hsp', and 'frag' levels to a dictionary of the
+        attribute values of one HSP. The columns stored are the attributes
+        present in the first row; values missing from later rows are stored
+        as None.
+        """
+        rows = iter(rows)
+        try:
+            first = next(rows)
+        except StopIteration:
+            return cls(numpy.empty(0, dtype=[('query_id', object),
+                                             ('hit_id', object)]))
+        names = []
+        getters = []
+        for name, (level, attr) in _COLUMN_ATTRS.items():
+            if attr in first[level]:
+                names.append(name)
+                getters.append((level, attr))
+        columns = [[] for name in names]
+        appenders = [(column.append, level, attr) for column, (level, attr)
+                     in zip(columns, getters)]
+        for append, level, attr in appenders:
+            append(first[level][attr])
+        for row in rows:
+            for append, level, attr in appenders:
+                append(row[level].get(attr))
+
+        arrays = [_to_array(column) for column in columns]
+        array = numpy.empty(len(arrays[0]),
+                            dtype=[(str(name), values.dtype) for name, values
+                                   in zip(names, arrays)])
+        for name, values in zip(names, arrays):
+            array[name] = values
+        return cls(array)
+
+    @classmethod
+    def from_qresults(cls, qresults):
+        """Build a SearchColumns object from QueryResult objects.
+
+        The columns stored are the attributes of the first HSP, its hit and
+        its query. HSPs with more than one fragment are stored as one row,
+        using the HSP's overall coordinates.
+        """
+        return cls._from_rows(cls._iter_qresult_rows(qresults))
+
+    @staticmethod
+    def _iter_qresult_rows(qresults):
+        """Yield the parsed values of each HSP in the QueryResults (PRIVATE)."""
+        level_attrs = dict((level, attrs) for level, prefix, attrs
+                           in _LEVEL_ATTRS)
+        for qresult in qresults:
+            qresult_values = _get_attrs(qresult, level_attrs['qresult'])
+            for hit in qresult:
+                hit_values = _get_attrs(hit, level_attrs['hit'])
+                for hsp in hit:
+                    yield {'qresult': qresult_values, 'hit': hit_values,
+                           'hsp': _get_attrs(hsp, level_attrs['hsp']),
+                           'frag': _get_attrs(hsp, level_attrs['frag'])}
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, name):
+        """Return the column with the given name as a NumPy array."""
+        return self.array[name]
+
+    def __repr__(self):
+        return "%s(%i rows, fields=%r)" % (self.__class__.__name__,
+                                           len(self), self.fields)
+
+    @property
+    def fields(self):
+        """Names of the columns, as a tuple."""
+        return self.array.dtype.names
+
+    def filter(self, mask):
+        """Return a new SearchColumns with the rows selected by the mask.
+
+        The mask is a boolean array with one value per row, usually made by
+        comparing columns, for example ``cols['evalue'] < 1e-5``. An array of
+        row indices may also be used.
+        """
+        mask = numpy.asarray(mask)
+        if mask.dtype.kind == 'b' and mask.shape != self.array.shape:
+            raise ValueError("Mask has %i values, expected %i"
+                             % (len(mask), len(self)))
+        return self.__class__(self.array[mask])
+
+    def sort(self, key='evalue', reverse=False):
+        """Return a new SearchColumns with the rows sorted on a column.
+
+        The sort is stable, so rows with equal values keep their order.
+        """
+        values = self.array[key]
+        if reverse:
+            last = len(values) - 1
+            order = (last - numpy.argsort(values[::-1], kind='mergesort'))[::-1]
+        else:
+            order = numpy.argsort(values, kind='mergesort')
+        return self.__class__(self.array[order])
+
+    def group_by(self, key='query_id'):
+        """Iterate over the rows grouped by the values of a column.
+
+        Yields a tuple of the column value and a SearchColumns object with
+        the rows having that value. Groups are returned in the order their
+        value first appears, and keep the order of their rows.
+        """
+        values = self.array[key]
+        if not len(values):
+            return
+        unique, first, inverse = numpy.unique(values, return_index=True,
+                                              return_inverse=True)
+        inverse = inverse.ravel()
+        order = numpy.argsort(inverse, kind='mergesort')
+        ends = numpy.cumsum(numpy.bincount(inverse))
+        starts = ends - numpy.bincount(inverse)
+        for idx in numpy.argsort(first):
+            rows = order[starts[idx]:ends[idx]]
+            yield unique[idx], self.__class__(self.array[rows])
+
+    def to_qresults(self):
+        """Iterate over the rows as QueryResult objects.
+
+        Rows are grouped into QueryResult and Hit objects by their query and
+        hit IDs, in the order these first appear. Each row becomes an HSP
+        with a single fragment. Only the attributes stored in the columns
+        are set on the objects.
+        """
+        fields = [name for name in self.fields if name in _COLUMN_ATTRS]
+        columns = dict((name, self.array[name].tolist()) for name in fields)
+        # IDs are set when creating the objects, so skip them here
+        level_columns = {}
+        for name in fields:
+            level, attr = _COLUMN_ATTRS[name]
+            if attr != 'id':
+                level_columns.setdefault(level, []).append(
+                    (attr, columns[name]))
+
+        def set_attrs(obj, level, idx):
+            for attr, values in level_columns.get(level, ()):
+                value = values[idx]
+                if value is not None:
+                    setattr(obj, attr, value)
+
+        query_ids = columns['query_id']
+        hit_ids = columns['hit_id']
+
+        queries = OrderedDict()
+        for idx, (query_id, hit_id) in enumerate(zip(query_ids, hit_ids)):
+            queries.setdefault(query_id, OrderedDict()).setdefault(
+                hit_id, []).append(idx)
+
+        for query_id, hit_rows in queries.items():
+            hits = []
+            for hit_id, rows in hit_rows.items():
+                hsps = []
+                for idx in rows:
+                    frag = HSPFragment(hit_id, query_id)
+                    set_attrs(frag, 'frag', idx)
+                    hsp = HSP([frag])
+                    set_attrs(hsp, 'hsp', idx)
+                    hsps.append(hsp)
+                hit = Hit(hsps)
+                set_attrs(hit, 'hit', rows[0])
+                hits.append(hit)
+            qresult = QueryResult(hits, query_id)
+            set_attrs(qresult, 'qresult', next(iter(hit_rows.values()))[0])
+            yield qresult
+
+
+# if not used as a module, run the doctest
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
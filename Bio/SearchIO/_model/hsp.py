@@ -834,6 +834,10 @@ class HSPFragment(_BaseHSP):
         return seq
 
     def _hit_get(self):
+        if isinstance(self._hit, basestring):
+            # parsers may store the plain sequence string, which is only
+            # turned into a SeqRecord when first needed
+            self._hit = self._set_seq(self._hit, 'hit')
         return self._hit
 
     def _hit_set(self, value):
@@ -843,6 +847,8 @@ class HSPFragment(_BaseHSP):
             doc="""Hit sequence as a SeqRecord object, defaults to None""")
 
     def _query_get(self):
+        if isinstance(self._query, basestring):
+            self._query = self._set_seq(self._query, 'query')
         return self._query
 
     def _query_set(self, value):
@@ -870,12 +876,13 @@ class HSPFragment(_BaseHSP):
 
     def _alphabet_set(self, value):
         self._alphabet = value
+        # plain sequence strings get the alphabet when made into SeqRecords
         try:
-            self.query.seq.alphabet = value
+            self._query.seq.alphabet = value
         except AttributeError:
             pass
         try:
-            self.hit.seq.alphabet = value
+            self._hit.seq.alphabet = value
         except AttributeError:
             pass
 
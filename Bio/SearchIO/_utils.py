@@ -127,8 +127,10 @@ def fragcascade(attr, seq_type, doc=''):
 
     def setter(self, value):
         setattr(self, attr_name, value)
-        seq = getattr(self, seq_type)
-        if seq is not None:
+        # no need to update a plain sequence string, it gets the new value
+        # when it is made into a SeqRecord
+        seq = getattr(self, '_' + seq_type, None)
+        if seq is not None and not isinstance(seq, basestring):
             setattr(seq, attr, value)
 
     return property(fget=getter, fset=setter, doc=doc)
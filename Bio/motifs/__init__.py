@@ -8,7 +8,9 @@
 Bio.motifs contains the core Motif class containing various I/O methods
 as well as methods for motif comparisons and motif searching in sequences.
 It also includes functionality for parsing output from the AlignACE, MEME,
-and MAST programs, as well as files in the TRANSFAC format.
+and MAST programs, as well as files in the TRANSFAC format. To search long
+sequences for many motifs at once, see Bio.motifs.scanner, and to compare
+many motifs with each other, see Bio.motifs.comparison.
 
 Bio.motifs is replacing the older and now obsolete Bio.Motif module.
 """
@@ -0,0 +1,232 @@
+# Copyright 2017 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Compare many position-specific scoring matrices with each other.
+
+The dist_pearson method of a PositionSpecificScoringMatrix compares two
+motifs, trying each offset in turn. Clustering a motif collection needs
+this for every pair, which means a great many calls. The dist_pearson_matrix
+function here gives the same results for all pairs at once, scoring each
+offset for all the pairs together with NumPy:
+
+>>> from Bio import motifs
+>>> from Bio.motifs.comparison import dist_pearson_matrix
+>>> pssms = []
+>>> for filename in ("motifs/SRF.pfm", "motifs/REB1.pfm"):
+...     with open(filename) as handle:
+...         motif = motifs.read(handle, "pfm")
+...     motif.pseudocounts = 0.5
+...     pssms.append(motif.pssm)
+>>> distances, offsets, reverse = dist_pearson_matrix(pssms, both=True)
+>>> print("%0.3f %i %s" % (distances[0, 1], offsets[0, 1], reverse[0, 1]))
+0.080 -8 False
+>>> distance, offset = pssms[0].dist_pearson(pssms[1])
+>>> print("%0.3f %i" % (distance, offset))
+0.080 -8
+
+"""
+
+from __future__ import print_function
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.motifs.comparison.")
+
+from Bio._py3k import range
+
+
+class _Profiles(object):
+    """Scores of several PSSMs, padded to the same length (PRIVATE).
+
+    Holds an array of the scores indexed by motif, position and letter,
+    with zeros past the end of the shorter motifs, the motif lengths, and
+    the cumulative sums of the scores and their squares over the positions.
+    """
+
+    def __init__(self, values, lengths):
+        self.values = values
+        self.lengths = lengths
+        count = len(lengths)
+        sums = numpy.zeros((count, values.shape[1] + 1))
+        squares = numpy.zeros((count, values.shape[1] + 1))
+        numpy.cumsum(values.sum(axis=2), axis=1, out=sums[:, 1:])
+        numpy.cumsum((values * values).sum(axis=2), axis=1, out=squares[:, 1:])
+        self.sums = sums
+        self.squares = squares
+
+    def reverse_complement(self):
+        """Return the profiles of the reverse complement motifs."""
+        values = numpy.zeros_like(self.values)
+        for index, length in enumerate(self.lengths):
+            # letters are in the order A, C, G, T
+            values[index, :length] = self.values[index, length - 1::-1, ::-1]
+        return self.__class__(values, self.lengths)
+
+
+def _best_pearson(rows, columns, best, best_offsets, reverse=None):
+    """Update the best Pearson correlations of the rows with the columns (PRIVATE).
+
+    For each pair of a row and column motif, and each offset where they
+    overlap, calculates the correlation exactly as dist_pearson does. Where
+    this is higher than the value in the best array (of shape rows by
+    columns), it replaces it, with the offset in best_offsets and the given
+    value in the reverse array. Offsets are tried in increasing order, so
+    for equal correlations the first offset is kept, as in dist_pearson.
+    """
+    width = rows.values.shape[1]
+    letters = rows.values.shape[2]
+    row_count = len(rows.lengths)
+    column_count = len(columns.lengths)
+    row_index = numpy.arange(row_count)[:, None]
+    column_index = numpy.arange(column_count)[None, :]
+    a = rows.lengths[:, None]
+    b = columns.lengths[None, :]
+    row_values = rows.values.reshape(row_count, -1)
+    column_values = columns.values.reshape(column_count, -1)
+    for offset in range(-width + 1, width):
+        # row position i is aligned with column position i + offset
+        start = max(0, -offset)
+        end = min(width, width - offset)
+        # positions past the end of a motif are zero, so do not count
+        sxy = numpy.dot(row_values[:, start * letters:end * letters],
+                        column_values[:, (start + offset) * letters:
+                                      (end + offset) * letters].T)
+        stop = numpy.minimum(a, b - offset)
+        overlap = stop > start
+        stop = numpy.maximum(stop, start)
+        sx = rows.sums[row_index, stop] - rows.sums[:, start][:, None]
+        sxx = rows.squares[row_index, stop] - rows.squares[:, start][:, None]
+        sy = columns.sums[column_index, stop + offset] - \
+            columns.sums[:, start + offset][None, :]
+        syy = columns.squares[column_index, stop + offset] - \
+            columns.squares[:, start + offset][None, :]
+        # the length spanned by both motifs
+        norm = (numpy.maximum(a, b - offset) + max(0, offset)) * letters
+        sx = sx / norm
+        sy = sy / norm
+        sxx = sxx / norm
+        sxy = sxy / norm
+        syy = syy / norm
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            correlation = (sxy - sx * sy) / numpy.sqrt((sxx - sx * sx) *
+                                                       (syy - sy * sy))
+        better = overlap & (correlation > best)
+        best[better] = correlation[better]
+        best_offsets[better] = offset
+        if reverse is not None:
+            reverse[better] = True
+
+
+def _compare(rows, columns, columns_rc):
+    """Compare row motifs with the column motifs and their reverse complements (PRIVATE).
+
+    Returns arrays of the best correlations, their offsets, and if they
+    were for the reverse complement.
+    """
+    shape = (len(rows.lengths), len(columns.lengths))
+    best = numpy.empty(shape)
+    best[:] = -numpy.inf
+    best_offsets = numpy.zeros(shape, int)
+    reverse = numpy.zeros(shape, bool)
+    _best_pearson(rows, columns, best, best_offsets)
+    if columns_rc is not None:
+        _best_pearson(rows, columns_rc, best, best_offsets, reverse)
+    return best, best_offsets, reverse
+
+
+# Motifs used by the worker processes
+_worker_profiles = None
+
+
+def _init_worker(profiles, profiles_rc):
+    """Store the motifs in a worker process (PRIVATE)."""
+    global _worker_profiles
+    _worker_profiles = (profiles, profiles_rc)
+
+
+def _compare_worker(block):
+    """Compare a block of rows with all the motifs in a worker process (PRIVATE)."""
+    profiles, profiles_rc = _worker_profiles
+    start, end = block
+    rows = _Profiles(profiles.values[start:end], profiles.lengths[start:end])
+    return _compare(rows, profiles, profiles_rc)
+
+
+def dist_pearson_matrix(pssms, both=False, processes=1):
+    """Compare each of a list of PSSMs with all of them.
+
+    Arguments:
+     - pssms     - A list of PositionSpecificScoringMatrix objects, all with
+       the same alphabet.
+     - both      - Also compare each motif with the reverse complement of
+       the others, keeping the best match (default False; the motifs must
+       use the letters A, C, G and T).
+     - processes - Number of worker processes to use (default 1, use None
+       for one per CPU). The work is split into blocks of rows.
+
+    Returns three NumPy arrays of shape (n, n) for n PSSMs. The first holds
+    the distances, and the second the offsets, with the values in row i and
+    column j as returned by pssms[i].dist_pearson(pssms[j]). In the third,
+    a boolean array, the value is True if the best match was found with
+    the reverse complement of pssms[j] (and so with both=False, it is all
+    False). Offsets where the correlation is undefined (as the scores of
+    one of the motifs do not vary), for which dist_pearson would raise a
+    ZeroDivisionError, are skipped. If no offset is left, the distance is
+    NaN. Where several offsets give the same correlation, rounding may
+    pick a different one of them than dist_pearson does.
+    """
+    pssms = list(pssms)
+    if not pssms:
+        raise ValueError("No PSSMs given")
+    alphabet = pssms[0].alphabet
+    for pssm in pssms:
+        if pssm.alphabet != alphabet:
+            raise ValueError("Cannot compare motifs with different alphabets")
+    letters = pssms[0]._letters
+    if both and letters != ["A", "C", "G", "T"]:
+        raise ValueError("Reverse complements can only be compared for "
+                         "DNA motifs")
+    lengths = numpy.array([pssm.length for pssm in pssms], int)
+    values = numpy.zeros((len(pssms), lengths.max(), len(letters)))
+    for index, pssm in enumerate(pssms):
+        values[index, :pssm.length] = numpy.array(
+            [pssm[letter] for letter in letters], float).T
+    profiles = _Profiles(values, lengths)
+    profiles_rc = None
+    if both:
+        profiles_rc = profiles.reverse_complement()
+
+    if processes == 1:
+        best, best_offsets, reverse = _compare(profiles, profiles,
+                                               profiles_rc)
+    else:
+        import multiprocessing
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        # several blocks per process, to even out the work
+        size = max(1, -(-len(pssms) // (4 * processes)))
+        blocks = [(start, min(start + size, len(pssms)))
+                  for start in range(0, len(pssms), size)]
+        pool = multiprocessing.Pool(processes, _init_worker,
+                                    (profiles, profiles_rc))
+        try:
+            results = pool.map(_compare_worker, blocks)
+        finally:
+            pool.terminate()
+            pool.join()
+        best, best_offsets, reverse = [numpy.concatenate(arrays)
+                                       for arrays in zip(*results)]
+    best[best == -numpy.inf] = numpy.nan
+    # dist_pearson returns the offset of the other motif
+    return 1 - best, -best_offsets, reverse
+
+
+# if not used as a module, run the doctest
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -4,7 +4,8 @@
 # as part of this package.
 """Provides read access to a JASPAR5 formatted database.
 
-This modules requires MySQLdb to be installed.
+The database is either on a MySQL server, which requires MySQLdb to be
+installed, or a local SQLite copy of the JASPAR5 schema.
 
 Example, substitute the your database credentials as
 appropriate:
@@ -59,19 +60,35 @@ appropriate:
     >>> for motif in motifs:
     ...     pass # do something with the motif
 
+To use a local SQLite copy of the database instead, give the file name
+and the sqlite3 driver:
+
+    >>> jdb = JASPAR5(name="JASPAR_2013.sqlite", driver="sqlite3")
+
+The motifs are fetched from the database in batches, using a few queries
+for many motifs at a time. The data read for recently used motifs is kept
+in memory (see the cache_size argument), and optionally also in a cache
+file on disk (see the cache_file argument), so fetching them again does
+not query the database. Each call still returns new Motif objects, which
+can be changed without affecting the cache.
+
 """
 
 from __future__ import print_function
 
+import os
+import shelve
 import warnings
+from collections import OrderedDict
+
 from Bio import BiopythonWarning
 from Bio import MissingPythonDependencyError
 
 try:
     import MySQLdb as mdb
 except ImportError:
-    raise MissingPythonDependencyError("Install MySQLdb if you want to use "
-                                       "Bio.motifs.jaspar.db")
+    # Only needed for MySQL servers, not for SQLite files
+    mdb = None
 
 from Bio.Alphabet.IUPAC import unambiguous_dna as dna
 from Bio.motifs import jaspar, matrix
@@ -79,6 +96,21 @@ from Bio.motifs import jaspar, matrix
 
 JASPAR_DFLT_COLLECTION = 'CORE'
 
+# Number of internal IDs in each "IN (...)" clause of a query, kept well
+# below the SQLite default limit of 999 parameters
+_BATCH_SIZE = 500
+
+
+def _batches(values, size=_BATCH_SIZE):
+    """Split a list of values into lists of at most the given size (PRIVATE)."""
+    return [values[start:start + size]
+            for start in range(0, len(values), size)]
+
+
+def _placeholders(values):
+    """Return the placeholders for an SQL "IN (...)" clause (PRIVATE)."""
+    return ", ".join(["%s"] * len(values))
+
 
 class JASPAR5(object):
     """Class representing a JASPAR5 database.
@@ -91,28 +123,77 @@ class JASPAR5(object):
     store JASPAR motifs or create a new DB at this time.
     """
 
-    def __init__(self, host=None, name=None, user=None, password=None):
+    def __init__(self, host=None, name=None, user=None, password=None,
+                 driver="MySQLdb", cache_size=1000, cache_file=None):
         """Construct a JASPAR5 instance and connect to specified DB.
 
         Arguments:
 
         - host - host name of the the JASPAR DB server
-        - name - name of the JASPAR database
+        - name - name of the JASPAR database, or for SQLite the name of
+          the database file
         - user - user name to connect to the JASPAR DB
         - password - JASPAR DB password
+        - driver - MySQLdb (default) to connect to a MySQL server, or
+          sqlite3 to open a local SQLite copy of the database
+        - cache_size - number of recently fetched motifs kept in memory
+          (default 1000, use 0 to disable)
+        - cache_file - name of a file to also keep the fetched motifs in,
+          so they are available offline and to later sessions (default
+          None, no cache file). This should be removed if the database
+          is updated.
 
         """
         self.name = name
         self.host = host
         self.user = user
         self.password = password
+        self.driver = driver
+
+        if driver == "sqlite3":
+            import sqlite3
+            # sqlite3 would silently create a new empty database
+            if not os.path.isfile(name):
+                raise ValueError("SQLite database file %r not found" % name)
+            self.dbh = sqlite3.connect(name)
+        elif driver == "MySQLdb":
+            if mdb is None:
+                raise MissingPythonDependencyError(
+                    "Install MySQLdb if you want to use Bio.motifs.jaspar.db "
+                    "with a MySQL server")
+            self.dbh = mdb.connect(host, user, password, name)
+        else:
+            raise ValueError("Unsupported database driver %r, use MySQLdb "
+                             "or sqlite3" % driver)
 
-        self.dbh = mdb.connect(host, user, password, name)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_file = None
+        if cache_file:
+            self._cache_file = shelve.open(cache_file)
 
     def __str__(self):
         """Return a string represention of the JASPAR5 DB connection."""
+        if self.driver == "sqlite3":
+            return "sqlite3:%s" % self.name
         return "%s\@%s:%s" % (self.user, self.host, self.name)
 
+    def close(self):
+        """Close the database connection and the cache file (if any)."""
+        self.dbh.close()
+        if self._cache_file is not None:
+            self._cache_file.close()
+            self._cache_file = None
+
+    def _execute(self, cur, sql, args=None):
+        """Run an SQL query written with MySQLdb style placeholders (PRIVATE)."""
+        if args is None:
+            cur.execute(sql)
+        else:
+            if self.driver == "sqlite3":
+                sql = sql.replace("%s", "?")
+            cur.execute(sql, args)
+
     def fetch_motif_by_id(self, id):
         """Fetch a single JASPAR motif from the DB by it's JASPAR matrix ID
 
@@ -260,9 +341,7 @@ class JASPAR5(object):
         Now further filter motifs returned above based on any specified
         matrix specific criteria.
         """
-        for int_id in int_ids:
-            motif = self._fetch_motif_by_internal_id(int_id)
-
+        for motif in self._fetch_motifs_by_internal_ids(int_ids):
             # Filter motifs to those with matrix IC greater than min_ic
             if min_ic:
                 if motif.pssm.mean() < min_ic:
@@ -295,7 +374,7 @@ class JASPAR5(object):
     def _fetch_latest_version(self, base_id):
         """Get the latest version number for the given base_id."""
         cur = self.dbh.cursor()
-        cur.execute("""select VERSION from MATRIX where BASE_id = %s
+        self._execute(cur, """select VERSION from MATRIX where BASE_id = %s
                        order by VERSION desc limit 1""", (base_id,))
 
         row = cur.fetchone()
@@ -317,7 +396,7 @@ class JASPAR5(object):
         Also checks if this combo exists or not.
         """
         cur = self.dbh.cursor()
-        cur.execute("""select id from MATRIX where BASE_id = %s
+        self._execute(cur, """select id from MATRIX where BASE_id = %s
                        and VERSION = %s""", (base_id, version))
 
         row = cur.fetchone()
@@ -334,70 +413,132 @@ class JASPAR5(object):
         return int_id
 
     def _fetch_motif_by_internal_id(self, int_id):
-        # fetch basic motif information
+        """Fetch a single JASPAR motif by its internal ID (PRIVATE)."""
+        motifs = self._fetch_motifs_by_internal_ids([int_id])
+        if motifs:
+            return motifs[0]
+        return None
+
+    def _fetch_motifs_by_internal_ids(self, int_ids):
+        """Fetch a list of JASPAR motifs by their internal IDs (PRIVATE).
+
+        The data of motifs not found in the memory or file caches is
+        fetched from the database in batches, with one query per table
+        for each batch. Returns the motifs in the order of the IDs.
+        """
+        cache = self._cache
+        cache_file = self._cache_file
+        found = {}
+        missing = []
+        for int_id in int_ids:
+            if int_id in found:
+                continue
+            data = cache.pop(int_id, None)
+            if data is None and cache_file is not None:
+                data = cache_file.get(str(int_id))
+            if data is None:
+                missing.append(int_id)
+            else:
+                found[int_id] = data
+        missing = list(OrderedDict.fromkeys(missing))
+        for batch in _batches(missing):
+            fetched = self._fetch_motif_data(batch)
+            found.update(fetched)
+            if cache_file is not None:
+                for int_id, data in fetched.items():
+                    cache_file[str(int_id)] = data
+
+        motifs = []
+        for int_id in int_ids:
+            data = found.get(int_id)
+            if data is None:
+                # This should never happen as it is an internal method
+                warnings.warn("Could not fetch JASPAR motif with internal "
+                              "ID = {0}".format(int_id), BiopythonWarning)
+                continue
+            motifs.append(self._make_motif(data))
+
+        # keep the most recently used motifs in memory
+        if self.cache_size:
+            for int_id in int_ids:
+                if int_id in found:
+                    cache[int_id] = found[int_id]
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return motifs
+
+    def _fetch_motif_data(self, int_ids):
+        """Fetch the data of JASPAR motifs from the DB (PRIVATE).
+
+        Returns a dictionary mapping the internal IDs to tuples of the
+        matrix ID, name, collection, counts, species, protein accessions
+        and annotation tag and value pairs, as used by _make_motif. Missing
+        IDs are left out.
+        """
         cur = self.dbh.cursor()
-        cur.execute("""select BASE_ID, VERSION, COLLECTION, NAME from MATRIX
-                       where id = %s""", (int_id,))
-
-        row = cur.fetchone()
+        placeholders = _placeholders(int_ids)
+        int_ids = tuple(int_ids)
 
-        # This should never happen as it is an internal method. If it does
-        # we should probably raise an exception
-        if not row:
-            warnings.warn("Could not fetch JASPAR motif with internal "
-                          "ID = {0}".format(int_id), BiopythonWarning)
-            return None
-
-        base_id = row[0]
-        version = row[1]
-        collection = row[2]
-        name = row[3]
-
-        matrix_id = "".join([base_id, '.', str(version)])
-
-        # fetch the counts matrix
-        counts = self._fetch_counts_matrix(int_id)
+        # fetch basic motif information
+        self._execute(cur, """select ID, BASE_ID, VERSION, COLLECTION, NAME
+                              from MATRIX where ID in (%s)""" % placeholders,
+                      int_ids)
+        rows = cur.fetchall()
+        if not rows:
+            return {}
+        data = {}
+        for int_id, base_id, version, collection, name in rows:
+            matrix_id = "".join([base_id, '.', str(version)])
+            counts = dict((base, []) for base in dna.letters)
+            data[int_id] = (matrix_id, name, collection, counts, [], [], [])
+
+        # fetch the counts matrices
+        self._execute(cur, """select ID, row, val from MATRIX_DATA
+                              where ID in (%s)
+                              order by ID, row, col""" % placeholders,
+                      int_ids)
+        for int_id, base, val in cur.fetchall():
+            counts = data[int_id][3]
+            if base in counts:
+                counts[base].append(float(val))
+
+        # fetch species, protein accession numbers, and the remaining
+        # annotation as tags from the ANNOTATION table
+        for index, sql in ((4, "select ID, TAX_ID from MATRIX_SPECIES"),
+                           (5, "select ID, ACC from MATRIX_PROTEIN"),
+                           (6, "select ID, TAG, VAL from MATRIX_ANNOTATION")):
+            self._execute(cur, "%s where ID in (%s)" % (sql, placeholders),
+                          int_ids)
+            for row in cur.fetchall():
+                if row[0] in data:
+                    values = data[row[0]][index]
+                    if index == 6:
+                        values.append(tuple(row[1:]))
+                    else:
+                        values.append(row[1])
+        return data
+
+    def _make_motif(self, data):
+        """Create a JASPAR motif from the data fetched from the DB (PRIVATE)."""
+        (matrix_id, name, collection, counts, tax_ids, accs,
+         annotations) = data
+
+        counts = matrix.GenericPositionMatrix(
+            dna, dict((base, list(values)) for base, values in counts.items())
+        )
 
         # Create new JASPAR motif
         motif = jaspar.Motif(
             matrix_id, name, collection=collection, counts=counts
         )
 
-        # fetch species
-        cur.execute("""select TAX_ID from MATRIX_SPECIES
-                       where id = %s""", (int_id,))
-        tax_ids = []
-        rows = cur.fetchall()
-        for row in rows:
-            tax_ids.append(row[0])
-
         # Many JASPAR motifs (especially those not in the CORE collection)
-        # do not have taxonomy IDs. So this warning would get annoying.
-        # if not tax_ids:
-        #     warnings.warn("Could not fetch any taxonomy IDs for JASPAR motif"
-        #                   " {0}".format(motif.matrix_id), BiopythonWarning)
-
-        motif.species = tax_ids
-
-        # fetch protein accession numbers
-        cur.execute("select ACC FROM MATRIX_PROTEIN where id = %s", (int_id,))
-        accs = []
-        rows = cur.fetchall()
-        for row in rows:
-            accs.append(row[0])
+        # do not have taxonomy IDs or protein accession numbers, so we do
+        # not warn about these.
+        motif.species = list(tax_ids)
+        motif.acc = list(accs)
 
-        # Similarly as for taxonomy IDs, it would get annoying to print
-        # warnings for JASPAR motifs which do not have accession numbers.
-
-        motif.acc = accs
-
-        # fetch remaining annotation as tags from the ANNOTATION table
-        cur.execute("""select TAG, VAL from MATRIX_ANNOTATION
-                       where id = %s""", (int_id,))
-        rows = cur.fetchall()
-        for row in rows:
-            attr = row[0]
-            val = row[1]
+        for attr, val in annotations:
             if attr == 'class':
                 motif.tf_class = val
             elif attr == 'family':
@@ -421,28 +562,6 @@ class JASPAR5(object):
 
         return motif
 
-    def _fetch_counts_matrix(self, int_id):
-        """Fetch the counts matrix from the JASPAR DB by the internal ID
-
-        Returns a Bio.motifs.matrix.GenericPositionMatrix
-        """
-        counts = {}
-        cur = self.dbh.cursor()
-
-        for base in dna.letters:
-            base_counts = []
-
-            cur.execute("""select val from MATRIX_DATA where ID = %s
-                           and row = %s order by col""", (int_id, base))
-
-            rows = cur.fetchall()
-            for row in rows:
-                base_counts.append(row[0])
-
-            counts[base] = [float(x) for x in base_counts]
-
-        return matrix.GenericPositionMatrix(dna, counts)
-
     def _fetch_internal_id_list(
         self, collection=JASPAR_DFLT_COLLECTION, tf_name=None, tf_class=None,
         tf_family=None, matrix_id=None, tax_group=None, species=None,
@@ -488,7 +607,7 @@ class JASPAR5(object):
         Ignore all other selection arguments.
         """
         if all:
-            cur.execute("select ID from MATRIX")
+            self._execute(cur, "select ID from MATRIX")
             rows = cur.fetchall()
 
             for row in rows:
@@ -507,31 +626,40 @@ class JASPAR5(object):
             If just stable ID and if all_versions == 1, return all versions,
             otherwise just the latest
             """
+            split_ids = [jaspar.split_jaspar_id(id) for id in matrix_id]
+            versions = self._fetch_versions(
+                cur, [base_id for (base_id, version) in split_ids])
             if all_versions:
-                for id in matrix_id:
+                for (base_id, version) in split_ids:
                     # ignore vesion here, this is a stupidity filter
-                    (base_id, version) = jaspar.split_jaspar_id(id)
-                    cur.execute(
-                        "select ID from MATRIX where BASE_ID = %s", (base_id,)
-                    )
-
-                    rows = cur.fetchall()
-                    for row in rows:
-                        int_ids.append(row[0])
+                    int_ids.extend(versions.get(base_id, {}).values())
             else:
                 # only the lastest version, or the requested version
-                for id in matrix_id:
-                    (base_id, version) = jaspar.split_jaspar_id(id)
+                for (base_id, version) in split_ids:
+                    base_versions = versions.get(base_id)
+                    if not base_versions:
+                        warnings.warn("Failed to fetch latest version number "
+                                      "for JASPAR motif with base ID '{0}'. "
+                                      "No JASPAR motif with this base ID "
+                                      "appears to exist in the "
+                                      "database.".format(base_id),
+                                      BiopythonWarning)
+                        continue
 
                     if not version:
-                        version = self._fetch_latest_version(base_id)
+                        version = next(reversed(base_versions))
 
-                    int_id = None
-                    if version:
-                        int_id = self._fetch_internal_id(base_id, version)
+                    int_id = base_versions.get(str(version))
+                    if int_id is None:
+                        warnings.warn("Failed to fetch internal database ID "
+                                      "for JASPAR motif with matrix ID "
+                                      "'{0}.{1}'. No JASPAR motif with this "
+                                      "matrix ID appears to "
+                                      "exist.".format(base_id, version),
+                                      BiopythonWarning)
+                        continue
 
-                    if int_id:
-                        int_ids.append(int_id)
+                    int_ids.append(int_id)
 
             return int_ids
 
@@ -716,17 +844,12 @@ class JASPAR5(object):
 
         # print "sql = %s" % sql
 
-        cur.execute(sql)
-        rows = cur.fetchall()
+        self._execute(cur, sql)
+        int_ids = [row[0] for row in cur.fetchall()]
 
-        for row in rows:
-            id = row[0]
-            if all_versions:
-                int_ids.append(id)
-            else:
-                # is the latest version?
-                if self._is_latest_version(id):
-                    int_ids.append(id)
+        if not all_versions:
+            # keep only the latest versions
+            int_ids = self._filter_latest_versions(cur, int_ids)
 
         if len(int_ids) < 1:
             warnings.warn("Zero motifs returned with current select critera",
@@ -734,25 +857,41 @@ class JASPAR5(object):
 
         return int_ids
 
-    def _is_latest_version(self, int_id):
-        """Check if the internal ID represents the latest JASPAR matrix.
+    def _fetch_versions(self, cur, base_ids):
+        """Fetch the versions of the JASPAR matrices with the given base IDs (PRIVATE).
 
-        Does this internal ID represent the latest version of the JASPAR
-        matrix (collapse on base ids)
+        Returns a dictionary mapping each base ID found to an ordered
+        dictionary of its version numbers (as strings, in increasing order)
+        and the corresponding internal IDs.
         """
-        cur = self.dbh.cursor()
-
-        cur.execute("select count(*) from MATRIX where "
-                    "BASE_ID = (select BASE_ID from MATRIX where ID = %s) "
-                    "and VERSION > (select VERSION from MATRIX where ID = %s)",
-                    (int_id, int_id))
-
-        row = cur.fetchone()
-
-        count = row[0]
-
-        if count == 0:
-            # no matrices with higher version ID and same base id
-            return True
-
-        return False
+        rows = []
+        for batch in _batches(list(OrderedDict.fromkeys(base_ids))):
+            self._execute(cur, "select BASE_ID, VERSION, ID from MATRIX "
+                          "where BASE_ID in (%s)" % _placeholders(batch),
+                          tuple(batch))
+            rows.extend(cur.fetchall())
+        # compare the versions as numbers
+        rows.sort(key=lambda row: (row[0], int(row[1])))
+        versions = {}
+        for base_id, version, int_id in rows:
+            versions.setdefault(base_id, OrderedDict())[str(version)] = int_id
+        return versions
+
+    def _filter_latest_versions(self, cur, int_ids):
+        """Keep the internal IDs representing the latest JASPAR matrices (PRIVATE).
+
+        Does each internal ID represent the latest version of the JASPAR
+        matrix (collapse on base ids)? Returns a list of those which do, in
+        the same order.
+        """
+        base_ids = {}
+        for batch in _batches(int_ids):
+            self._execute(cur, "select ID, BASE_ID from MATRIX "
+                          "where ID in (%s)" % _placeholders(batch),
+                          tuple(batch))
+            base_ids.update(cur.fetchall())
+        latest = set()
+        for base_versions in self._fetch_versions(
+                cur, list(base_ids.values())).values():
+            latest.add(base_versions[next(reversed(base_versions))])
+        return [int_id for int_id in int_ids if int_id in latest]
@@ -9,6 +9,8 @@ and position-specific scoring matrices.
 import math
 import platform
 
+from collections import OrderedDict
+
 from Bio._py3k import range
 
 from Bio.Seq import Seq
@@ -55,6 +57,13 @@ except ImportError:
         return scores
 
 
+# Score distributions calculated by PositionSpecificScoringMatrix.distribution,
+# keyed on the scores, background and precision, with the most recently used
+# last. The oldest are dropped once the densities hold too many points.
+_distribution_cache = OrderedDict()
+_distribution_cache_points = 2 * 10 ** 6
+
+
 class GenericPositionMatrix(dict):
 
     def __init__(self, alphabet, values):
@@ -400,19 +409,28 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
 
         A generator function, returning found hits in the given sequence
         with the pwm score higher than the threshold.
+
+        To search for many motifs at once, see Bio.motifs.scanner.
         """
         sequence = sequence.upper()
         n = len(sequence)
         m = self.length
+        if n < m:
+            return
+        # Score all positions of each strand in one go
+        scores = self.calculate(sequence)
+        if n == m:
+            scores = [scores]
         if both:
-            rc = self.reverse_complement()
+            rc_scores = self.reverse_complement().calculate(sequence)
+            if n == m:
+                rc_scores = [rc_scores]
         for position in range(0, n - m + 1):
-            s = sequence[position:position + m]
-            score = self.calculate(s)
+            score = scores[position]
             if score > threshold:
                 yield (position, score)
             if both:
-                score = rc.calculate(s)
+                score = rc_scores[position]
                 if score > threshold:
                     yield (position - n, score)
 
@@ -539,7 +557,13 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         return numerator / denominator
 
     def distribution(self, background=None, precision=10 ** 3):
-        """Calculate the distribution of the scores at the given precision."""
+        """Calculate the distribution of the scores at the given precision.
+
+        Recently calculated distributions are cached, so asking again for
+        the distribution of a PSSM with the same scores, background and
+        precision (e.g. from another call to a motif's pssm property)
+        returns the same ScoreDistribution object.
+        """
         from .thresholds import ScoreDistribution
         if background is None:
             background = dict.fromkeys(self._letters, 1.0)
@@ -548,4 +572,18 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         total = sum(background.values())
         for letter in self._letters:
             background[letter] /= total
-        return ScoreDistribution(precision=precision, pssm=self, background=background)
+        key = (tuple(tuple(self[letter]) for letter in self._letters),
+               tuple(background[letter] for letter in self._letters),
+               precision)
+        try:
+            distribution = _distribution_cache.pop(key)
+        except KeyError:
+            distribution = ScoreDistribution(precision=precision, pssm=self,
+                                             background=background)
+            points = distribution.n_points
+            for cached in _distribution_cache.values():
+                points += cached.n_points
+            while _distribution_cache and points > _distribution_cache_points:
+                points -= _distribution_cache.popitem(last=False)[1].n_points
+        _distribution_cache[key] = distribution
+        return distribution
@@ -0,0 +1,247 @@
+# Copyright 2017 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Search long DNA sequences for many position-specific scoring matrices.
+
+The PositionSpecificScoringMatrix.search method looks for a single motif.
+Scanning a chromosome for hundreds of motifs that way means hundreds of
+passes over the sequence. The PSSMScanner class in this module instead
+stores a collection of PSSMs (and their reverse complements) in a single
+NumPy array, and scores all of them on both strands of a block of sequence
+at once. Only the hits above each motif's threshold are kept, so long
+sequences are scanned a block at a time in bounded memory:
+
+>>> from Bio import motifs
+>>> from Bio.Seq import Seq
+>>> from Bio.motifs.scanner import PSSMScanner
+>>> with open("motifs/SRF.pfm") as handle:
+...     srf = motifs.read(handle, "pfm")
+>>> with open("motifs/REB1.pfm") as handle:
+...     reb1 = motifs.read(handle, "pfm")
+>>> pssms = [m.counts.normalize(pseudocounts=0.5).log_odds()
+...          for m in (srf, reb1)]
+>>> scanner = PSSMScanner(pssms, thresholds=[10.0, 5.0])
+>>> sequence = Seq("TTGCCCATATATGGCATTCCGGGTAACAGTTACCAGGTT")
+>>> for index, position, score in scanner.search(sequence):
+...     print("%i %i %0.2f" % (index, position, score))
+0 2 21.14
+0 -35 14.26
+1 -21 15.23
+1 28 7.57
+
+As for PSSMs, a negative position means a hit on the reverse strand,
+counted from the end of the sequence. The hits are the same as those of
+calling each PSSM's search method with the same threshold, apart from
+rounding, since the scores are calculated as 64 bit floats. Both
+functions treat letters other than A, C, G and T as mismatching
+everything.
+"""
+
+from __future__ import print_function
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.motifs.scanner.")
+
+from Bio._py3k import _as_bytes, range
+
+
+# Map the bytes of a sequence to the rows of the scoring matrices,
+# with A, C, G, T (in either case) to 0-3, and anything else to 4
+_CODES = numpy.empty(256, dtype=numpy.uint8)
+_CODES[:] = 4
+for _code, _letter in enumerate("ACGT"):
+    _CODES[ord(_letter)] = _code
+    _CODES[ord(_letter.lower())] = _code
+del _code, _letter
+
+# Scanner used by the worker processes
+_worker_scanner = None
+
+
+def _init_worker(scanner):
+    """Store the scanner in a worker process (PRIVATE)."""
+    global _worker_scanner
+    _worker_scanner = scanner
+
+
+def _search_block_worker(args):
+    """Search a block of sequence in a worker process (PRIVATE)."""
+    return _worker_scanner._search_block(*args)
+
+
+class PSSMScanner(object):
+    """Search sequences for a collection of DNA PSSMs at once.
+
+    Arguments:
+     - pssms      - A list of PositionSpecificScoringMatrix objects, using
+       the letters A, C, G and T.
+     - thresholds - Score above which a hit is reported, either a single
+       value for all the PSSMs or a list with one value for each (default
+       0.0, as for the search method of a PSSM).
+     - both       - Search the reverse strand as well (default True).
+
+    The PSSMs are copied into the scanner when it is created, so later
+    changes to them are not seen by the scanner.
+    """
+
+    def __init__(self, pssms, thresholds=0.0, both=True):
+        """Initialize the class."""
+        pssms = list(pssms)
+        if not pssms:
+            raise ValueError("No PSSMs given")
+        for pssm in pssms:
+            if sorted(pssm) != ["A", "C", "G", "T"]:
+                raise ValueError("PSSM has wrong letters %r - Use only "
+                                 "with DNA motifs" % "".join(sorted(pssm)))
+        lengths = numpy.array([pssm.length for pssm in pssms], int)
+        if lengths.min() < 1:
+            raise ValueError("PSSM has length zero")
+        values = numpy.empty(len(pssms), float)
+        try:
+            values[:] = thresholds
+        except ValueError:
+            raise ValueError("Expected one threshold for each of the %i "
+                             "PSSMs, not %r" % (len(pssms), thresholds))
+        self.thresholds = values
+        self.lengths = lengths
+        self.both = both
+
+        # The PSSMs are stored longest first, so that at each motif
+        # position only the PSSMs at least that long need to be scored
+        order = numpy.argsort(-lengths, kind="mergesort")
+        width = lengths.max()
+        strands = 2 if both else 1
+        # Scores for each strand, PSSM, motif position and letter code,
+        # where unknown letters (code 4) score NaN, as in PSSM.calculate
+        matrix = numpy.zeros((strands, len(pssms), width, 5))
+        for row, index in enumerate(order):
+            pssm = pssms[index]
+            length = lengths[index]
+            scores = numpy.array([pssm[letter] for letter in "ACGT"],
+                                 float).T
+            matrix[0, row, :length, :4] = scores
+            matrix[0, row, :length, 4] = numpy.nan
+            if both:
+                # reverse complement: reverse the positions, and swap
+                # A with T and C with G
+                matrix[1, row, :length, :4] = scores[::-1, ::-1]
+                matrix[1, row, :length, 4] = numpy.nan
+        self._matrix = matrix
+        self._order = order
+        self._thresholds = values[order]
+        # number of PSSMs scored at each motif position
+        self._active = [int((lengths > i).sum()) for i in range(width)]
+
+    def __len__(self):
+        """Return the number of PSSMs in the scanner."""
+        return len(self.lengths)
+
+    def search(self, sequence, chunk_size=None, processes=1):
+        """Find the hits of all the PSSMs in the sequence.
+
+        Arguments:
+         - sequence   - The DNA sequence to search, as a Seq object or a
+           string (letters are matched ignoring case).
+         - chunk_size - Number of positions scored in each block (by
+           default chosen so each block uses a few tens of megabytes).
+         - processes  - Number of worker processes to score the blocks in
+           (default 1, use None for one per CPU).
+
+        A generator function, returning a tuple of the index of the PSSM in
+        the list given to the scanner, the position, and the score for each
+        hit above the PSSM's threshold. The hits are sorted by position,
+        then by PSSM, with the forward strand hit of a PSSM (if any) before
+        its reverse strand hit at the same position.
+        """
+        sequence = str(sequence)
+        n = len(sequence)
+        if chunk_size is None:
+            # about 16 MB of scores per block
+            chunk_size = max(1000, 2 ** 21 // self._matrix.shape[0]
+                             // len(self))
+        elif chunk_size < 1:
+            raise ValueError("chunk_size must be at least one, not %r"
+                             % chunk_size)
+        width = self._matrix.shape[2]
+        # the last position where the shortest PSSM fits, plus one
+        end = n - int(self.lengths.min()) + 1
+        # Each block of chunk_size positions needs the letters of the
+        # following width - 1 positions too
+        blocks = ((start, sequence[start:start + chunk_size + width - 1],
+                   min(chunk_size, end - start), n)
+                  for start in range(0, end, chunk_size))
+        if processes == 1:
+            for args in blocks:
+                for hit in self._search_block(*args):
+                    yield hit
+            return
+
+        import multiprocessing
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(processes, _init_worker, (self,))
+        try:
+            for hits in pool.imap(_search_block_worker, blocks):
+                for hit in hits:
+                    yield hit
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _score_block(self, codes, positions):
+        """Score all PSSMs at the given number of positions (PRIVATE).
+
+        Returns an array of scores indexed by strand, PSSM (in the internal
+        longest first order), and position.
+        """
+        matrix = self._matrix
+        strands, count, width, letters = matrix.shape
+        scores = numpy.zeros((strands, count, positions))
+        for i, active in enumerate(self._active):
+            scores[:, :active] += matrix[:, :active, i, :].take(
+                codes[i:i + positions], axis=2)
+        return scores
+
+    def _search_block(self, start, block, positions, n):
+        """Find the hits starting in a block of the sequence (PRIVATE).
+
+        The block holds the letters of the sequence (of length n) from the
+        given start, including those needed to score the given number of
+        positions. Returns a list of hits, as described for the search
+        method.
+        """
+        width = self._matrix.shape[2]
+        codes = _CODES.take(numpy.frombuffer(_as_bytes(block),
+                                             dtype=numpy.uint8))
+        if len(codes) < positions + width - 1:
+            # PSSMs overhanging the end of the sequence score NaN
+            padding = numpy.empty(positions + width - 1 - len(codes),
+                                  numpy.uint8)
+            padding[:] = 4
+            codes = numpy.concatenate([codes, padding])
+        scores = self._score_block(codes, positions)
+        # Comparisons with NaN are False, so unknown letters never hit
+        strand, row, position = numpy.nonzero(
+            scores > self._thresholds[:, None])
+        if not len(position):
+            return []
+        values = scores[strand, row, position]
+        index = self._order[row]
+        order = numpy.lexsort((strand, index, position))
+        position = position[order] + start
+        # reverse strand hits are at negative positions
+        position -= n * strand[order]
+        return list(zip(index[order].tolist(), position.tolist(),
+                        values[order].tolist()))
+
+
+# if not used as a module, run the doctest
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -5,6 +5,39 @@
 # as part of this package.
 """Approximate calculation of appropriate thresholds for motif finding."""
 
+try:
+    import numpy
+except ImportError:
+    # Fall back on the slower pure Python code
+    numpy = None
+
+
+def _shift_add(new, density, shift, weight):
+    """Add the weighted density to new, shifted by a number of points (PRIVATE).
+
+    Both arguments are NumPy arrays of the same length. Points shifted past
+    either end are added to the first or last point, as in ScoreDistribution.
+    """
+    n = len(density)
+    if shift >= n:
+        new[-1] += density.sum() * weight
+    elif shift >= 0:
+        new[shift:n - 1] += density[:n - 1 - shift] * weight
+        new[-1] += density[n - 1 - shift:].sum() * weight
+    elif -shift >= n:
+        new[0] += density.sum() * weight
+    else:
+        new[0] += density[:1 - shift].sum() * weight
+        new[1:n + shift] += density[1 - shift:] * weight
+
+
+def _first_index(passed):
+    """Return the index of the first True value in a NumPy array, or None (PRIVATE)."""
+    index = int(passed.argmax())
+    if passed[index]:
+        return index
+    return None
+
 
 class ScoreDistribution(object):
     """Class representing approximate score distribution for a given motif.
@@ -12,6 +45,9 @@ class ScoreDistribution(object):
     Utilizes a dynamic programming approach to calculate the distribution of
     scores with a predefined precision. Provides a number of methods for calculating
     thresholds for motif occurrences.
+
+    If NumPy is available, the densities are NumPy arrays, and each step of
+    the calculation is done as a whole array operation.
     """
 
     def __init__(self, motif=None, precision=10 ** 3, pssm=None, background=None):
@@ -26,13 +62,29 @@ class ScoreDistribution(object):
             self.n_points = precision * pssm.length
             self.ic = pssm.mean(background)
         self.step = self.interval / (self.n_points - 1)
-        self.mo_density = [0.0] * self.n_points
+        if numpy is None:
+            self.mo_density = [0.0] * self.n_points
+            self.bg_density = [0.0] * self.n_points
+        else:
+            self.mo_density = numpy.zeros(self.n_points)
+            self.bg_density = numpy.zeros(self.n_points)
         self.mo_density[-self._index_diff(self.min_score)] = 1.0
-        self.bg_density = [0.0] * self.n_points
         self.bg_density[-self._index_diff(self.min_score)] = 1.0
         if pssm is None:
             for lo, mo in zip(motif.log_odds(), motif.pwm()):
                 self.modify(lo, mo, motif.background)
+        elif numpy is not None:
+            for position in range(pssm.length):
+                mo_new = numpy.zeros(self.n_points)
+                bg_new = numpy.zeros(self.n_points)
+                for letter, score in pssm[:, position].items():
+                    bg = background[letter]
+                    mo = pow(2, score) * bg
+                    d = self._index_diff(score)
+                    _shift_add(mo_new, self.mo_density, d, mo)
+                    _shift_add(bg_new, self.bg_density, d, bg)
+                self.mo_density = mo_new
+                self.bg_density = bg_new
         else:
             for position in range(pssm.length):
                 mo_new = [0.0] * self.n_points
@@ -55,6 +107,16 @@ class ScoreDistribution(object):
         return max(0, min(self.n_points - 1, i + j))
 
     def modify(self, scores, mo_probs, bg_probs):
+        if numpy is not None:
+            mo_new = numpy.zeros(self.n_points)
+            bg_new = numpy.zeros(self.n_points)
+            for k, v in scores.items():
+                d = self._index_diff(v)
+                _shift_add(mo_new, self.mo_density, d, mo_probs[k])
+                _shift_add(bg_new, self.bg_density, d, bg_probs[k])
+            self.mo_density = mo_new
+            self.bg_density = bg_new
+            return
         mo_new = [0.0] * self.n_points
         bg_new = [0.0] * self.n_points
         for k, v in scores.items():
@@ -67,6 +129,11 @@ class ScoreDistribution(object):
 
     def threshold_fpr(self, fpr):
         """Approximate the log-odds threshold which makes the type I error (false positive rate)."""
+        if numpy is not None:
+            # cumulative sums from the top, added in the same order as below
+            index = _first_index(numpy.cumsum(self.bg_density[::-1]) >= fpr)
+            if index is not None:
+                return self.min_score + (self.n_points - 1 - index) * self.step
         i = self.n_points
         prob = 0.0
         while prob < fpr:
@@ -76,6 +143,10 @@ class ScoreDistribution(object):
 
     def threshold_fnr(self, fnr):
         """Approximate the log-odds threshold which makes the type II error (false negative rate)."""
+        if numpy is not None:
+            index = _first_index(numpy.cumsum(self.mo_density) >= fnr)
+            if index is not None:
+                return self.min_score + index * self.step
         i = -1
         prob = 0.0
         while prob < fnr:
@@ -85,6 +156,18 @@ class ScoreDistribution(object):
 
     def threshold_balanced(self, rate_proportion=1.0, return_rate=False):
         """Approximate log-odds threshold making FNR equal to FPR times rate_proportion."""
+        if numpy is not None:
+            fprs = numpy.cumsum(self.bg_density[::-1])
+            fnrs = numpy.subtract.accumulate(
+                numpy.concatenate(([1.0], self.mo_density[::-1])))[1:]
+            index = _first_index(fprs * rate_proportion >= fnrs)
+            if index is not None:
+                threshold = self.min_score + \
+                    (self.n_points - 1 - index) * self.step
+                if return_rate:
+                    return threshold, float(fprs[index])
+                else:
+                    return threshold
         i = self.n_points
         fpr = 0.0
         fnr = 1.0
@@ -116,6 +116,7 @@ DOCTEST_MODULES = [
     "Bio.SearchIO._model.hit",
     "Bio.SearchIO._model.hsp",
     "Bio.SearchIO.BlastIO",
+    "Bio.SearchIO.BlastIO.blast_tab",
     "Bio.SearchIO.HmmerIO",
     "Bio.SearchIO.FastaIO",
     "Bio.SearchIO.BlatIO",
@@ -149,8 +150,11 @@ if is_numpy():
     DOCTEST_MODULES.extend([
         "Bio.Affy.CelFile",
         "Bio.MaxEntropy",
+        "Bio.motifs.comparison",
+        "Bio.motifs.scanner",
         "Bio.PDB.Polypeptide",
         "Bio.PDB.Selection",
+        "Bio.SearchIO._columns",
         "Bio.SeqIO.PdbIO",
         "Bio.Statistics.lowess",
         "Bio.SVDSuperimposer",
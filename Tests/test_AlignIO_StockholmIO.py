@@ -0,0 +1,87 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for the Stockholm alignment parser in Bio.AlignIO.StockholmIO."""
+
+import unittest
+
+from Bio._py3k import StringIO
+
+from Bio import AlignIO
+from Bio.AlignIO.StockholmIO import StockholmIterator
+
+
+INTERLACED = """\
+# STOCKHOLM 1.0
+#=GS seq1/1-9 AC P00001
+seq1/1-9  ACDEF..
+#=GR seq1/1-9 SS HHHH...
+#=GR seq1/1-9 PP 9876...
+seq2      AC-EFGH
+#=GR seq2 SS --HHHHH
+#=GC SS_cons HHHHHHH
+
+seq1/1-9  GHIK
+#=GR seq1/1-9 SS .EEE
+#=GR seq1/1-9 PP .987
+seq2      GHIK
+#=GR seq2 SS EEEE
+//
+"""
+
+
+class StockholmParsing(unittest.TestCase):
+
+    def parse(self, **kwargs):
+        return list(StockholmIterator(StringIO(INTERLACED), **kwargs))
+
+    def test_default(self):
+        alignments = self.parse()
+        self.assertEqual(len(alignments), 1)
+        seq1, seq2 = alignments[0]
+        self.assertEqual(str(seq1.seq), "ACDEF--GHIK")
+        self.assertEqual(str(seq2.seq), "AC-EFGHGHIK")
+        self.assertEqual(seq1.annotations["accession"], "P00001")
+        self.assertEqual(seq1.annotations["start"], 1)
+        self.assertEqual(seq1.annotations["end"], 9)
+        self.assertEqual(seq1.letter_annotations,
+                         {"secondary_structure": "HHHH....EEE",
+                          "posterior_probability": "9876....987"})
+        self.assertEqual(seq2.letter_annotations,
+                         {"secondary_structure": "--HHHHHEEEE"})
+
+    def test_matches_parse(self):
+        old = AlignIO.read(StringIO(INTERLACED), "stockholm")
+        new = self.parse()[0]
+        for old_rec, new_rec in zip(old, new):
+            self.assertEqual(str(old_rec.seq), str(new_rec.seq))
+            self.assertEqual(old_rec.letter_annotations,
+                             new_rec.letter_annotations)
+
+    def test_no_letter_annotations(self):
+        seq1, seq2 = self.parse(letter_annotations=False)[0]
+        self.assertEqual(str(seq1.seq), "ACDEF--GHIK")
+        self.assertEqual(seq1.annotations["accession"], "P00001")
+        self.assertEqual(seq1.letter_annotations, {})
+        self.assertEqual(seq2.letter_annotations, {})
+
+    def test_selected_letter_annotations(self):
+        seq1, seq2 = self.parse(letter_annotations=["PP"])[0]
+        self.assertEqual(seq1.letter_annotations,
+                         {"posterior_probability": "9876....987"})
+        self.assertEqual(seq2.letter_annotations, {})
+
+    def test_many_alignments(self):
+        handle = StringIO(INTERLACED + INTERLACED.replace("seq2", "seq3"))
+        alignments = list(StockholmIterator(handle, letter_annotations=False))
+        self.assertEqual(len(alignments), 2)
+        self.assertEqual([r.id for r in alignments[1]], ["seq1/1-9", "seq3"])
+
+    def test_different_lengths(self):
+        handle = StringIO(INTERLACED.replace("seq2      GHIK", "seq2      GHI"))
+        self.assertRaises(ValueError, list, StockholmIterator(handle))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
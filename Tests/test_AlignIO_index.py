@@ -0,0 +1,135 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Unit tests for Bio.AlignIO.index(...) and index_db() functions."""
+
+try:
+    import sqlite3
+except ImportError:
+    # Try to run what tests we can on Jython
+    # where we don't expect this to be installed.
+    sqlite3 = None
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from Bio import AlignIO
+from Bio import bgzf
+from Bio.Alphabet import generic_dna
+
+
+def add_prefix(key):
+    """Dummy key_function for testing index code."""
+    return "id_" + key
+
+
+class IndexTests(unittest.TestCase):
+    """Check index and index_db agree with parse on multi-alignment files."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def concatenate(self, name, filenames, compress=False):
+        """Write the given files one after the other to a new file."""
+        filename = os.path.join(self.temp_dir, name)
+        if compress:
+            handle = bgzf.BgzfWriter(filename, "wb")
+        else:
+            handle = open(filename, "wb")
+        for f in filenames:
+            with open(f, "rb") as in_handle:
+                handle.write(in_handle.read())
+        handle.close()
+        return filename
+
+    def check(self, filename, format, keys, seq_count=None, alphabet=None,
+              key_function=None):
+        expected = list(AlignIO.parse(filename, format, seq_count, alphabet))
+        self.assertEqual(len(expected), len(keys))
+        indexes = [AlignIO.index(filename, format, seq_count, alphabet,
+                                 key_function)]
+        if sqlite3:
+            indexes.append(AlignIO.index_db(":memory:", [filename], format,
+                                            seq_count, alphabet,
+                                            key_function))
+        for index in indexes:
+            self.assertEqual(len(index), len(keys))
+            self.assertEqual(sorted(index), sorted(keys))
+            for key, old in zip(keys, expected):
+                self.assertTrue(key in index)
+                new = index[key]
+                self.assertEqual(len(old), len(new))
+                for old_rec, new_rec in zip(old, new):
+                    self.assertEqual(old_rec.id, new_rec.id)
+                    self.assertEqual(str(old_rec.seq), str(new_rec.seq))
+                    self.assertEqual(repr(old_rec.seq.alphabet),
+                                     repr(new_rec.seq.alphabet))
+            self.assertFalse("missing" in index)
+            self.assertRaises(KeyError, index.__getitem__, "missing")
+            index.close()
+
+    def test_stockholm(self):
+        filename = self.concatenate("pfam.sth", ["Stockholm/simple.sth",
+                                                 "Stockholm/funny.sth",
+                                                 "Stockholm/simple.sth"])
+        self.check(filename, "stockholm", ["0", "PF00571", "2"])
+        self.check(filename, "stockholm", ["id_0", "id_PF00571", "id_2"],
+                   key_function=add_prefix)
+
+    def test_stockholm_raw(self):
+        filename = self.concatenate("pfam.sth", ["Stockholm/simple.sth",
+                                                 "Stockholm/funny.sth"])
+        index = AlignIO.index(filename, "stockholm")
+        with open("Stockholm/funny.sth", "rb") as handle:
+            self.assertEqual(index.get_raw("PF00571"), handle.read())
+        index.close()
+
+    def test_stockholm_bgzf(self):
+        filename = self.concatenate("pfam.sth.bgz", ["Stockholm/funny.sth",
+                                                     "Stockholm/simple.sth"],
+                                    compress=True)
+        index = AlignIO.index(filename, "stockholm")
+        self.assertEqual(sorted(index), ["1", "PF00571"])
+        self.assertEqual(len(index["PF00571"]), 6)
+        self.assertEqual(index["1"][1].id, "AE007476.1")
+        index.close()
+
+    def test_clustal(self):
+        filename = self.concatenate("many.aln", ["Clustalw/cw02.aln",
+                                                 "Clustalw/opuntia.aln"])
+        self.check(filename, "clustal", ["0", "1"])
+
+    def test_phylip(self):
+        filename = self.concatenate("many.phy", ["Phylip/interlaced.phy",
+                                                 "Phylip/interlaced2.phy",
+                                                 "Phylip/interlaced.phy"])
+        self.check(filename, "phylip", ["0", "1", "2"])
+
+    def test_fasta(self):
+        self.check("GFF/multi.fna", "fasta", ["0"], alphabet=generic_dna)
+        self.check("GFF/multi.fna", "fasta", ["0", "1", "2"], seq_count=1)
+
+    def test_nexus(self):
+        self.check("Nexus/test_Nexus_input.nex", "nexus", ["0"])
+
+    def test_duplicates(self):
+        filename = self.concatenate("dup.sth", ["Stockholm/funny.sth",
+                                                "Stockholm/funny.sth"])
+        self.assertRaises(ValueError, AlignIO.index, filename, "stockholm")
+
+    def test_bad_format(self):
+        self.assertRaises(ValueError, AlignIO.index,
+                          "Emboss/needle.txt", "emboss")
+        self.assertRaises(ValueError, AlignIO.index,
+                          "Stockholm/funny.sth", "Stockholm")
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -119,6 +119,56 @@ X  0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0
         ic = s.information_content(chars_to_ignore=['-', '*'])
         self.assertAlmostEqual(ic, 133.061475107, places=6)
 
+    def test_weights(self):
+        alpha = Gapped(unambiguous_dna, "-")
+        records = []
+        for seq, weight in [("GTATC", 0.5), ("AT--C", 0.8), ("CTGTC", 1.0)]:
+            record = SeqRecord(Seq(seq, alpha), id=seq)
+            record.annotations["weight"] = weight
+            records.append(record)
+        summary = SummaryInfo(MultipleSeqAlignment(records, alpha))
+
+        rep_dict = summary.replacement_dictionary()
+        self.assertEqual(len(rep_dict), 16)
+        expected = {("G", "A"): 0.4, ("G", "C"): 0.5, ("A", "C"): 0.8,
+                    ("A", "G"): 0.5, ("T", "T"): 2.2, ("C", "C"): 1.7}
+        for key, value in rep_dict.items():
+            self.assertAlmostEqual(value, expected.get(key, 0), places=6)
+
+        m = summary.pos_specific_score_matrix()
+        self.assertEqual(str(m), """    A   C   G   T
+X  0.8 1.0 0.5 0.0
+T  0.0 0.0 0.0 2.3
+X  0.5 0.0 1.0 0.0
+T  0.0 0.0 0.0 1.5
+C  0.0 2.3 0.0 0.0
+""")
+
+    def test_replacements_unknown_letters(self):
+        # Letters not in the alphabet only matter if paired with counted ones
+        alpha = Gapped(unambiguous_dna, "-")
+        a = MultipleSeqAlignment([SeqRecord(Seq("AC.", alpha), id="ID001"),
+                                  SeqRecord(Seq("AC-", alpha), id="ID002")],
+                                 alpha)
+        rep_dict = SummaryInfo(a).replacement_dictionary()
+        expected = {("A", "A"): 1.0, ("C", "C"): 1.0}
+        for key, value in rep_dict.items():
+            self.assertEqual(value, expected.get(key, 0))
+        a = MultipleSeqAlignment([SeqRecord(Seq("AC.", alpha), id="ID001"),
+                                  SeqRecord(Seq("ACT", alpha), id="ID002")],
+                                 alpha)
+        self.assertRaises(ValueError, SummaryInfo(a).replacement_dictionary)
+
+    def test_unequal_lengths(self):
+        # Alignments with rows of different lengths use the slower code
+        a = MultipleSeqAlignment([], Gapped(unambiguous_dna, "-"))
+        a.add_sequence("ID001", "ACGTAC")
+        a.add_sequence("ID002", "ACG-AC")
+        a.add_sequence("ID003", "ACCTA")
+        s = SummaryInfo(a)
+        self.assertEqual(str(s.dumb_consensus(ambiguous="N")), "ACNTAC")
+        self.assertEqual(str(s.gap_consensus(ambiguous="N")), "ACNNAC")
+
     def test_pseudo_count(self):
         # use example from
         # http://biologie.univ-mrs.fr/upload/p202/01.4.PSSM_theory.pdf
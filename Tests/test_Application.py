@@ -10,9 +10,14 @@ stdin/stdout/stderr handling.
 """
 
 import os
+import shutil
+import sys
+import tempfile
+import time
 import unittest
 
-from Bio.Application import AbstractCommandline, _Argument
+from Bio.Application import AbstractCommandline, _Argument, _Option
+from Bio.Application import ApplicationError, CommandlineRunner
 
 
 class EchoApp(AbstractCommandline):
@@ -117,6 +122,151 @@ class TestApp(unittest.TestCase):
         os.remove(tmp2)
 
 
+# A stand-in tool for testing CommandlineRunner, which sleeps, writes its
+# arguments, and fails until it has been run a given number of times
+STUB_SCRIPT = """
+import sys
+import time
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+time.sleep(float(args.get("-sleep", 0)))
+sys.stdout.write(args.get("-text", "") + "\\n")
+sys.stderr.write("done\\n")
+if "-counter" in args:
+    with open(args["-counter"], "a") as handle:
+        handle.write("x")
+    with open(args["-counter"]) as handle:
+        runs = len(handle.read())
+    if runs < int(args["-succeed_on"]):
+        sys.stderr.write("failed run %i\\n" % runs)
+        sys.exit(2)
+"""
+
+
+class StubApp(AbstractCommandline):
+    def __init__(self, script, **kwargs):
+        self.parameters = [
+            _Argument(["script"], "Stand-in tool script", filename=True),
+            _Option(["-text", "text"], "Text to print", equate=False),
+            _Option(["-sleep", "sleep"], "Seconds to sleep", equate=False),
+            _Option(["-counter", "counter"], "File counting the runs",
+                    filename=True, equate=False),
+            _Option(["-succeed_on", "succeed_on"],
+                    "Run on which to succeed", equate=False),
+        ]
+        cmd = sys.executable
+        if " " in cmd:
+            cmd = '"%s"' % cmd
+        AbstractCommandline.__init__(self, cmd, script=script, **kwargs)
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="biopython_runner_")
+        self.script = os.path.join(self.temp_dir, "stub_tool.py")
+        with open(self.script, "w") as handle:
+            handle.write(STUB_SCRIPT)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_run_order(self):
+        """Results are in input order, whatever order the jobs finish."""
+        clines = [StubApp(self.script, text="job%i" % i, sleep=0.3 * (i % 2))
+                  for i in range(5)]
+        finished = []
+        runner = CommandlineRunner(max_workers=3)
+        results = runner.run(clines, callback=finished.append)
+        self.assertEqual(5, len(results))
+        self.assertEqual(sorted(finished, key=id), sorted(results, key=id))
+        for i, (cline, result) in enumerate(zip(clines, results)):
+            self.assertTrue(result.ok)
+            self.assertTrue(result.commandline is cline)
+            self.assertEqual(0, result.returncode)
+            self.assertEqual("job%i\n" % i, result.stdout)
+            self.assertEqual("done\n", result.stderr)
+            self.assertEqual(1, result.attempts)
+            self.assertFalse(result.timed_out)
+            self.assertTrue(result.elapsed > 0)
+            result.check()
+
+    def test_run_parallel(self):
+        """Jobs run at the same time, up to max_workers."""
+        clines = [StubApp(self.script, sleep=1) for i in range(4)]
+        start = time.time()
+        results = CommandlineRunner(max_workers=4).run(clines)
+        self.assertTrue(time.time() - start < 3.5)
+        self.assertTrue(all(result.ok for result in results))
+        start = time.time()
+        CommandlineRunner(max_workers=1).run(clines[:2])
+        self.assertTrue(time.time() - start >= 2)
+
+    def test_run_no_capture(self):
+        """Output is discarded when not captured."""
+        runner = CommandlineRunner(stdout=False, stderr=False)
+        result = runner.run([StubApp(self.script, text="Hello")])[0]
+        self.assertTrue(result.ok)
+        self.assertEqual("", result.stdout)
+        self.assertEqual("", result.stderr)
+
+    def test_run_timeout(self):
+        """Jobs running past the timeout are killed."""
+        clines = [StubApp(self.script, text="slow", sleep=30),
+                  StubApp(self.script, text="fast")]
+        start = time.time()
+        slow, fast = CommandlineRunner(max_workers=2, timeout=1).run(clines)
+        self.assertTrue(time.time() - start < 10)
+        self.assertTrue(fast.ok)
+        self.assertFalse(slow.ok)
+        self.assertTrue(slow.timed_out)
+        self.assertEqual(1, slow.attempts)
+        self.assertTrue(isinstance(slow.error, ApplicationError))
+        self.assertTrue("Timed out" in slow.error.stderr)
+        self.assertRaises(ApplicationError, slow.check)
+
+    def test_run_retries(self):
+        """Failed jobs are run again, up to the number of retries."""
+        counter = os.path.join(self.temp_dir, "counter.txt")
+        cline = StubApp(self.script, counter=counter, succeed_on=3)
+        result = CommandlineRunner(retries=1).run([cline])[0]
+        self.assertFalse(result.ok)
+        self.assertEqual(2, result.returncode)
+        self.assertEqual(2, result.attempts)
+        self.assertEqual(2, len(result.timings))
+        self.assertEqual("done\nfailed run 2\n", result.error.stderr)
+        result = CommandlineRunner(retries=5).run([cline])[0]
+        self.assertTrue(result.ok)
+        self.assertEqual(1, result.attempts)
+        os.remove(counter)
+        result = CommandlineRunner(retries=5).run([cline])[0]
+        self.assertTrue(result.ok)
+        self.assertEqual(3, result.attempts)
+
+    def test_run_callback_error(self):
+        """Errors raised by the callback stop the runner."""
+        def callback(result):
+            raise RuntimeError("Stop")
+        clines = [StubApp(self.script) for i in range(3)]
+        runner = CommandlineRunner(max_workers=1)
+        self.assertRaises(RuntimeError, runner.run, clines, callback)
+
+    def test_run_unexpected_error(self):
+        """Unexpected errors from running a job are raised by the runner."""
+        class BrokenApp(StubApp):
+            def _run(self, *args, **kwargs):
+                raise RuntimeError("Broken")
+        clines = [StubApp(self.script), BrokenApp(self.script),
+                  StubApp(self.script)]
+        runner = CommandlineRunner(max_workers=2)
+        self.assertRaises(RuntimeError, runner.run, clines)
+
+    def test_bad_arguments(self):
+        """Invalid runner settings are rejected."""
+        self.assertRaises(ValueError, CommandlineRunner, max_workers=0)
+        self.assertRaises(ValueError, CommandlineRunner, retries=-1)
+        self.assertRaises(ValueError, CommandlineRunner, timeout=0)
+        self.assertEqual([], CommandlineRunner().run([]))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -6,10 +6,11 @@
 """Unit tests for the Bio.Phylo.Consensus module."""
 
 import os
+import random
 import unittest
 import tempfile
 
-# from Bio._py3k import StringIO
+from Bio._py3k import StringIO
 from Bio import AlignIO
 from Bio import Phylo
 from Bio.Phylo import BaseTree
@@ -58,12 +59,24 @@ class ConsensusTest(unittest.TestCase):
         bitstr_counts, len_trees = Consensus._count_clades(self.trees)
         self.assertEqual(len_trees, len(self.trees))
         self.assertEqual(len(bitstr_counts), 6)
-        self.assertEqual(bitstr_counts[_BitString('11111')][0], 3)
-        self.assertEqual(bitstr_counts[_BitString('11000')][0], 2)
-        self.assertEqual(bitstr_counts[_BitString('00111')][0], 3)
-        self.assertEqual(bitstr_counts[_BitString('00110')][0], 2)
-        self.assertEqual(bitstr_counts[_BitString('00011')][0], 1)
-        self.assertEqual(bitstr_counts[_BitString('01111')][0], 1)
+        self.assertEqual(bitstr_counts[int('11111', 2)][0], 3)
+        self.assertEqual(bitstr_counts[int('11000', 2)][0], 2)
+        self.assertEqual(bitstr_counts[int('00111', 2)][0], 3)
+        self.assertEqual(bitstr_counts[int('00110', 2)][0], 2)
+        self.assertEqual(bitstr_counts[int('00011', 2)][0], 1)
+        self.assertEqual(bitstr_counts[int('01111', 2)][0], 1)
+
+    def test_count_clades_terminal_order(self):
+        # Clades are matched by terminal names, whatever their order
+        trees = [Phylo.read(StringIO(t), 'newick') for t in
+                 ('((A,B),(C,(D,E)));', '(((E,D),C),(B,A));')]
+        bitstr_counts, len_trees = Consensus._count_clades(trees)
+        self.assertEqual(len_trees, 2)
+        self.assertEqual(len(bitstr_counts), 4)
+        for bitstr in ('11111', '11000', '00111', '00011'):
+            self.assertEqual(bitstr_counts[int(bitstr, 2)][0], 2)
+        tree = Consensus.strict_consensus(trees)
+        self.assertTrue(Consensus._equal_topology(tree, trees[0]))
 
     def test_strict_consensus(self):
         ref_trees = list(Phylo.parse('./TreeConstruction/strict_refs.tre', 'newick'))
@@ -142,6 +155,22 @@ class BootstrapTest(unittest.TestCase):
         self.assertEqual(len(trees), 100)
         self.assertTrue(isinstance(trees[0], BaseTree.Tree))
 
+    def test_bootstrap_processes(self):
+        calculator = DistanceCalculator('blosum62')
+        constructor = DistanceTreeConstructor(calculator, 'nj')
+        random.seed(42)
+        msa = next(Consensus.bootstrap(self.msa, 1))
+        random.seed(42)
+        trees = list(Consensus.bootstrap_trees(self.msa, 10, constructor))
+        self.assertTrue(Consensus._equal_topology(trees[0],
+                                                  constructor.build_tree(msa)))
+        random.seed(42)
+        parallel = list(Consensus.bootstrap_trees(self.msa, 10, constructor,
+                                                  processes=2))
+        self.assertEqual(len(parallel), 10)
+        for tree1, tree2 in zip(trees, parallel):
+            self.assertTrue(Consensus._equal_topology(tree1, tree2))
+
     def test_bootstrap_consensus(self):
         calculator = DistanceCalculator('blosum62')
         constructor = DistanceTreeConstructor(calculator, 'nj')
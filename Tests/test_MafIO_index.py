@@ -11,12 +11,14 @@ except ImportError:
     # skip most tests if sqlite is not available
     sqlite3 = None
 
+import gzip
 import os
 import unittest
 import tempfile
 import shutil
 
 from Bio.AlignIO.MafIO import MafIndex
+from Bio import bgzf
 from Bio import SeqIO
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
@@ -421,6 +423,151 @@ if sqlite3:
                               self.idx.get_spliced,
                               (3009319,), (3009900,), 1)
 
+    class TestBatchQueries(unittest.TestCase):
+        """Test indexing all sequences, batch searching and splicing"""
+
+        def setUp(self):
+            self.tmpdir = tempfile.mkdtemp()
+            self.idx = MafIndex(os.path.join(self.tmpdir, "database.sqlite3"),
+                                "MAF/ucsc_mm9_chr10.maf", "mm9.chr10")
+            self.assertEqual(len(self.idx), 48)
+
+        def tearDown(self):
+            if os.path.isdir(self.tmpdir):
+                shutil.rmtree(self.tmpdir)
+
+        def test_batch_search(self):
+            regions = [((3014742, 3018161), (3015028, 3018644)),
+                       ((3012000,), (3020000,)),
+                       ((3013219,), (3013319,)),
+                       ((0,), (10,))]
+            results = self.idx.batch_search(regions)
+            self.assertEqual([len(x) for x in results], [12, 34, 1, 0])
+            for (starts, ends), batch in zip(regions, results):
+                single = list(self.idx.search(starts, ends))
+                self.assertEqual([x._annotations for x in single],
+                                 [x._annotations for x in batch])
+                self.assertEqual([[(r.id, str(r.seq)) for r in x] for x in single],
+                                 [[(r.id, str(r.seq)) for r in x] for x in batch])
+
+        def test_batch_search_invalid(self):
+            self.assertRaises(ValueError, self.idx.batch_search,
+                              [((0, 1000, 2000), (500, 1500))])
+            self.assertRaises(TypeError, self.idx.batch_search,
+                              [((500, 1000), (750, 1500.25))])
+
+        def test_cache(self):
+            first = next(self.idx.search((3014742,), (3014800,)))
+            again = next(self.idx.search((3014742,), (3014800,)))
+            self.assertFalse(again is first)
+            self.assertEqual(len(self.idx._cache), 0)
+            self.idx._cache_size = 128
+            first = next(self.idx.search((3014742,), (3014800,)))
+            self.assertTrue(next(self.idx.search((3014742,), (3014800,))) is first)
+            self.assertEqual(len(self.idx._cache), 1)
+
+        def test_search_repeated_seqname(self):
+            # A block holding the sequence searched on twice is found once
+            maf_file = os.path.join(self.tmpdir, "repeat.maf")
+            with open(maf_file, "w") as handle:
+                handle.write("##maf version=1\n\n"
+                             "a score=1.0\n"
+                             "s mm9.chr10 100 10 + 1000 ACGTACGTAC\n"
+                             "s hg18.chr6 200 10 + 5000 ACGTACGTAC\n"
+                             "s hg18.chr6 300 10 + 5000 ACGTACGTAC\n\n")
+            idx = MafIndex(os.path.join(self.tmpdir, "repeat.mafindex"),
+                           maf_file, "mm9.chr10")
+            results = list(idx.search((150,), (350,), seqname="hg18.chr6"))
+            self.assertEqual(len(results), 1)
+            self.assertEqual(len(results[0]), 3)
+            results = idx.batch_search([((150,), (350,)), ((250,), (350,))],
+                                       seqname="hg18.chr6")
+            self.assertEqual([len(x) for x in results], [1, 1])
+
+        def test_search_other_seqname(self):
+            # Minus strand in the file, forward strand coordinates here
+            results = list(self.idx.search((155039093,), (155039536,),
+                                           seqname="hg18.chr6"))
+            self.assertEqual(len(results), 2)
+            record = [r for r in results[0] if r.id == "hg18.chr6"][0]
+            self.assertEqual(record.annotations["strand"], -1)
+            self.assertEqual(list(self.idx.search((0,), (100,),
+                                                  seqname="hg18.chr6")), [])
+
+        def test_search_other_seqname_old_index(self):
+            idx = MafIndex("MAF/ucsc_mm9_chr10.mafindex",
+                           "MAF/ucsc_mm9_chr10.maf", "mm9.chr10")
+            search = idx.search((0,), (100,), seqname="hg18.chr6")
+            self.assertRaises(ValueError, next, search)
+
+        def test_batch_get_spliced(self):
+            transcripts = [((3014742, 3018161), (3015028, 3018644), 1),
+                           ((3012000,), (3013000,), -1),
+                           ((0,), (10,))]
+            for processes in (1, 2):
+                results = self.idx.batch_get_spliced(transcripts, processes)
+                self.assertEqual(len(results), 3)
+                for transcript, batch in zip(transcripts, results):
+                    single = self.idx.get_spliced(*transcript)
+                    self.assertEqual(sorted((r.id, str(r.seq)) for r in single),
+                                     sorted((r.id, str(r.seq)) for r in batch))
+            self.assertRaises(ValueError, self.idx.batch_get_spliced,
+                              [((0,), (10,), ".")])
+
+    class TestBgzfMAF(unittest.TestCase):
+        """Test indexing and searching a BGZF compressed MAF"""
+
+        def setUp(self):
+            self.tmpdir = tempfile.mkdtemp()
+            self.maf_file = os.path.join(self.tmpdir, "ucsc_mm9_chr10.maf.bgz")
+            # Use small blocks so that alignments span several of them
+            with open("MAF/ucsc_mm9_chr10.maf", "rb") as handle:
+                data = handle.read()
+            writer = bgzf.BgzfWriter(self.maf_file, "wb")
+            for i in range(0, len(data), 1000):
+                writer.write(data[i:i + 1000])
+                writer.flush()
+            writer.close()
+            self.idx = MafIndex(os.path.join(self.tmpdir, "database.sqlite3"),
+                                self.maf_file, "mm9.chr10")
+            self.plain_idx = MafIndex("MAF/ucsc_mm9_chr10.mafindex",
+                                      "MAF/ucsc_mm9_chr10.maf", "mm9.chr10")
+
+        def tearDown(self):
+            if os.path.isdir(self.tmpdir):
+                shutil.rmtree(self.tmpdir)
+
+        def test_reload(self):
+            self.assertEqual(len(self.idx), 48)
+            idx = MafIndex(os.path.join(self.tmpdir, "database.sqlite3"),
+                           self.maf_file, "mm9.chr10")
+            self.assertEqual(len(idx), 48)
+
+        def test_search(self):
+            for starts, ends in [((3014742, 3018161), (3015028, 3018644)),
+                                 ((3012000,), (3020000,))]:
+                compressed = list(self.idx.search(starts, ends))
+                plain = list(self.plain_idx.search(starts, ends))
+                self.assertEqual([[(r.id, str(r.seq)) for r in x] for x in compressed],
+                                 [[(r.id, str(r.seq)) for r in x] for x in plain])
+
+        def test_get_spliced(self):
+            starts, ends = (3014742, 3018161), (3015028, 3018644)
+            compressed = self.idx.get_spliced(starts, ends)
+            plain = self.plain_idx.get_spliced(starts, ends)
+            self.assertEqual(sorted((r.id, str(r.seq)) for r in compressed),
+                             sorted((r.id, str(r.seq)) for r in plain))
+
+        def test_plain_gzip(self):
+            maf_file = os.path.join(self.tmpdir, "ucsc_mm9_chr10.maf.gz")
+            with open("MAF/ucsc_mm9_chr10.maf", "rb") as handle:
+                with gzip.open(maf_file, "wb") as out_handle:
+                    out_handle.write(handle.read())
+            self.assertRaises(ValueError, MafIndex,
+                              os.path.join(self.tmpdir, "gzip.sqlite3"),
+                              maf_file, "mm9.chr10")
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
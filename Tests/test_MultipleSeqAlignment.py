@@ -0,0 +1,90 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for the NumPy array view of a MultipleSeqAlignment."""
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use MultipleSeqAlignment.as_array")
+
+from Bio import AlignIO
+from Bio.Alphabet import generic_dna
+from Bio.Align import MultipleSeqAlignment
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Align.AlignInfo import SummaryInfo
+
+
+class ArrayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.align = MultipleSeqAlignment(
+            [SeqRecord(Seq("AAAACGT", generic_dna), id="Alpha"),
+             SeqRecord(Seq("AAA-CGT", generic_dna), id="Beta"),
+             SeqRecord(Seq("AAAAGGT", generic_dna), id="Gamma")])
+
+    def test_shape_and_values(self):
+        array = self.align.as_array()
+        self.assertEqual(array.shape, (3, 7))
+        self.assertEqual(array.dtype, numpy.uint8)
+        self.assertTrue(array.flags.f_contiguous)
+        self.assertFalse(array.flags.writeable)
+        self.assertEqual(array[1, 3], ord("-"))
+        self.assertEqual(array[:, 4].tobytes(), b"CCG")
+
+    def test_cached(self):
+        self.assertTrue(self.align.as_array() is self.align.as_array())
+
+    def test_columns_match(self):
+        align = AlignIO.read("Clustalw/opuntia.aln", "clustal")
+        expected = [align[:, i] for i in range(align.get_alignment_length())]
+        align.as_array()
+        for i, column in enumerate(expected):
+            self.assertEqual(align[:, i], column)
+        self.assertEqual(align[:, -1], expected[-1])
+        self.assertEqual(align[2:5, 10], expected[10][2:5])
+        self.assertEqual(align[::-1, 10], expected[10][::-1])
+        self.assertRaises(IndexError, align.__getitem__, (slice(None), 1000))
+
+    def test_rows_still_records(self):
+        self.align.as_array()
+        self.assertEqual(self.align[1].id, "Beta")
+        self.assertEqual(str(self.align[1, 2:5].seq), "A-C")
+        self.assertEqual(str(self.align[:, 2:5][0].seq), "AAC")
+
+    def test_invalidated(self):
+        old = self.align.as_array()
+        self.align.append(SeqRecord(Seq("TTTTTTT", generic_dna), id="Delta"))
+        self.assertEqual(self.align[:, 0], "AAAT")
+        new = self.align.as_array()
+        self.assertFalse(old is new)
+        self.assertEqual(new.shape, (4, 7))
+        self.align.sort(key=lambda rec: rec.seq)
+        self.assertEqual(self.align[:, 3], "-AAT")
+        self.assertEqual(self.align.as_array()[:, 3].tobytes(), b"-AAT")
+
+    def test_not_cached_by_others(self):
+        summary = SummaryInfo(self.align)
+        self.assertEqual(str(summary.dumb_consensus()), "AAAAXGT")
+        self.assertEqual(self.align._array, None)
+        self.align[2].seq = Seq("AAAACGT", generic_dna)
+        self.assertEqual(self.align[:, 4], "CCC")
+        self.assertEqual(str(summary.dumb_consensus()), "AAAACGT")
+
+    def test_unequal_lengths(self):
+        self.align.add_sequence("Short", "ACGT")
+        self.assertRaises(ValueError, self.align.as_array)
+
+    def test_empty(self):
+        self.assertEqual(MultipleSeqAlignment([]).as_array().shape, (0, 0))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -0,0 +1,234 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for running BLAST+ searches split by query, using a stub BLAST."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import warnings
+
+from Bio import BiopythonExperimentalWarning, MissingExternalDependencyError
+from Bio import SeqIO
+from Bio.Application import ApplicationError
+from Bio.Blast.Applications import NcbiblastnCommandline, run_split_query
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', BiopythonExperimentalWarning)
+    from Bio import SearchIO
+
+if sys.platform == "win32":
+    # The stub BLAST is run as a script via its #! line
+    raise MissingExternalDependencyError(
+        "The stub BLAST executable is not supported on Windows.")
+
+# A stand-in for blastn, writing made up but deterministic hits for each
+# query in XML (-outfmt 5) or tabular (-outfmt 6 or 7) format
+STUB_BLAST = r'''
+import sys
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+if args.get("-db") == "missing":
+    sys.stderr.write("BLAST Database error: No alias or index file found\n")
+    sys.exit(2)
+queries = []
+with open(args["-query"]) as handle:
+    for line in handle:
+        if line.startswith(">"):
+            queries.append([line[1:].strip(), ""])
+        else:
+            queries[-1][1] += line.strip()
+outfmt = args["-outfmt"].strip("'\"")
+out = open(args["-out"], "w")
+
+def get_hits(seq):
+    length = len(seq)
+    return [("subj_%i" % i, length - i, "%0.3g" % (10.0 ** -(length - i)),
+             "%0.1f" % (1.5 * (length - i)))
+            for i in range(length % 3)]
+
+if outfmt == "5":
+    out.write('<?xml version="1.0"?>\n<BlastOutput>\n'
+              '  <BlastOutput_program>blastn</BlastOutput_program>\n'
+              '  <BlastOutput_version>BLASTN 2.2.26+</BlastOutput_version>\n'
+              '  <BlastOutput_reference>Stub</BlastOutput_reference>\n'
+              '  <BlastOutput_db>%s</BlastOutput_db>\n'
+              '  <BlastOutput_query-ID>Query_1</BlastOutput_query-ID>\n'
+              '  <BlastOutput_query-def>%s</BlastOutput_query-def>\n'
+              '  <BlastOutput_query-len>%i</BlastOutput_query-len>\n'
+              '  <BlastOutput_param>\n    <Parameters>\n'
+              '      <Parameters_expect>10</Parameters_expect>\n'
+              '      <Parameters_sc-match>1</Parameters_sc-match>\n'
+              '      <Parameters_sc-mismatch>-2</Parameters_sc-mismatch>\n'
+              '      <Parameters_gap-open>0</Parameters_gap-open>\n'
+              '      <Parameters_gap-extend>0</Parameters_gap-extend>\n'
+              '      <Parameters_filter>L;m;</Parameters_filter>\n'
+              '    </Parameters>\n  </BlastOutput_param>\n'
+              '  <BlastOutput_iterations>\n'
+              % (args["-db"], queries[0][0], len(queries[0][1])))
+    for num, (title, seq) in enumerate(queries):
+        out.write('<Iteration>\n'
+                  '  <Iteration_iter-num>%i</Iteration_iter-num>\n'
+                  '  <Iteration_query-ID>Query_%i</Iteration_query-ID>\n'
+                  '  <Iteration_query-def>%s</Iteration_query-def>\n'
+                  '  <Iteration_query-len>%i</Iteration_query-len>\n'
+                  '  <Iteration_hits>\n'
+                  % (num + 1, num + 1, title, len(seq)))
+        for hit_num, (hit_id, length, evalue, bitscore) in \
+                enumerate(get_hits(seq)):
+            out.write('<Hit>\n  <Hit_num>%i</Hit_num>\n'
+                      '  <Hit_id>%s</Hit_id>\n  <Hit_def>Stub hit</Hit_def>\n'
+                      '  <Hit_accession>%s</Hit_accession>\n'
+                      '  <Hit_len>%i</Hit_len>\n  <Hit_hsps><Hsp>\n'
+                      '    <Hsp_num>1</Hsp_num>\n'
+                      '    <Hsp_bit-score>%s</Hsp_bit-score>\n'
+                      '    <Hsp_score>%i</Hsp_score>\n'
+                      '    <Hsp_evalue>%s</Hsp_evalue>\n'
+                      '    <Hsp_query-from>1</Hsp_query-from>\n'
+                      '    <Hsp_query-to>%i</Hsp_query-to>\n'
+                      '    <Hsp_hit-from>1</Hsp_hit-from>\n'
+                      '    <Hsp_hit-to>%i</Hsp_hit-to>\n'
+                      '    <Hsp_query-frame>1</Hsp_query-frame>\n'
+                      '    <Hsp_hit-frame>1</Hsp_hit-frame>\n'
+                      '    <Hsp_identity>%i</Hsp_identity>\n'
+                      '    <Hsp_positive>%i</Hsp_positive>\n'
+                      '    <Hsp_gaps>0</Hsp_gaps>\n'
+                      '    <Hsp_align-len>%i</Hsp_align-len>\n'
+                      '    <Hsp_qseq>%s</Hsp_qseq>\n'
+                      '    <Hsp_hseq>%s</Hsp_hseq>\n'
+                      '    <Hsp_midline>%s</Hsp_midline>\n'
+                      '  </Hsp></Hit_hsps>\n</Hit>\n'
+                      % (hit_num + 1, hit_id, hit_id, length, bitscore,
+                         length, evalue, length, length, length, length,
+                         length, seq[:length], seq[:length], "|" * length))
+        out.write('  </Iteration_hits>\n  <Iteration_stat><Statistics>\n'
+                  '    <Statistics_db-num>23</Statistics_db-num>\n'
+                  '    <Statistics_db-len>67750</Statistics_db-len>\n'
+                  '    <Statistics_hsp-len>15</Statistics_hsp-len>\n'
+                  '    <Statistics_eff-space>7616765</Statistics_eff-space>\n'
+                  '    <Statistics_kappa>0.46</Statistics_kappa>\n'
+                  '    <Statistics_lambda>1.28</Statistics_lambda>\n'
+                  '    <Statistics_entropy>0.85</Statistics_entropy>\n'
+                  '  </Statistics></Iteration_stat>\n</Iteration>\n')
+    out.write('  </BlastOutput_iterations>\n</BlastOutput>\n')
+else:
+    for title, seq in queries:
+        hits = get_hits(seq)
+        if outfmt == "7":
+            out.write("# BLASTN 2.2.26+\n# Query: %s\n# Database: %s\n"
+                      % (title, args["-db"]))
+            if hits:
+                out.write("# Fields: query id, subject id, % identity, "
+                          "alignment length, mismatches, gap opens, "
+                          "q. start, q. end, s. start, s. end, evalue, "
+                          "bit score\n")
+            out.write("# %i hits found\n" % len(hits))
+        for hit_id, length, evalue, bitscore in hits:
+            out.write("%s\t%s\t100.00\t%i\t0\t0\t1\t%i\t1\t%i\t%s\t%s\n"
+                      % (title.split()[0], hit_id, length, length, length,
+                         evalue, bitscore))
+    if outfmt == "7":
+        out.write("# BLAST processed %i queries\n" % len(queries))
+out.close()
+'''
+
+
+class SplitQueryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="biopython_split_")
+        self.stub = os.path.join(self.temp_dir, "blastn")
+        with open(self.stub, "w") as handle:
+            handle.write("#!%s\n" % sys.executable)
+            handle.write(STUB_BLAST)
+        os.chmod(self.stub, 0o755)
+        self.query = os.path.join(self.temp_dir, "query.fasta")
+        records = [SeqRecord(Seq("ACGT" * length)[:length],
+                             id="seq%i" % index,
+                             description="Query %i" % index)
+                   for index, length in enumerate(
+                       (50, 4, 31, 17, 8, 44, 2, 60, 25, 11, 5))]
+        SeqIO.write(records, self.query, "fasta")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def make_cline(self, outfmt, out, db="stubdb"):
+        return NcbiblastnCommandline(cmd=self.stub,
+                                     query=self.query, db=db, outfmt=outfmt,
+                                     out=os.path.join(self.temp_dir, out))
+
+    def check_split(self, outfmt, fmt, **kwargs):
+        """Compare split and single process runs of the stub BLAST."""
+        cline = self.make_cline(outfmt, "whole.out")
+        cline()
+        expected = list(SearchIO.parse(cline.out, fmt, **kwargs))
+        query_ids = ["seq%i" % i for i in range(11)]
+        if fmt == "blast-tab" and not kwargs.get("comments"):
+            # seq7 has no hits, so is missing from plain tabular output
+            query_ids.remove("seq7")
+        self.assertEqual(query_ids, [qresult.id for qresult in expected])
+
+        split_cline = self.make_cline(outfmt, "split.out")
+        results = run_split_query(split_cline, chunks=3, max_workers=2,
+                                  temp_dir=self.temp_dir)
+        self.assertEqual(3, len(results))
+        self.assertTrue(all(result.ok for result in results))
+        # the copies each searched part of the query
+        for result in results:
+            self.assertNotEqual(self.query, result.commandline.query)
+        # the original command line is unchanged
+        self.assertEqual(self.query, split_cline.query)
+        # and the temporary files were removed
+        self.assertEqual(["blastn", "query.fasta", "split.out", "whole.out"],
+                         sorted(os.listdir(self.temp_dir)))
+
+        merged = list(SearchIO.parse(split_cline.out, fmt, **kwargs))
+        self.assertEqual([qresult.id for qresult in expected],
+                         [qresult.id for qresult in merged])
+        for qresult, merged_qresult in zip(expected, merged):
+            self.assertEqual(qresult.description, merged_qresult.description)
+            self.assertEqual(qresult.hit_keys, merged_qresult.hit_keys)
+            self.assertEqual([hsp.evalue for hsp in qresult.hsps],
+                             [hsp.evalue for hsp in merged_qresult.hsps])
+            self.assertEqual([hsp.bitscore for hsp in qresult.hsps],
+                             [hsp.bitscore for hsp in merged_qresult.hsps])
+            self.assertEqual([hsp.query_end for hsp in qresult.hsps],
+                             [hsp.query_end for hsp in merged_qresult.hsps])
+
+    def test_tabular(self):
+        """Split query run with tabular output."""
+        self.check_split(6, "blast-tab")
+
+    def test_tabular_comments(self):
+        """Split query run with commented tabular output."""
+        self.check_split(7, "blast-tab", comments=True)
+
+    def test_xml(self):
+        """Split query run with XML output."""
+        self.check_split(5, "blast-xml")
+
+    def test_failure(self):
+        """Failing parts raise an ApplicationError."""
+        cline = self.make_cline(6, "split.out", db="missing")
+        self.assertRaises(ApplicationError, run_split_query, cline, 2)
+        self.assertFalse(os.path.exists(cline.out))
+
+    def test_bad_options(self):
+        """Unsupported command lines are rejected."""
+        self.assertRaises(ValueError, run_split_query,
+                          self.make_cline(0, "split.out"))
+        cline = self.make_cline(6, "split.out")
+        del cline.out
+        self.assertRaises(ValueError, run_split_query, cline)
+        self.assertRaises(ValueError, run_split_query,
+                          self.make_cline(6, "split.out"), 0)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
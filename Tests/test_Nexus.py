@@ -533,6 +533,34 @@ class TestSelf(unittest.TestCase):
     def test_empty_file_read(self):
         self.assertEqual([], list(NexusIterator(StringIO())))
 
+    def test_interleaved_matchchar(self):
+        """Interleaved matrix with matchchar, quoted and repeated names"""
+        n = Nexus.Nexus("""#NEXUS
+        begin data;
+        dimensions ntax=4 nchar=12;
+        format datatype=dna missing=? gap=- matchchar=. interleave;
+        matrix
+        'taxon one'  ACGT AC [a comment]
+        taxon_two    ..G. .-
+        three        A.?T (AG)C
+        three        ...- ..
+
+        taxon_one    GGCC TT
+        'taxon two'  .A.. ..
+        three        C... ..
+        three        .... .A
+        ;
+        end;
+        """)
+        self.assertEqual(n.taxlabels,
+                         ['taxon one', 'taxon_two', 'three', 'three.copy'])
+        self.assertEqual(n.unaltered_taxlabels,
+                         ['taxon one', 'taxon_two', 'three', 'three'])
+        self.assertEqual(str(n.matrix['taxon one']), "ACGTACGGCCTT")
+        self.assertEqual(str(n.matrix['taxon_two']), "ACGTA-GACCTT")
+        self.assertEqual(str(n.matrix['three']), "AC?TRCCGCCTT")
+        self.assertEqual(str(n.matrix['three.copy']), "ACG-ACGGCCTA")
+
     def test_multiple_output(self):
         records = [SeqRecord(Seq("ATGCTGCTGAT", alphabet=ambiguous_dna), id="foo"),
                    SeqRecord(Seq("ATGCTGCAGAT", alphabet=ambiguous_dna), id="bar"),
@@ -38,7 +38,7 @@ from Bio.PDB import PDBParser, PPBuilder, CaPPBuilder, PDBIO, Select
 from Bio.PDB import HSExposureCA, HSExposureCB, ExposureCN
 from Bio.PDB.PDBExceptions import PDBConstructionException, PDBConstructionWarning
 from Bio.PDB import rotmat, Vector, refmat, calc_angle, calc_dihedral, rotaxis, m2rotaxis
-from Bio.PDB import Residue, Atom
+from Bio.PDB import Chain, Residue, Atom
 from Bio.PDB import make_dssp_dict
 from Bio.PDB import DSSP
 from Bio.PDB.NACCESS import process_asa_data, process_rsa_data
@@ -1303,6 +1303,136 @@ class CopyTests(unittest.TestCase):
             self.assertFalse(e.get_list()[0] is ee.get_list()[0])
 
 
+class CoordArrayTests(unittest.TestCase):
+    """Test the coordinate arrays of models, chains and residues."""
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            self.s = PDBParser(PERMISSIVE=True).get_structure(
+                'X', "PDB/a_structure.pdb")
+        # the second model has disordered atoms
+        self.m = self.s[1]
+        self.c = self.m.get_list()[0]
+        self.r = self.c.get_list()[1]
+
+    def check_arrays(self, entity):
+        atoms = list(entity.get_atoms())
+        coords = entity.get_coord_array()
+        self.assertEqual((len(atoms), 3), coords.shape)
+        for atom, coord in zip(atoms, coords):
+            self.assertTrue(numpy.array_equal(atom.get_coord(), coord))
+        self.assertEqual([atom.get_bfactor() for atom in atoms],
+                         list(entity.get_bfactor_array()))
+        self.assertEqual([atom.get_occupancy() for atom in atoms],
+                         list(entity.get_occupancy_array()))
+
+    def test_get_coord_array(self):
+        """Get the coordinates of all atoms."""
+        for entity in [self.s, self.m, self.c, self.r] + self.c.get_list():
+            self.check_arrays(entity)
+        # the atoms of a model share its arrays
+        atoms = list(self.m.get_atoms())
+        self.assertTrue(all(atom._arrays is atoms[0]._arrays
+                            for atom in atoms))
+        # changing the array does not move the atoms
+        coords = self.m.get_coord_array()
+        coords += 1
+        self.assertTrue(numpy.array_equal(atoms[0].get_coord(),
+                                          self.m.get_coord_array()[0]))
+        self.assertFalse(numpy.array_equal(coords[0], atoms[0].get_coord()))
+
+    def test_atom_changes(self):
+        """Changes to atoms are seen in the arrays."""
+        atom = self.r.get_list()[1]
+        coord = atom.get_coord()
+        atom.set_coord(numpy.array((1.0, 2.0, 3.0)))
+        atom.transform(numpy.identity(3), numpy.array((1.0, 0.0, 0.0)))
+        atom.set_bfactor(12.5)
+        atom.set_occupancy(None)
+        self.assertTrue(atom.get_coord() is coord)
+        self.assertEqual([2.0, 2.0, 3.0], list(coord))
+        self.assertEqual([2.0, 2.0, 3.0], list(self.r.get_coord_array()[1]))
+        self.assertEqual(12.5, self.r.get_bfactor_array()[1])
+        self.assertTrue(numpy.isnan(self.r.get_occupancy_array()[1]))
+        self.assertEqual(None, atom.get_occupancy())
+
+    def test_structure_changes(self):
+        """Adding, removing and selecting atoms updates the arrays."""
+        residue = self.c.get_list()[3]
+        self.c.detach_child(residue.get_id())
+        self.check_arrays(self.m)
+        atom = Atom.Atom("XX", numpy.array((1.0, 2.0, 3.0), 'f'), 20.0, 1.0,
+                         " ", " XX ", 1000, "C")
+        self.r.add(atom)
+        self.check_arrays(self.m)
+        self.check_arrays(self.r)
+        self.assertTrue(atom._arrays is self.r.get_list()[0]._arrays)
+        for atom in self.m.get_atoms():
+            if atom.is_disordered() == 2:
+                break
+        else:
+            self.fail("No disordered atom found")
+        for altloc in atom.disordered_get_id_list():
+            atom.disordered_select(altloc)
+            self.check_arrays(self.m)
+            self.check_arrays(atom.get_parent())
+
+    def test_transform(self):
+        """Transform all atoms of a model at once."""
+        rotation = rotmat(Vector(1, 3, 5), Vector(1, 0, 0))
+        translation = numpy.array((2.4, 0, 1), 'f')
+        for entity in (self.r, self.c, self.m):
+            expected = numpy.dot(entity.get_coord_array(), rotation) + \
+                translation
+            other = self.s[0].get_coord_array()
+            entity.transform(rotation, translation)
+            self.assertTrue(numpy.allclose(expected,
+                                           entity.get_coord_array()))
+            self.check_arrays(entity)
+            # the other model has its own arrays
+            self.assertTrue(numpy.array_equal(other,
+                                              self.s[0].get_coord_array()))
+
+    def test_repack(self):
+        """Entities cached before the model is packed again still work."""
+        identity = numpy.identity(3)
+        translation = numpy.array((100.0, 0.0, 0.0))
+        residues = self.c.get_list()
+        self.r.get_coord_array()
+        residues[2].get_coord_array()
+        # an empty chain has nothing to pack
+        arrays = self.r.get_list()[0]._arrays
+        chain = Chain.Chain("Z")
+        self.m.add(chain)
+        self.assertEqual((0, 3), chain.get_coord_array().shape)
+        self.assertTrue(self.r.get_list()[0]._arrays is arrays)
+        # an atom added to another residue makes the model pack again
+        atom = Atom.Atom("XX", numpy.array((1.0, 2.0, 3.0), 'f'), 20.0, 1.0,
+                         " ", " XX ", 1000, "C")
+        residues[2].add(atom)
+        self.m.get_coord_array()
+        self.assertFalse(self.r.get_list()[0]._arrays is arrays)
+        coords = self.r.get_coord_array()
+        self.r.transform(identity, translation)
+        self.assertTrue(numpy.allclose(coords + translation,
+                                       self.r.get_coord_array()))
+        self.check_arrays(self.r)
+        self.check_arrays(self.m)
+
+    def test_copies(self):
+        """Copies of atoms and entities do not share the arrays."""
+        translation = numpy.array((1.0, 1.0, 1.0))
+        coords = self.m.get_coord_array()
+        for other in (self.m.copy(), deepcopy(self.m)):
+            other.transform(numpy.identity(3), translation)
+            self.assertTrue(numpy.allclose(coords + 1,
+                                           other.get_coord_array()))
+            self.assertTrue(numpy.array_equal(coords,
+                                              self.m.get_coord_array()))
+            self.check_arrays(other)
+
+
 def eprint(*args, **kwargs):
     """Helper function that prints to stderr."""
     print(*args, file=sys.stderr, **kwargs)
@@ -9,11 +9,13 @@ import os
 import sys
 import unittest
 import tempfile
+import warnings
 
 from Bio._py3k import StringIO
 
+from Bio import BiopythonDeprecationWarning
 from Bio import Phylo
-from Bio.Phylo import PhyloXML, NewickIO
+from Bio.Phylo import BaseTree, PhyloXML, NewickIO
 
 
 # Example Newick and Nexus files
@@ -86,6 +88,22 @@ class IOTests(unittest.TestCase):
                 if c is not None)
         self.assertEqual(internal_names, set(('E', 'F')))
 
+    def test_newick_deprecated_parser_methods(self):
+        """Deprecated methods of the Newick parser still work."""
+        parser = NewickIO.Parser(StringIO("(A,B);"))
+        parser.values_are_confidence = False
+        parser.comments_are_confidence = False
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", BiopythonDeprecationWarning)
+            root = parser.new_clade()
+            clade = parser.new_clade(root)
+            clade.name = "A"
+            self.assertTrue(parser.process_clade(clade) is root)
+        self.assertEqual([c.name for c in root.clades], ["A"])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", BiopythonDeprecationWarning)
+            self.assertRaises(BiopythonDeprecationWarning, parser.new_clade)
+
     def test_newick_read_scinot(self):
         """Parse Newick branch lengths in scientific notation."""
         tree = Phylo.read(StringIO("(foo:1e-1,bar:0.1)"), 'newick')
@@ -131,6 +149,20 @@ class IOTests(unittest.TestCase):
         self.assertTrue(mem_file.getvalue().strip()
                         in ['A:1e-01;', 'A:1e-001;'])
 
+    def test_newick_deep_tree(self):
+        """Read and write a Newick tree deeper than the recursion limit."""
+        depth = sys.getrecursionlimit() + 100
+        text = "(" * depth + "A:1"
+        for i in range(depth):
+            text += ",T%i:1)N%i:1" % (i, i)
+        text += ";"
+        tree = Phylo.read(StringIO(text), "newick")
+        self.assertEqual(tree.count_terminals(), depth + 1)
+        self.assertEqual(tree.root.name, "N%i" % (depth - 1))
+        mem_file = StringIO()
+        Phylo.write(tree, mem_file, "newick", format_branch_length="%i")
+        self.assertEqual(mem_file.getvalue().strip(), text)
+
     def test_convert(self):
         """Convert a tree between all supported formats."""
         mem_file_1 = StringIO()
@@ -380,6 +412,59 @@ class MixinTests(unittest.TestCase):
         self.assertAlmostEqual(t.distance('A', 'C'), 0.562)
         self.assertAlmostEqual(t.distance('B', 'C'), 0.69)
 
+    def test_build_index(self):
+        """TreeMixin: build_index() method."""
+        tree = self.phylogenies[10]
+        targets = ['A', 'B', 'C', 'D']
+        expected = dict((t, (tree.get_path(t), tree.distance(t)))
+                        for t in targets)
+        lcas = [tree.common_ancestor('A', 'B'),
+                tree.common_ancestor('A', 'B', 'C'),
+                tree.common_ancestor('A', 'D')]
+        trace = tree.trace('A', 'D')
+        tree.build_index()
+        for t in targets:
+            path, dist = expected[t]
+            self.assertEqual(tree.get_path(t), path)
+            self.assertAlmostEqual(tree.distance(t), dist)
+        self.assertEqual([tree.common_ancestor('A', 'B'),
+                          tree.common_ancestor('A', 'B', 'C'),
+                          tree.common_ancestor('A', 'D')], lcas)
+        self.assertEqual(tree.trace('A', 'D'), trace)
+        self.assertEqual(tree.common_ancestor(path[-1]), path[-1])
+        self.assertRaises(ValueError, tree.common_ancestor, 'A', 'X')
+        self.assertEqual(tree.get_path('X'), None)
+        # Changing the tree updates the index
+        tree.prune('A')
+        self.assertEqual(tree.find_any('A'), None)
+        self.assertEqual(tree.get_path('A'), None)
+        tree.clear_index()
+        path = tree.get_path('B')
+        tree.build_index()
+        self.assertEqual(tree.get_path('B'), path)
+        # Changing another tree keeps this index
+        index = BaseTree._indexes[tree]
+        other = self.phylogenies[1]
+        other.build_index()
+        other.ladderize()
+        self.assertEqual(tree.get_path('B'), path)
+        self.assertTrue(BaseTree._indexes[tree] is index)
+        # Changes made via a clade are seen by the tree's index
+        clade = tree.common_ancestor('B', 'C')
+        clade.split()
+        self.assertEqual(tree.get_path(clade.clades[-1])[-2], clade)
+        self.assertFalse(BaseTree._indexes[tree] is index)
+
+    def test_distance_matrix(self):
+        """TreeMixin: distance_matrix() method."""
+        t = self.phylogenies[1]
+        dm = t.distance_matrix()
+        self.assertEqual(dm.names, ['A', 'B', 'C'])
+        self.assertAlmostEqual(dm['A', 'B'], 0.332)
+        self.assertAlmostEqual(dm['A', 'C'], 0.562)
+        self.assertAlmostEqual(dm['B', 'C'], 0.69)
+        self.assertEqual(dm['C', 'C'], 0)
+
     def test_is_bifurcating(self):
         """TreeMixin: is_bifurcating() method."""
         for tree, is_b in zip(self.phylogenies,
@@ -161,6 +161,12 @@ class ParseTests(unittest.TestCase):
                                            (((2, (2, 2)),
                                              (2, (2, 2)),),),)
 
+    def test_parse_releases_elements(self):
+        """Discard the XML elements of each phylogeny once it is parsed."""
+        parser = PhyloXMLIO.Parser(EX_MADE)
+        self.assertEqual(len(list(parser.parse())), 6)
+        self.assertEqual(len(parser.root), 0)
+
 
 class TreeTests(unittest.TestCase):
     """Tests for instantiation and attributes of each complex type."""
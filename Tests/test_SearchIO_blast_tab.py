@@ -17,6 +17,7 @@ with warnings.catch_warnings():
     warnings.simplefilter('ignore', BiopythonExperimentalWarning)
     from Bio.SearchIO import parse
     from Bio.SearchIO.BlastIO.blast_tab import _LONG_SHORT_MAP as all_fields
+    from Bio.SearchIO.BlastIO import BlastTabRowParser
 
 # test case files are in the Blast directory
 TEST_DIR = 'Blast'
@@ -956,6 +957,70 @@ class BlastTabCases(unittest.TestCase):
         self.assertEqual(1, counter)
 
 
+class BlastTabRowParserCases(unittest.TestCase):
+
+    def parse_rows(self, filename, **kwargs):
+        with open(get_file(filename)) as handle:
+            return list(BlastTabRowParser(handle, **kwargs))
+
+    def test_tab_2226_tblastn_001(self):
+        "Test fast row parsing of TBLASTN 2.2.26+ tabular output (tab_2226_tblastn_001)"
+        groups = self.parse_rows('tab_2226_tblastn_001.txt',
+                                 columns=['sseqid', 'sstart', 'evalue'])
+        qresults = list(parse(get_file('tab_2226_tblastn_001.txt'), FMT))
+        self.assertEqual([qresult.id for qresult in qresults],
+                         [query_id for query_id, rows in groups])
+        for qresult, (query_id, rows) in zip(qresults, groups):
+            self.assertEqual([(hsp.hit_id, hsp.evalue) for hsp in qresult.hsps],
+                             [(row[0], row[2]) for row in rows])
+        # coordinates are as in the file
+        self.assertEqual(('gi|145479850|ref|XM_001425911.1|', 1744, 1e-05),
+                         groups[0][1][0])
+        self.assertEqual(542, groups[1][1][1][1])
+
+    def test_tab_2226_tblastn_001_chunks(self):
+        "Test fast row parsing with queries split over several chunks"
+        expected = self.parse_rows('tab_2226_tblastn_001.txt')
+        for chunk_size in (1, 50, 500):
+            self.assertEqual(expected,
+                             self.parse_rows('tab_2226_tblastn_001.txt',
+                                             chunk_size=chunk_size))
+
+    def test_tab_2226_tblastn_005_comments(self):
+        "Test fast row parsing of commented tabular output (tab_2226_tblastn_005)"
+        groups = self.parse_rows('tab_2226_tblastn_005.txt', comments=True,
+                                 columns='qseqid sseqid')
+        self.assertEqual(['gi|16080617|ref|NP_391444.1|', 'gi|11464971:4-101'],
+                         [query_id for query_id, rows in groups])
+        self.assertEqual([3, 9], [len(rows) for query_id, rows in groups])
+        self.assertEqual(('gi|11464971:4-101',
+                          'gi|350596019|ref|XM_003360601.2|'),
+                         groups[1][1][0])
+
+    def test_tab_2226_tblastn_001_arrays(self):
+        "Test fast row parsing into NumPy arrays (tab_2226_tblastn_001)"
+        try:
+            import numpy
+        except ImportError:
+            return
+        groups = self.parse_rows('tab_2226_tblastn_001.txt', arrays=True,
+                                 columns=['sseqid', 'evalue', 'length'],
+                                 chunk_size=300)
+        self.assertEqual([3, 9], [len(rows) for query_id, rows in groups])
+        rows = groups[1][1]
+        self.assertEqual(('sseqid', 'evalue', 'length'), rows.dtype.names)
+        self.assertEqual(numpy.float64, rows['evalue'].dtype)
+        self.assertEqual([98, 71, 98], rows['length'][:3].tolist())
+        self.assertEqual(1.7, rows['evalue'][-1])
+
+    def test_bad_columns(self):
+        "Test fast row parsing errors"
+        self.assertRaises(ValueError, self.parse_rows,
+                          'tab_2226_tblastn_001.txt', columns=['qseq'])
+        self.assertRaises(ValueError, self.parse_rows,
+                          'tab_2226_tblastn_001.txt', fields=['qseqid', 'sseqid'])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
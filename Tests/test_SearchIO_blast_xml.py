@@ -12,6 +12,7 @@ import warnings
 
 from Bio import BiopythonParserWarning
 from Bio import BiopythonExperimentalWarning
+from Bio.SeqRecord import SeqRecord
 
 
 with warnings.catch_warnings():
@@ -3220,6 +3221,27 @@ class BlastXmlSpecialCases(unittest.TestCase):
         self.assertEqual(qresult.description, 'gi|347972582|ref|XM_309352.4| Anopheles gambiae str. PEST AGAP011294-PA (DEFI_ANOGA) mRNA, complete cds')
         self.assertEqual(qresult.blast_id, 'Query_1')
 
+    def test_xml_2226_blastp_004_lazy_seqs(self):
+        xml_file = get_file('xml_2226_blastp_004.xml')
+        eager = list(parse(xml_file, FMT))
+        lazy = list(parse(xml_file, FMT, lazy_seqs=True))
+        self.assertEqual(len(eager), len(lazy))
+        for qresult, lazy_qresult in zip(eager, lazy):
+            self.assertEqual(qresult.id, lazy_qresult.id)
+            self.assertEqual(len(qresult), len(lazy_qresult))
+            for hsp, lazy_hsp in zip(qresult.hsps, lazy_qresult.hsps):
+                frag = lazy_hsp[0]
+                # sequences stay as plain strings until accessed
+                self.assertFalse(isinstance(frag._hit, SeqRecord))
+                self.assertEqual(hsp.hit_start, lazy_hsp.hit_start)
+                self.assertEqual(hsp.evalue, lazy_hsp.evalue)
+                self.assertEqual(str(hsp.hit.seq), str(lazy_hsp.hit.seq))
+                self.assertEqual(str(hsp.query.seq), str(lazy_hsp.query.seq))
+                self.assertEqual(hsp.hit.id, lazy_hsp.hit.id)
+                self.assertEqual(hsp.query.id, lazy_hsp.query.id)
+                self.assertEqual(hsp.hit.seq.alphabet, lazy_hsp.hit.seq.alphabet)
+                self.assertTrue(isinstance(frag._hit, SeqRecord))
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
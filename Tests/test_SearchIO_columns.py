@@ -0,0 +1,165 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for SearchIO column arrays."""
+
+import os
+import unittest
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SearchIO columns.")
+
+from Bio import BiopythonExperimentalWarning
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', BiopythonExperimentalWarning)
+    from Bio import SearchIO
+
+
+# attributes compared between parsed and column based objects
+HSP_ATTRS = ('evalue', 'bitscore', 'bias', 'ident_pct', 'aln_span',
+             'domain_index', 'env_start', 'env_end', 'query_start',
+             'query_end', 'hit_start', 'hit_end', 'query_strand',
+             'hit_strand', 'query_frame', 'hit_frame')
+
+
+class ColumnsCases(unittest.TestCase):
+
+    def check_qresults(self, cols, qresults):
+        """Check QueryResults made from columns against parsed ones."""
+        attrs = [attr for attr in HSP_ATTRS if attr in cols.fields]
+        col_qresults = list(cols.to_qresults())
+        qresults = [qresult for qresult in qresults if qresult]
+        self.assertEqual([q.id for q in qresults],
+                         [q.id for q in col_qresults])
+        for qresult, col_qresult in zip(qresults, col_qresults):
+            self.assertEqual([h.id for h in qresult],
+                             [h.id for h in col_qresult])
+            for hit, col_hit in zip(qresult, col_qresult):
+                self.assertEqual(len(hit), len(col_hit))
+                for hsp, col_hsp in zip(hit, col_hit):
+                    for attr in attrs:
+                        self.assertEqual(getattr(hsp, attr, None),
+                                         getattr(col_hsp, attr, None), attr)
+
+    def test_blast_tab(self):
+        """Test reading blast-tab files into columns."""
+        tab_file = os.path.join('Blast', 'tab_2226_tblastn_001.txt')
+        cols = SearchIO.read_columns(tab_file, 'blast-tab')
+        self.assertEqual(12, len(cols))
+        self.assertEqual(('query_id', 'hit_id', 'evalue', 'bitscore',
+                          'ident_pct', 'mismatch_num', 'gapopen_num',
+                          'aln_span', 'query_start', 'query_end', 'hit_start',
+                          'hit_end', 'query_strand', 'hit_strand'),
+                         cols.fields)
+        self.assertEqual(numpy.float64, cols['evalue'].dtype)
+        self.assertEqual(numpy.int64, cols['hit_start'].dtype.type)
+        qresults = list(SearchIO.parse(tab_file, 'blast-tab'))
+        self.check_qresults(cols, qresults)
+
+    def test_blast_tab_comments(self):
+        """Test reading commented blast-tab files into columns."""
+        tab_file = os.path.join('Blast', 'tab_2226_tblastn_011.txt')
+        cols = SearchIO.read_columns(tab_file, 'blast-tab', comments=True)
+        qresults = [qresult for qresult in
+                    SearchIO.parse(tab_file, 'blast-tab', comments=True)
+                    if qresult]
+        self.check_qresults(cols, qresults)
+        self.assertEqual(qresults[0].description,
+                         next(cols.to_qresults()).description)
+        # frames are given, and take precedence for the strands
+        self.assertEqual([0], numpy.unique(cols['query_strand']).tolist())
+
+    def test_blast_tab_comments_missing(self):
+        """Test reading blast-tab files as commented when they are not."""
+        tab_file = os.path.join('Blast', 'tab_2226_tblastn_001.txt')
+        self.assertEqual([], list(SearchIO.parse(tab_file, 'blast-tab',
+                                                 comments=True)))
+        cols = SearchIO.read_columns(tab_file, 'blast-tab', comments=True)
+        self.assertEqual(0, len(cols))
+
+    def test_hmmer3_domtab(self):
+        """Test reading hmmer3-domtab files into columns."""
+        for fmt, filename in (
+                ('hmmscan3-domtab', 'domtab_31b1_hmmscan_001.out'),
+                ('hmmsearch3-domtab', 'domtab_30_hmmsearch_001.out')):
+            tab_file = os.path.join('Hmmer', filename)
+            cols = SearchIO.read_columns(tab_file, fmt)
+            qresults = list(SearchIO.parse(tab_file, fmt))
+            self.check_qresults(cols, qresults)
+
+    def test_hmmer3_tab(self):
+        """Test reading hmmer3-tab files into columns."""
+        tab_file = os.path.join('Hmmer', 'tab_31b1_hmmscan_001.out')
+        cols = SearchIO.read_columns(tab_file, 'hmmer3-tab')
+        qresults = list(SearchIO.parse(tab_file, 'hmmer3-tab'))
+        self.check_qresults(cols, qresults)
+        for qresult, col_qresult in zip(qresults, cols.to_qresults()):
+            self.assertEqual([hit.evalue for hit in qresult],
+                             [hit.evalue for hit in col_qresult])
+            self.assertEqual([hit.description for hit in qresult],
+                             [hit.description for hit in col_qresult])
+
+    def test_empty(self):
+        """Test reading a file without results into columns."""
+        tab_file = os.path.join('Hmmer', 'tab_30_hmmscan_002.out')
+        cols = SearchIO.read_columns(tab_file, 'hmmer3-tab')
+        self.assertEqual(0, len(cols))
+        self.assertEqual([], list(cols.group_by()))
+        self.assertEqual([], list(cols.to_qresults()))
+
+    def test_unsupported_format(self):
+        """Test read_columns with a format it does not support."""
+        self.assertRaises(ValueError, SearchIO.read_columns,
+                          os.path.join('Blast', 'mirna.xml'), 'blast-xml')
+
+    def test_filter_sort_group(self):
+        """Test bulk filtering, sorting, and grouping against the objects."""
+        xml_file = os.path.join('Blast', 'mirna.xml')
+        cols = SearchIO.to_columns(SearchIO.parse(xml_file, 'blast-xml'))
+        self.assertEqual(277, len(cols))
+
+        mask = (cols['evalue'] < 1e-10) & (cols['aln_span'] >= 50)
+        selected = cols.filter(mask)
+        expected = []
+        for qresult in SearchIO.parse(xml_file, 'blast-xml'):
+            qresult = qresult.hsp_filter(
+                lambda hsp: hsp.evalue < 1e-10 and hsp.aln_span >= 50)
+            expected.extend((hsp.query_id, hsp.hit_id, hsp.bitscore)
+                            for hsp in qresult.hsps)
+        self.assertEqual(expected,
+                         list(zip(selected['query_id'], selected['hit_id'],
+                                  selected['bitscore'])))
+        self.assertRaises(ValueError, cols.filter, mask[:10])
+
+        ordered = cols.sort('bitscore', reverse=True)
+        bitscores = ordered['bitscore'].tolist()
+        self.assertEqual(sorted(bitscores, reverse=True), bitscores)
+        # stable sort: ties keep the file order
+        ties = ordered.filter(ordered['bitscore'] == bitscores[0])
+        self.assertEqual(sorted(ties['query_id'].tolist()),
+                         ties['query_id'].tolist())
+
+        groups = list(selected.group_by('query_id'))
+        self.assertEqual(['33211', '33212', '33213'],
+                         [query_id for query_id, group in groups])
+        self.assertEqual(len(selected),
+                         sum(len(group) for query_id, group in groups))
+        for query_id, group in groups:
+            self.assertEqual(set([query_id]), set(group['query_id']))
+
+        qresults = list(selected.to_qresults())
+        self.assertEqual(len(selected),
+                         sum(len(qresult.hsps) for qresult in qresults))
+        self.assertEqual('mir_1', qresults[0].description)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
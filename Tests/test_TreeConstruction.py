@@ -12,6 +12,7 @@ import tempfile
 from Bio._py3k import StringIO
 from Bio import AlignIO
 from Bio import Phylo
+from Bio.SeqRecord import SeqRecord
 from Bio.Phylo import BaseTree
 from Bio.Phylo import TreeConstruction
 from Bio.Phylo import Consensus
@@ -119,6 +120,20 @@ class DistanceMatrixTest(unittest.TestCase):
         for name, line in zip(self.names, lines[1:]):
             self.assertTrue(line.startswith(name))
 
+    def test_condensed_storage(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        dm = DistanceCalculator('identity').get_distance(aln)
+        names = [s.id for s in aln]
+        expected = [[dm[a, b] for b in names[:i + 1]]
+                    for i, a in enumerate(names)]
+        self.assertEqual(dm.matrix, expected)
+        # Changes made via the nested lists are kept
+        dm['Alpha', 'Beta'] = 0.5
+        self.assertEqual(dm['Beta', 'Alpha'], 0.5)
+        del dm['Gamma']
+        self.assertEqual(dm.names, ['Alpha', 'Beta', 'Delta', 'Epsilon'])
+        self.assertEqual(len(dm.matrix), 4)
+
 
 class DistanceCalculatorTest(unittest.TestCase):
     """Test DistanceCalculator"""
@@ -153,6 +168,76 @@ class DistanceCalculatorTest(unittest.TestCase):
         self.assertEqual(dmat['Alpha', 'Alpha'], 0.)
         self.assertAlmostEqual(dmat['Alpha', 'Gamma'], 4. / 5.)
 
+    def test_pairwise_agreement(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        aln.append(SeqRecord(aln[0].seq[:7] + aln[1].seq[7:], id="Mix"))
+        aln.append(SeqRecord(aln[2].seq[:5] + "--*-" + aln[2].seq[9:],
+                             id="Gappy"))
+        for model in ['identity', 'blastn', 'trans', 'blosum62', 'pam30']:
+            calculator = DistanceCalculator(model)
+            for processes in (1, 2):
+                dm = calculator.get_distance(aln, processes)
+                self.assertEqual(dm.names, [s.id for s in aln])
+                for seq1 in aln:
+                    for seq2 in aln:
+                        if seq1.id == seq2.id:
+                            expected = 0
+                        else:
+                            expected = calculator._pairwise(seq1, seq2)
+                        self.assertEqual(dm[seq1.id, seq2.id], expected)
+
+    def test_many_rows(self):
+        # More than one block of rows
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        records = list(aln)
+        for i in range(300):
+            cut = i % aln.get_alignment_length()
+            seq = (records[i % 5].seq[:cut] +
+                   records[(3 * i + 1) % 5].seq[cut:])
+            aln.append(SeqRecord(seq, id="Seq%i" % i))
+        for model in ['identity', 'blosum62']:
+            calculator = DistanceCalculator(model)
+            for processes in (1, 2):
+                dm = calculator.get_distance(aln, processes)
+                for i in (0, 100, 255, 256, 257, 304):
+                    for j in (1, 255, 256, 300):
+                        if i != j:
+                            self.assertEqual(
+                                dm[aln[i].id, aln[j].id],
+                                calculator._pairwise(aln[i], aln[j]))
+
+    def test_bad_alphabet(self):
+        aln = AlignIO.read(StringIO(">Alpha\nAJA\n>Beta\nA-A\n>Gamma\nAAJ"),
+                           "fasta")
+        self.assertRaises(ValueError,
+                          DistanceCalculator('blosum62').get_distance, aln)
+        # Fine if only ever compared to gaps
+        dmat = DistanceCalculator('blosum62').get_distance(aln[:2])
+        self.assertEqual(dmat['Alpha', 'Beta'], 0)
+        # Reported as for the first failing pair, at its first bad column
+        aln = AlignIO.read(StringIO(">Alpha\nAAAAAJ\n>Beta\nAAJAAA"), "fasta")
+        with self.assertRaises(ValueError) as cm:
+            DistanceCalculator('blosum62').get_distance(aln)
+        self.assertEqual(str(cm.exception),
+                         "Bad alphabet 'J' in sequence 'Beta' at position '2'")
+
+
+class _PurePythonConstructor(DistanceTreeConstructor):
+    """Constructor always using the pure Python code."""
+
+    def _upgma_array(self, distance_matrix):
+        raise ImportError
+
+    def _nj_array(self, distance_matrix):
+        raise ImportError
+
+
+class _PurePythonScorer(ParsimonyScorer):
+    """Parsimony scorer always using the pure Python code."""
+
+    def _get_score_array(self, tree, terms, alignment):
+        raise ImportError
+
 
 class DistanceTreeConstructorTest(unittest.TestCase):
     """Test DistanceTreeConstructor"""
@@ -181,6 +266,19 @@ class DistanceTreeConstructorTest(unittest.TestCase):
         self.assertTrue(Consensus._equal_topology(tree, ref_tree))
         # ref_tree.close()
 
+    def test_pure_python_agreement(self):
+        # Includes some tied distances
+        names = ['T%i' % i for i in range(12)]
+        matrix = [[((i * 7 + j * 3) % 5) + 1 for j in range(i)] + [0]
+                  for i in range(len(names))]
+        dms = [self.dm, DistanceMatrix(names, matrix)]
+        for dm in dms:
+            for method in ('upgma', 'nj'):
+                tree = getattr(self.constructor, method)(dm)
+                ref_tree = getattr(_PurePythonConstructor(), method)(dm)
+                self.assertEqual(tree.format('newick'),
+                                 ref_tree.format('newick'))
+
     def test_built_tree(self):
         tree = self.constructor.build_tree(self.aln)
         self.assertTrue(isinstance(tree, BaseTree.Tree))
@@ -242,6 +340,49 @@ class ParsimonyScorerTest(unittest.TestCase):
         score = scorer.get_score(tree, aln)
         self.assertEqual(score, 3 + 1 + 3 + 3 + 2 + 1 + 2 + 5)
 
+    def test_trifurcating_root(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        alphabet = ['A', 'T', 'C', 'G']
+        step_matrix = [[0], [2.5, 0], [2.5, 1, 0], [1, 2.5, 2.5, 0]]
+        tree = Phylo.read(StringIO("((Alpha,Beta),Gamma,(Delta,Epsilon));"),
+                          'newick', rooted=True)
+        self.assertTrue(tree.is_bifurcating())
+        resolved = Phylo.read(
+            StringIO("((Alpha,Beta),(Gamma,(Delta,Epsilon)));"), 'newick',
+            rooted=True)
+        for matrix in (None, _Matrix(alphabet, step_matrix)):
+            score = ParsimonyScorer(matrix).get_score(resolved, aln)
+            self.assertEqual(ParsimonyScorer(matrix).get_score(tree, aln),
+                             score)
+            self.assertEqual(_PurePythonScorer(matrix).get_score(tree, aln),
+                             score)
+
+    def test_site_patterns(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        tree = Phylo.read('./TreeConstruction/upgma.tre', 'newick')
+        scorer = ParsimonyScorer()
+        score = scorer.get_score(tree, aln)
+        # Repeated columns are scored once, but still counted
+        doubled = aln + aln[:, 2:5]
+        self.assertEqual(scorer.get_score(tree, doubled),
+                         score + scorer.get_score(tree, aln[:, 2:5]))
+        # Cached subtree states are not used for a different alignment
+        self.assertEqual(scorer.get_score(tree, aln), score)
+        self.assertEqual(scorer.get_score(tree, aln[:, :1]), 2)
+
+    def test_pure_python_agreement(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        tree = Phylo.read('./TreeConstruction/upgma.tre', 'newick')
+        alphabet = ['A', 'T', 'C', 'G']
+        step_matrix = [[0], [2.5, 0], [2.5, 1, 0], [1, 2.5, 2.5, 0]]
+        for matrix in (None, _Matrix(alphabet, step_matrix)):
+            scorer = ParsimonyScorer(matrix)
+            py_scorer = _PurePythonScorer(matrix)
+            searcher = NNITreeSearcher(scorer)
+            for neighbor in searcher._get_neighbors(tree):
+                self.assertEqual(scorer.get_score(neighbor, aln),
+                                 py_scorer.get_score(neighbor, aln))
+
 
 class NNITreeSearcherTest(unittest.TestCase):
     """Test NNITreeSearcher"""
@@ -1808,6 +1808,51 @@ class MotifTestPWM(unittest.TestCase):
         self.assertRaises(ValueError, motifs.create, seqs)
 
 
+class MotifTestThresholds(unittest.TestCase):
+    """PSSM score distribution and threshold tests."""
+
+    def setUp(self):
+        with open("motifs/SRF.pfm") as handle:
+            self.m = motifs.read(handle, "pfm")
+        self.m.pseudocounts = 0.5
+        self.background = {"A": 0.3, "C": 0.2, "G": 0.2, "T": 0.3}
+
+    def test_thresholds(self):
+        """Test thresholds calculated from the score distribution."""
+        pssm = self.m.pssm
+        distribution = pssm.distribution(precision=100)
+        self.assertEqual(1200, len(distribution.mo_density))
+        self.assertAlmostEqual(1.0, sum(distribution.mo_density))
+        self.assertAlmostEqual(1.0, sum(distribution.bg_density))
+        self.assertAlmostEqual(-3.50864399, distribution.threshold_fpr(0.01))
+        self.assertAlmostEqual(9.92894516, distribution.threshold_fnr(0.1))
+        self.assertAlmostEqual(9.32636268,
+                               distribution.threshold_balanced(1000))
+        threshold, rate = distribution.threshold_balanced(10, True)
+        self.assertAlmostEqual(3.36079620, threshold)
+        self.assertAlmostEqual(0.00104362, rate)
+        self.assertAlmostEqual(12.45979155, distribution.threshold_patser())
+
+    def test_thresholds_background(self):
+        """Test thresholds with a non-uniform background."""
+        self.m.background = self.background
+        distribution = self.m.pssm.distribution(self.background, 100)
+        self.assertAlmostEqual(-3.33605660, distribution.threshold_fpr(0.01))
+        self.assertAlmostEqual(9.86049956, distribution.threshold_fnr(0.1))
+        self.assertAlmostEqual(12.51186244, distribution.threshold_patser())
+
+    def test_distribution_cache(self):
+        """Test reusing score distributions."""
+        distribution = self.m.pssm.distribution(precision=100)
+        # a new but equal PSSM
+        self.assertTrue(distribution is self.m.pssm.distribution(precision=100))
+        self.assertFalse(distribution is self.m.pssm.distribution(precision=50))
+        self.assertFalse(distribution is
+                         self.m.pssm.distribution(self.background, 100))
+        self.m.pseudocounts = 1.0
+        self.assertFalse(distribution is self.m.pssm.distribution(precision=100))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -0,0 +1,101 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for comparing many PSSMs with each other at once."""
+
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.motifs.comparison.")
+
+from Bio import motifs
+from Bio.Alphabet import IUPAC
+from Bio.Seq import Seq
+from Bio.motifs.comparison import dist_pearson_matrix
+
+
+class DistPearsonMatrixTests(unittest.TestCase):
+
+    def setUp(self):
+        self.motifs = []
+        for filename, fmt in (("motifs/SRF.pfm", "pfm"),
+                              ("motifs/REB1.pfm", "pfm"),
+                              ("motifs/Arnt.sites", "sites")):
+            with open(filename) as handle:
+                self.motifs.append(motifs.read(handle, fmt))
+        with open("motifs/meme.dna.oops.txt") as handle:
+            self.motifs.extend(motifs.parse(handle, "meme"))
+        rng = random.Random(3)
+        for length in (1, 4, 12):
+            instances = [Seq("".join(rng.choice("ACGT")
+                                     for i in range(length)),
+                             IUPAC.unambiguous_dna)
+                         for j in range(10)]
+            self.motifs.append(motifs.create(instances))
+        self.pssms = [m.counts.normalize(pseudocounts=0.5).log_odds()
+                      for m in self.motifs]
+
+    def check_matrix(self, both, processes=1):
+        distances, offsets, reverse = dist_pearson_matrix(self.pssms, both,
+                                                          processes)
+        count = len(self.pssms)
+        self.assertEqual((count, count), distances.shape)
+        for i, first in enumerate(self.pssms):
+            for j, second in enumerate(self.pssms):
+                expected = first.dist_pearson(second)
+                if both:
+                    other = first.dist_pearson(second.reverse_complement())
+                    if other[0] < expected[0]:
+                        expected = other
+                self.assertAlmostEqual(expected[0], distances[i, j])
+                if reverse[i, j]:
+                    self.assertTrue(both)
+                    second = second.reverse_complement()
+                if (expected[1], both and expected is other) != \
+                        (offsets[i, j], reverse[i, j]):
+                    # a tie with another offset or strand, broken by rounding
+                    self.assertAlmostEqual(
+                        expected[0],
+                        self.dist_pearson_at(first, second,
+                                             int(offsets[i, j])))
+
+    def dist_pearson_at(self, first, second, offset):
+        """Distance of two PSSMs at an offset as returned by dist_pearson."""
+        if offset > 0:
+            return 1 - first.dist_pearson_at(second, offset)
+        return 1 - second.dist_pearson_at(first, -offset)
+
+    def test_forward(self):
+        """Compare all pairs with dist_pearson."""
+        self.check_matrix(False)
+
+    def test_both(self):
+        """Compare all pairs including reverse complements."""
+        self.check_matrix(True)
+
+    def test_processes(self):
+        """Compare all pairs using worker processes."""
+        self.check_matrix(True, processes=2)
+
+    def test_bad_arguments(self):
+        """Reject empty, mixed and non-DNA lists of PSSMs."""
+        self.assertRaises(ValueError, dist_pearson_matrix, [])
+        protein = motifs.create([Seq("ACDE", IUPAC.protein)])
+        pssm = protein.counts.normalize(pseudocounts=0.5).log_odds()
+        self.assertRaises(ValueError, dist_pearson_matrix,
+                          [self.pssms[0], pssm])
+        self.assertRaises(ValueError, dist_pearson_matrix, [pssm], True)
+        distances, offsets, reverse = dist_pearson_matrix([pssm, pssm])
+        self.assertTrue(numpy.allclose(0.0, distances))
+        self.assertEqual([[0, 0], [0, 0]], offsets.tolist())
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -0,0 +1,238 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for reading JASPAR motifs from a local SQLite JASPAR5 database."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+try:
+    import sqlite3
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install sqlite3 if you want to use Bio.motifs.jaspar.db with SQLite.")
+
+from Bio import BiopythonWarning
+from Bio.motifs.jaspar.db import JASPAR5
+
+
+SCHEMA = """
+CREATE TABLE MATRIX (ID INTEGER PRIMARY KEY, COLLECTION VARCHAR(16),
+                     BASE_ID VARCHAR(16), VERSION TINYINT, NAME VARCHAR(255));
+CREATE TABLE MATRIX_DATA (ID INTEGER, row VARCHAR(1), col TINYINT, val FLOAT);
+CREATE TABLE MATRIX_ANNOTATION (ID INTEGER, TAG VARCHAR(255),
+                                VAL VARCHAR(255));
+CREATE TABLE MATRIX_SPECIES (ID INTEGER, TAX_ID VARCHAR(255));
+CREATE TABLE MATRIX_PROTEIN (ID INTEGER, ACC VARCHAR(255));
+"""
+
+ETS1_COUNTS = {"A": [4, 17, 0, 0, 0, 5],
+               "C": [16, 0, 1, 39, 39, 3],
+               "G": [4, 0, 0, 1, 0, 17],
+               "T": [16, 23, 39, 0, 1, 15]}
+
+
+class JASPAR5SQLiteTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="biopython_jaspar_")
+        self.filename = os.path.join(self.temp_dir, "jaspar.sqlite")
+        dbh = sqlite3.connect(self.filename)
+        dbh.executescript(SCHEMA)
+        self.add_motif(dbh, 1, "CORE", "MA0098", 1, "ETS1", ETS1_COUNTS,
+                       [("class", "Winged Helix-Turn-Helix"),
+                        ("family", "Ets"), ("tax_group", "vertebrates"),
+                        ("type", "SELEX"), ("medline", "1542566"),
+                        ("pazar_tf_id", "TF0000070"), ("comment", "-")],
+                       ["9606"], ["CAG47050"])
+        self.add_motif(dbh, 2, "CORE", "MA0098", 2, "ETS1",
+                       {"A": [1, 2], "C": [3, 4], "G": [5, 6], "T": [7, 8]},
+                       [("family", "Ets"), ("tax_group", "vertebrates")],
+                       ["9606", "10090"], [])
+        self.add_motif(dbh, 3, "CORE", "MA0001", 1, "AGL3",
+                       {"A": [0, 3, 79], "C": [94, 75, 4],
+                        "G": [1, 0, 3], "T": [2, 19, 11]},
+                       [("family", "MADS"), ("tax_group", "plants")],
+                       ["3702"], ["P29383"])
+        self.add_motif(dbh, 4, "PHYLOFACTS", "PF0001", 1, "YGCGYRCGC",
+                       {"A": [0, 1], "C": [2, 0], "G": [0, 2], "T": [1, 0]},
+                       [], [], [])
+        # enough motifs to need several batches of queries
+        for index in range(1200):
+            length = 1 + index % 7
+            self.add_motif(dbh, 100 + index, "TEST", "TE%04i" % index, 1,
+                           "test%i" % index,
+                           dict((base, [index % 5 + i for i in range(length)])
+                                for base in "ACGT"),
+                           [("family", "Test%i" % (index % 3))], [], [])
+        dbh.commit()
+        dbh.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def add_motif(self, dbh, int_id, collection, base_id, version, name,
+                  counts, annotations, species, accs):
+        dbh.execute("INSERT INTO MATRIX VALUES (?, ?, ?, ?, ?)",
+                    (int_id, collection, base_id, version, name))
+        for base, values in counts.items():
+            for col, val in enumerate(values):
+                dbh.execute("INSERT INTO MATRIX_DATA VALUES (?, ?, ?, ?)",
+                            (int_id, base, col + 1, val))
+        for tag, val in annotations:
+            dbh.execute("INSERT INTO MATRIX_ANNOTATION VALUES (?, ?, ?)",
+                        (int_id, tag, val))
+        for tax_id in species:
+            dbh.execute("INSERT INTO MATRIX_SPECIES VALUES (?, ?)",
+                        (int_id, tax_id))
+        for acc in accs:
+            dbh.execute("INSERT INTO MATRIX_PROTEIN VALUES (?, ?)",
+                        (int_id, acc))
+
+    def open_database(self, **kwargs):
+        jdb = JASPAR5(name=self.filename, driver="sqlite3", **kwargs)
+        self.addCleanup(jdb.close)
+        return jdb
+
+    def test_fetch_motif_by_id(self):
+        """Fetch single motifs by their JASPAR matrix ID."""
+        jdb = self.open_database()
+        self.assertEqual("sqlite3:%s" % self.filename, str(jdb))
+        motif = jdb.fetch_motif_by_id("MA0098.1")
+        self.assertEqual("MA0098.1", motif.matrix_id)
+        self.assertEqual("ETS1", motif.name)
+        self.assertEqual("CORE", motif.collection)
+        self.assertEqual("Winged Helix-Turn-Helix", motif.tf_class)
+        self.assertEqual("Ets", motif.tf_family)
+        self.assertEqual("vertebrates", motif.tax_group)
+        self.assertEqual("SELEX", motif.data_type)
+        self.assertEqual("1542566", motif.medline)
+        self.assertEqual("TF0000070", motif.pazar_id)
+        self.assertEqual("-", motif.comment)
+        self.assertEqual(["9606"], motif.species)
+        self.assertEqual(["CAG47050"], motif.acc)
+        self.assertEqual(6, motif.length)
+        for base, values in ETS1_COUNTS.items():
+            self.assertEqual(values, list(motif.counts[base]))
+        # the latest version is returned if none is given
+        motif = jdb.fetch_motif_by_id("MA0098")
+        self.assertEqual("MA0098.2", motif.matrix_id)
+        self.assertEqual(["10090", "9606"], sorted(motif.species))
+        self.assertEqual([], motif.acc)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", BiopythonWarning)
+            self.assertEqual(None, jdb.fetch_motif_by_id("MA9999"))
+            self.assertEqual(None, jdb.fetch_motif_by_id("MA0098.3"))
+
+    def test_fetch_motifs(self):
+        """Fetch motifs by selection criteria."""
+        jdb = self.open_database()
+        motifs = jdb.fetch_motifs()
+        self.assertEqual(["MA0001.1", "MA0098.2"],
+                         sorted(m.matrix_id for m in motifs))
+        motifs = jdb.fetch_motifs(all_versions=True)
+        self.assertEqual(["MA0001.1", "MA0098.1", "MA0098.2"],
+                         sorted(m.matrix_id for m in motifs))
+        motifs = jdb.fetch_motifs(tax_group="plants")
+        self.assertEqual(["MA0001.1"], [m.matrix_id for m in motifs])
+        motifs = jdb.fetch_motifs(collection=None,
+                                  tf_family=["Ets", "Test1"], min_length=6)
+        # MA0098.2 is too short, as are most of the test motifs
+        self.assertEqual(114, len(motifs))
+        self.assertEqual(["TE0013", "TE0019", "TE0034", "TE0040"],
+                         sorted(m.base_id for m in motifs)[:4])
+        motifs = jdb.fetch_motifs_by_name("AGL3")
+        self.assertEqual(["MA0001.1"], [m.matrix_id for m in motifs])
+
+    def test_fetch_motifs_by_matrix_id(self):
+        """Fetch motifs by matrix IDs, keeping their order."""
+        jdb = self.open_database()
+        matrix_ids = ["PF0001", "MA0098.1", "MA0001.1", "MA0098"]
+        motifs = jdb.fetch_motifs(matrix_id=matrix_ids)
+        self.assertEqual(["PF0001.1", "MA0098.1", "MA0001.1", "MA0098.2"],
+                         [m.matrix_id for m in motifs])
+        motifs = jdb.fetch_motifs(matrix_id=["MA0098", "MA0001"],
+                                  all_versions=True)
+        self.assertEqual(["MA0098.1", "MA0098.2", "MA0001.1"],
+                         [m.matrix_id for m in motifs])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", BiopythonWarning)
+            motifs = jdb.fetch_motifs(matrix_id=["MA9999", "MA0001.1",
+                                                 "MA0001.5"])
+        self.assertEqual(["MA0001.1"], [m.matrix_id for m in motifs])
+        self.assertEqual(2, len(caught))
+
+    def test_batches(self):
+        """Fetch more motifs than fit in a single query."""
+        jdb = self.open_database()
+        motifs = jdb.fetch_motifs(collection="TEST")
+        self.assertEqual(1200, len(motifs))
+        motifs.sort(key=lambda motif: motif.name)
+        for motif in motifs:
+            index = int(motif.name[4:])
+            self.assertEqual("TE%04i.1" % index, motif.matrix_id)
+            self.assertEqual("Test%i" % (index % 3), motif.tf_family)
+            self.assertEqual(1 + index % 7, motif.length)
+            self.assertEqual(list(range(index % 5, index % 5 + motif.length)),
+                             list(motif.counts["G"]))
+
+    def test_cache(self):
+        """Reuse the data of motifs fetched before."""
+        jdb = self.open_database(cache_size=2)
+        uncached = self.open_database(cache_size=0)
+        first = jdb.fetch_motif_by_id("MA0098.1")
+        dbh = sqlite3.connect(self.filename)
+        dbh.execute("DELETE FROM MATRIX_DATA WHERE ID = 1")
+        dbh.execute("UPDATE MATRIX_ANNOTATION SET VAL = 'Changed' "
+                    "WHERE ID = 1 AND TAG = 'family'")
+        dbh.commit()
+        dbh.close()
+        # a new motif with the cached data
+        second = jdb.fetch_motif_by_id("MA0098.1")
+        self.assertFalse(first is second)
+        self.assertEqual("Ets", second.tf_family)
+        self.assertEqual(6, second.length)
+        first.species.append("10090")
+        self.assertEqual(["9606"], jdb.fetch_motif_by_id("MA0098.1").species)
+        # without the cache
+        motif = uncached.fetch_motif_by_id("MA0098.1")
+        self.assertEqual("Changed", motif.tf_family)
+        self.assertEqual(0, motif.length)
+        # only the two most recently used motifs are kept
+        jdb.fetch_motifs(matrix_id=["MA0001.1", "PF0001.1"])
+        self.assertEqual("Changed",
+                         jdb.fetch_motif_by_id("MA0098.1").tf_family)
+
+    def test_cache_file(self):
+        """Keep the data of motifs in a cache file."""
+        cache_file = os.path.join(self.temp_dir, "cache")
+        jdb = self.open_database(cache_file=cache_file)
+        motifs = jdb.fetch_motifs(collection=None, all_versions=True)
+        self.assertEqual(1204, len(motifs))
+        jdb.close()
+        dbh = sqlite3.connect(self.filename)
+        dbh.execute("DELETE FROM MATRIX_DATA")
+        dbh.execute("DELETE FROM MATRIX_ANNOTATION")
+        dbh.commit()
+        dbh.close()
+        jdb = self.open_database(cache_size=0, cache_file=cache_file)
+        motif = jdb.fetch_motif_by_id("MA0098.1")
+        self.assertEqual("Ets", motif.tf_family)
+        self.assertEqual(ETS1_COUNTS["T"], list(motif.counts["T"]))
+
+    def test_bad_arguments(self):
+        """Reject unknown drivers and missing SQLite files."""
+        self.assertRaises(ValueError, JASPAR5, name=self.filename,
+                          driver="oracle")
+        self.assertRaises(ValueError, JASPAR5, driver="sqlite3",
+                          name=os.path.join(self.temp_dir, "missing.sqlite"))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
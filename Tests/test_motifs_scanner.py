@@ -0,0 +1,104 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for searching sequences with many PSSMs at once."""
+
+import math
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.motifs.scanner.")
+
+from Bio import motifs
+from Bio.Alphabet import IUPAC
+from Bio.Seq import Seq
+from Bio.motifs.scanner import PSSMScanner
+
+
+class PSSMScannerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.motifs = []
+        for filename, fmt in (("motifs/SRF.pfm", "pfm"),
+                              ("motifs/REB1.pfm", "pfm"),
+                              ("motifs/Arnt.sites", "sites")):
+            with open(filename) as handle:
+                self.motifs.append(motifs.read(handle, fmt))
+        with open("motifs/meme.dna.oops.txt") as handle:
+            self.motifs.extend(motifs.parse(handle, "meme"))
+        self.pssms = [m.counts.normalize(pseudocounts=0.5).log_odds()
+                      for m in self.motifs]
+
+    def expected_hits(self, sequence, thresholds, both=True):
+        """Hits of the PSSMs one at a time, sorted as by the scanner."""
+        sequence = Seq(sequence, IUPAC.unambiguous_dna)
+        n = len(sequence)
+        hits = []
+        for index, (pssm, threshold) in enumerate(zip(self.pssms,
+                                                      thresholds)):
+            for position, score in pssm.search(sequence, threshold, both):
+                hits.append((index, position, score))
+        hits.sort(key=lambda hit: (hit[1] % n, hit[0], hit[1] < 0))
+        return hits
+
+    def check_hits(self, expected, hits):
+        self.assertEqual([hit[:2] for hit in expected],
+                         [hit[:2] for hit in hits])
+        for (index, position, score), hit in zip(expected, hits):
+            self.assertAlmostEqual(score, hit[2], places=4)
+
+    def test_random(self):
+        """Compare scanning with searching for each PSSM."""
+        rng = random.Random(42)
+        for letters in ("ACGT", "ACGTacgtN"):
+            sequence = "".join(rng.choice(letters) for i in range(400))
+            thresholds = [rng.uniform(-2.0, 6.0) for pssm in self.pssms]
+            for both in (True, False):
+                expected = self.expected_hits(sequence, thresholds, both)
+                self.assertTrue(expected)
+                scanner = PSSMScanner(self.pssms, thresholds, both)
+                for chunk_size in (None, 1, 10, 397, 1000):
+                    hits = list(scanner.search(sequence, chunk_size))
+                    self.check_hits(expected, hits)
+
+    def test_processes(self):
+        """Scan using worker processes."""
+        rng = random.Random(7)
+        sequence = "".join(rng.choice("ACGT") for i in range(2000))
+        scanner = PSSMScanner(self.pssms, 4.0)
+        hits = list(scanner.search(sequence, chunk_size=300, processes=2))
+        self.check_hits(self.expected_hits(sequence, [4.0] * 5), hits)
+
+    def test_short_sequences(self):
+        """Scan sequences shorter than some or all of the PSSMs."""
+        scanner = PSSMScanner(self.pssms, -1000.0)
+        self.assertEqual([], list(scanner.search("")))
+        self.assertEqual([], list(scanner.search("ACGTA")))
+        # only the six letter Arnt motif fits, on both strands
+        hits = list(scanner.search("CACGTG"))
+        self.assertEqual([(2, 0), (2, -6)], [hit[:2] for hit in hits])
+        self.assertAlmostEqual(self.pssms[2].max, hits[0][2])
+        # letters other than ACGT never match
+        self.assertEqual([], list(scanner.search("CACNTG")))
+
+    def test_bad_arguments(self):
+        """Reject invalid PSSMs and thresholds."""
+        self.assertRaises(ValueError, PSSMScanner, [])
+        self.assertRaises(ValueError, PSSMScanner, self.pssms, [1.0, 2.0])
+        protein = motifs.create([Seq("ACDE", IUPAC.protein)])
+        self.assertRaises(ValueError, PSSMScanner,
+                          [protein.counts.normalize().log_odds()])
+        scanner = PSSMScanner(self.pssms)
+        self.assertEqual(5, len(scanner))
+        self.assertRaises(ValueError, list, scanner.search("ACGT", 0))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)